@@ -1,4 +1,5 @@
 import re
+from datetime import datetime
 
 from .ibis.client import *  # noqa
 from .ibis.compiler import *  # noqa
@@ -19,3 +20,27 @@ def bq_table_schema_is_string_only(bq_table):
         col.name == f"string_field_{idx}" and col.field_type == "STRING"
         for idx, col in enumerate(bq_table.schema)
     )
+
+
+def _is_typed_value(value):
+    # values from a sheet are already typed, e.g. numbers or booleans
+    if not isinstance(value, str):
+        return value is not None
+    value = value.strip()
+    if not value:
+        return False
+    if value.lower() in ["true", "false"]:
+        return True
+    for parse in [float, datetime.fromisoformat]:
+        try:
+            parse(value)
+            return True
+        except ValueError:
+            pass
+    return False
+
+
+def sample_is_string_only(rows):
+    # check if bigquery would infer that all columns of the sample are strings,
+    # without loading the data first
+    return not any(_is_typed_value(value) for row in rows for value in row)
@@ -5,6 +5,8 @@ from numbers import Number
 
 import ibis
 import ibis.expr.datatypes as dt
+import numpy as np
+import pandas as pd
 from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.core.validators import URLValidator
@@ -13,7 +15,8 @@ from django_tables2 import Column, Table
 from django_tables2.config import RequestConfig as BaseRequestConfig
 from django_tables2.data import TableData
 
-from apps.base.core.utils import md5
+from apps.base.clients import get_engine
+from apps.base.core.utils import compile_query, md5, md5_kwargs
 from apps.columns.currency_symbols import CURRENCY_SYMBOLS_MAP
 
 
@@ -21,6 +24,31 @@ def rows_dict_by_md5(df):
     return [{md5(k): v for k, v in row.items()} for row in df.to_dict(orient="records")]
 
 
+def _to_keyset_value(value):
+    if pd.isna(value):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    # numpy scalars are not supported as ibis literals
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _get_keyset_predicate(data, sort_keys, values, nulls_first):
+    """Filters the rows sorted at or after the values, i.e. a lexicographic >=."""
+    predicate = None
+    equal = None
+    for (name, ascending), value in zip(sort_keys, values):
+        column = data[name]
+        after = column > value if ascending else column < value
+        # null values have no order in comparisons
+        if ascending != nulls_first:
+            after = after | column.isnull()
+        after = after if equal is None else equal & after
+        predicate = after if predicate is None else predicate | after
+        equal = column == value if equal is None else equal & (column == value)
+    return predicate | equal
+
+
 class GyanaTableData(TableData):
     """Django table data class that queries data from BigQuery
 
@@ -30,17 +58,31 @@ class GyanaTableData(TableData):
     fetches the first N rows, and the total rows information. The total rows
     information is cached, for future requests with explicit pages, where the
     data is fetched via LIMIT ... OFFSET ... expression.
+
+    For sorted tables, the sort values of the last row on a page are cached and
+    the next page is fetched with a WHERE on them (keyset pagination), instead
+    of scanning and discarding all previous rows with OFFSET.
+
+    The cache keys are derived from the compiled SQL and `data_updated` of the
+    source tables, so they are shared between processes. Without `data_updated`
+    the pages are only cached for the lifetime of the instance.
     """
 
     rows_per_page = 50
 
-    def __init__(
-        self,
-        data,
-    ):
+    def __init__(self, data, data_updated=None):
         self.data = data
+        self.data_updated = data_updated
+        self._sort_keys = None
         # calculate before the order_by is applied, as len is not effected
-        self._len_key = f"cache-table-length-{hash(self.data)}"
+        self._len_key = self._get_cache_key("length")
+
+    def _get_cache_key(self, name, **kwargs):
+        return f"cache-table-{name}-" + md5_kwargs(
+            sql=compile_query(self.data),
+            data_updated=str(self.data_updated),
+            **kwargs,
+        )
 
     @property
     def _page_selected(self):
@@ -48,23 +90,78 @@ class GyanaTableData(TableData):
 
     @functools.cache
     def _get_query_results(self, start=0, stop=None):
+        page_key = (
+            self._get_cache_key("page", start=start, stop=stop)
+            if self.data_updated
+            else None
+        )
+        # the total rows are stored separately as pickle drops the attribute
+        if page_key and (cached := cache.get(page_key)) is not None:
+            df, total_rows = cached
+            df.__dict__["total_rows"] = total_rows
+            return df
+
         data = self.data
-        if start > 0:
+        if start > 0 and (keyset := self._get_keyset(start)):
+            values, ties = keyset
+            predicate = _get_keyset_predicate(
+                data, self._sort_keys, values, get_engine().nulls_first
+            )
+            # rows sharing the last sort values are skipped with a small offset
+            data = data.filter(predicate).limit(stop - start, offset=ties)
+        elif start > 0:
             data = data.limit(stop - start, offset=start)
         df = data.execute(limit=self.rows_per_page)
         # automatically added by custom bigquery execute
         # bypass the default `__getattr__`, `__setattr__` of `pd.DataFrame`
         if not "total_rows" in df.__dict__:
             df.__dict__["total_rows"] = self.data.count().execute()
+
+        if page_key:
+            cache.set(page_key, (df, df.__dict__["total_rows"]), 24 * 3600)
         return df
 
+    def _get_keyset(self, start):
+        if self._sort_keys and self.data_updated:
+            return cache.get(self._get_cache_key("keyset", start=start))
+
+    def _set_keyset(self, df, start):
+        """Stores the sort values of the last row, the next page starts after them"""
+        if not (self._sort_keys and self.data_updated) or len(df) == 0:
+            return
+
+        names = [name for name, _ in self._sort_keys]
+        rows = [
+            tuple(_to_keyset_value(value) for value in row)
+            for row in df[names].itertuples(index=False)
+        ]
+        values = rows[-1]
+        if None in values:
+            return
+
+        ties = len(rows) - next(idx for idx, row in enumerate(rows) if row == values)
+        # every row on this page shares the values, ties continue from before
+        if ties == len(rows) and start > 0:
+            keyset = self._get_keyset(start)
+            if keyset is None or keyset[0] != values:
+                return
+            ties += keyset[1]
+
+        cache.set(
+            self._get_cache_key("keyset", start=start + len(rows)),
+            (values, ties),
+            24 * 3600,
+        )
+
     def __getitem__(self, page: slice):
         """Fetches the data for the current page"""
-        return (
-            rows_dict_by_md5(self._get_query_results(page.start, page.stop))
+        df = (
+            self._get_query_results(page.start, page.stop)
             if self._page_selected
-            else rows_dict_by_md5(self._get_query_results())[: page.stop - page.start]
+            else self._get_query_results()[: page.stop - page.start]
         )
+        self._set_keyset(df, page.start)
+        return rows_dict_by_md5(df)
 
     def __len__(self):
         """Fetches the total size from the database"""
@@ -76,17 +173,22 @@ class GyanaTableData(TableData):
 
         return total_rows
 
+    def prefetch(self):
+        """Fetches the first page and the total rows ahead of a request"""
+        total_rows = self._get_query_results().__dict__["total_rows"]
+        cache.set(self._len_key, total_rows, 24 * 3600)
+
     def get_column_from_md5(self, md5):
         return self.table.columns[md5].verbose_name
 
     def order_by(self, aliases):
-        sort_by = [
-            (
-                getattr(self.data, self.get_column_from_md5(alias.replace("-", ""))),
-                alias.startswith("-"),
-            )
+        self._sort_keys = [
+            (self.get_column_from_md5(alias.replace("-", "")), alias.startswith("-"))
             for alias in aliases
         ]
+        sort_by = [
+            (getattr(self.data, name), ascending) for name, ascending in self._sort_keys
+        ]
         sort_by = [
             column if ascending else ibis.desc(column) for column, ascending in sort_by
         ]
@@ -106,6 +208,46 @@ class GyanaTableData(TableData):
         self.table = table
 
 
+class DataFrameTableData(TableData):
+    """Django table data class for rows that are already fetched, e.g. the rows
+    of a table widget that are queried together with its summary row.
+    """
+
+    def __init__(self, data):
+        self.data = data
+
+    def __getitem__(self, page: slice):
+        return rows_dict_by_md5(self.data.iloc[page])
+
+    def __len__(self):
+        return len(self.data)
+
+    def prefetch(self):
+        pass
+
+    def get_column_from_md5(self, md5):
+        return self.table.columns[md5].verbose_name
+
+    def order_by(self, aliases):
+        # the same sort directions as `GyanaTableData.order_by`
+        sort_keys = [
+            (self.get_column_from_md5(alias.replace("-", "")), alias.startswith("-"))
+            for alias in aliases
+        ]
+        if not sort_keys:
+            return
+
+        names, ascending = zip(*sort_keys)
+        self.data = self.data.sort_values(
+            list(names),
+            ascending=list(ascending),
+            na_position="first" if ascending[0] == get_engine().nulls_first else "last",
+        )
+
+    def set_table(self, table):
+        self.table = table
+
+
 class RequestConfig(BaseRequestConfig):
     def configure(self, table):
         # table has request attribute before table_data.__len__ is called
@@ -187,7 +329,9 @@ class GyanaColumn(Column):
                 "class": (
                     "bg-green-50"
                     if value > self.positive_threshold
-                    else "bg-red-50" if value < self.negative_threshold else None
+                    else "bg-red-50"
+                    if value < self.negative_threshold
+                    else None
                 ),
             }
         if isinstance(value, Number) and self.currency:
@@ -237,9 +381,11 @@ class GyanaColumn(Column):
         return self.render(self.summary)
 
 
-def get_table(schema, query, footer=None, settings=None, **kwargs):
+def get_table(schema, query, footer=None, settings=None, data_updated=None, **kwargs):
     """Dynamically creates a table class and adds the correct table data
 
+    The query is either an ibis expression or the already fetched rows.
+
     See https://django-tables2.readthedocs.io/en/stable/_modules/django_tables2/views.html
     """
     attrs = {}
@@ -282,5 +428,9 @@ def get_table(schema, query, footer=None, settings=None, **kwargs):
     )
     table_class = type("DynamicTable", (Table,), attrs)
 
-    table_data = GyanaTableData(query)
+    table_data = (
+        DataFrameTableData(query)
+        if isinstance(query, pd.DataFrame)
+        else GyanaTableData(query, data_updated)
+    )
     return table_class(data=table_data, **kwargs)
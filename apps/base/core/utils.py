@@ -29,6 +29,23 @@ def md5_kwargs(**kwargs):
     return md5(json.dumps(kwargs))
 
 
+def md5_chunks(chunks):
+    # hash large content, e.g. a file, without reading it into memory at once
+    content_hash = hashlib.md5()
+    for chunk in chunks:
+        content_hash.update(chunk)
+    return content_hash.hexdigest()
+
+
+def compile_query(query):
+    """Compiles an ibis expression to an SQL string, independent of the engine"""
+    sql = query.compile()
+    # SQLAlchemy backends return an SQLAlchemy object
+    if not isinstance(sql, str):
+        sql = str(sql.compile(compile_kwargs={"literal_binds": True}))
+    return sql
+
+
 def create_column_choices(schema):
     columns = sorted([(col, col) for col in schema], key=lambda x: str.casefold(x[1]))
     return [("", "No column selected"), *columns]
@@ -0,0 +1,72 @@
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+import ibis
+from django.core.cache import cache
+
+from apps.base.core.utils import md5_kwargs
+
+if TYPE_CHECKING:
+    from apps.tables.models import Table
+
+LOCAL_CACHE_SIZE = 1024
+SHARED_CACHE_TIMEOUT = 24 * 3600
+
+# Ibis schemas are plain data and are shared via the django cache, the local
+# cache avoids the round trip for the tables used repeatedly within a request
+_local_cache = OrderedDict()
+
+
+def _get_cache_key(table: "Table"):
+    return f"cache-ibis-table-{md5_kwargs(id=table.id, data_updated=str(table.data_updated))}"
+
+
+def _set_local_schema(key, schema):
+    _local_cache[key] = schema
+    _local_cache.move_to_end(key)
+    while len(_local_cache) > LOCAL_CACHE_SIZE:
+        _local_cache.popitem(last=False)
+
+
+def get_cached_schemas(tables: list["Table"]):
+    """Returns the cached schemas by table id, with one lookup in the shared cache."""
+    keys = {table.id: _get_cache_key(table) for table in tables}
+    schemas = {
+        table_id: _local_cache[key]
+        for table_id, key in keys.items()
+        if key in _local_cache
+    }
+
+    if missing := [key for table_id, key in keys.items() if table_id not in schemas]:
+        shared = cache.get_many(missing)
+        for table_id, key in keys.items():
+            if key in shared:
+                _set_local_schema(key, shared[key])
+                schemas[table_id] = shared[key]
+
+    return schemas
+
+
+def get_cached_schema(table: "Table"):
+    return get_cached_schemas([table]).get(table.id)
+
+
+def set_cached_schemas(schemas: dict["Table", ibis.Schema]):
+    keys = {_get_cache_key(table): schema for table, schema in schemas.items()}
+    for key, schema in keys.items():
+        _set_local_schema(key, schema)
+    cache.set_many(keys, SHARED_CACHE_TIMEOUT)
+
+
+def get_schema_from_columns(columns, type_mapping: dict[str, str]):
+    """Builds the ibis schema from (name, data_type, is_nullable) catalog rows.
+
+    Returns None if a column type has no known mapping, the table is then
+    reflected by the engine instead.
+    """
+    fields = []
+    for name, data_type, is_nullable in columns:
+        if (dtype := type_mapping.get(data_type)) is None:
+            return None
+        fields.append((name, ibis.dtype(dtype).copy(nullable=is_nullable == "YES")))
+    return ibis.schema(fields)
@@ -1,3 +1,4 @@
+import re
 from functools import lru_cache
 from typing import TYPE_CHECKING
 
@@ -9,6 +10,9 @@ from .credentials import get_credentials
 if TYPE_CHECKING:
     from apps.sheets.models import Sheet
 
+# e.g. A1:D100 or B:F
+CELL_RANGE = re.compile(r"^([A-Z]*)([0-9]*):([A-Z]*)([0-9]*)$")
+
 
 @lru_cache
 def google_client():
@@ -16,14 +20,17 @@ def google_client():
     return gspread.authorize(creds)
 
 
-def create_dataframe_from_sheet(sheet: "Sheet"):
+def _get_worksheet(sheet: "Sheet"):
     gc = google_client()
     spreadsheet = gc.open_by_url(sheet.url)
 
     if sheet.sheet_name:
-        worksheet = spreadsheet.worksheet(sheet.sheet_name)
-    else:
-        worksheet = spreadsheet.get_worksheet(0)
+        return spreadsheet.worksheet(sheet.sheet_name)
+    return spreadsheet.get_worksheet(0)
+
+
+def create_dataframe_from_sheet(sheet: "Sheet"):
+    worksheet = _get_worksheet(sheet)
 
     if sheet.cell_range:
         data = worksheet.get(sheet.cell_range)
@@ -32,3 +39,21 @@ def create_dataframe_from_sheet(sheet: "Sheet"):
         return pd.DataFrame(data[1:], columns=data[0])
 
     return pd.DataFrame(worksheet.get_all_records())
+
+
+def get_sample_from_sheet(sheet: "Sheet", num_rows: int):
+    """Fetches the header and the first rows of the sheet with typed values"""
+    worksheet = _get_worksheet(sheet)
+
+    sample_range = f"1:{num_rows + 1}"
+    if sheet.cell_range and (
+        match := CELL_RANGE.match(sheet.cell_range.replace("$", "").upper())
+    ):
+        start_col, start_row, end_col, range_end_row = match.groups()
+        start_row = int(start_row or 1)
+        end_row = start_row + num_rows
+        if range_end_row:
+            end_row = min(end_row, int(range_end_row))
+        sample_range = f"{start_col}{start_row}:{end_col}{end_row}"
+
+    return worksheet.get(sample_range, value_render_option="UNFORMATTED_VALUE")
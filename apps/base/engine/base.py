@@ -1,3 +1,4 @@
+import csv
 import os
 from abc import ABC
 from typing import TYPE_CHECKING
@@ -5,9 +6,14 @@ from typing import TYPE_CHECKING
 import ibis
 import sqlalchemy as sa
 from django.utils import timezone
-from pandas import DataFrame, read_csv, read_json
+from ibis.expr.operations import DatabaseTable
+from ibis.expr.operations.relations import Namespace
+from pandas import DataFrame, read_csv, read_json, read_parquet
 from sqlalchemy import inspect
 
+from apps.base.core.utils import compile_query
+
+from ._schema import get_cached_schema, get_cached_schemas, set_cached_schemas
 from ._sheet import create_dataframe_from_sheet
 
 if TYPE_CHECKING:
@@ -19,20 +25,56 @@ if TYPE_CHECKING:
     from apps.uploads.models import Upload
 
 
+# Number of rows fetched from the database at once during an export
+EXPORT_CHUNK_SIZE = 10_000
+
+
 class BaseClient(ABC):
     client: ibis.BaseBackend
     raw_client: sa.Engine
     excluded_nodes = []
+    # Whether null values are sorted before other values in ascending order
+    nulls_first = True
 
     def __init__(self, engine_url) -> None:
         super().__init__()
         self.engine_url = engine_url
 
     def get_table(self, table: "Table"):
-        return self.client.table(
-            table.name,
-            schema=table.namespace,
-        )
+        """Queries a table through the Ibis client, with a cached schema."""
+        if (schema := get_cached_schema(table)) is not None:
+            return self._get_table_from_schema(table, schema)
+
+        tbl = self.client.table(table.name, schema=table.namespace)
+        set_cached_schemas({table: tbl.schema()})
+        return tbl
+
+    def _get_namespace(self, table: "Table"):
+        return Namespace(schema=table.namespace)
+
+    def _get_table_from_schema(self, table: "Table", schema: ibis.Schema):
+        # the table expression is built without reflecting the table
+        return DatabaseTable(
+            name=table.name,
+            schema=schema,
+            source=self.client,
+            namespace=self._get_namespace(table),
+        ).to_expr()
+
+    def prefetch_schemas(self, tables: list["Table"]):
+        """Caches the schemas of all tables with a single catalog query.
+
+        Used before building the queries for a workflow or dashboard, so every
+        table is not reflected separately.
+        """
+        tables = {table.id: table for table in tables if table is not None}
+        cached = get_cached_schemas(list(tables.values()))
+        if missing := [table for table in tables.values() if table.id not in cached]:
+            set_cached_schemas(self._get_schemas(missing))
+
+    def _get_schemas(self, tables: list["Table"]) -> dict["Table", ibis.Schema]:
+        # engines implement a batched lookup in the INFORMATION_SCHEMA
+        return {}
 
     def create_team_dataset(self, team: "Team"):
         self.client.raw_sql(f"CREATE SCHEMA IF NOT EXISTS {team.tables_dataset_id}")
@@ -75,7 +117,11 @@ class BaseClient(ABC):
 
     def import_table_from_upload(self, table: "Table", upload: "Upload"):
         # TODO: Potentially can use ibis client read_csv when updating ibis
-        df = read_csv(upload.file.path)
+        if upload.has_parquet:
+            with upload.open_parquet() as f:
+                df = read_parquet(f)
+        else:
+            df = read_csv(upload.file.path)
 
         self._df_to_sql(df, table.name, table.namespace)
 
@@ -90,7 +136,7 @@ class BaseClient(ABC):
 
         self._df_to_sql(df, table.name, table.namespace)
 
-    def _df_to_sql(self, df: DataFrame, table_name: str, schema: str):
+    def _create_schema(self, schema: str):
         inspector = inspect(self.raw_client)
 
         if schema not in inspector.get_schema_names():
@@ -98,6 +144,9 @@ class BaseClient(ABC):
                 conn.execute(sa.schema.CreateSchema(schema))
                 conn.commit()
 
+    def _df_to_sql(self, df: DataFrame, table_name: str, schema: str):
+        self._create_schema(schema)
+
         df.to_sql(
             table_name,
             con=self.raw_client,
@@ -115,15 +164,24 @@ class BaseClient(ABC):
         return self.create_or_replace_table(to_table, f"SELECT * FROM {from_table}")
 
     def export_to_csv(self, query, export: "Export"):
-        """Exports a query to a csv on GCS"""
+        """Exports a query to a csv on GCS
 
-        df = query.execute()
+        The rows are streamed with a server-side cursor and written in chunks,
+        the memory use does not depend on the size of the result.
+        """
 
         dir = os.path.dirname(export.file.path)
         if not os.path.exists(dir):
             os.makedirs(dir)
 
-        df.to_csv(export.file.path, index=False)
+        with self.raw_client.connect().execution_options(
+            stream_results=True, max_row_buffer=EXPORT_CHUNK_SIZE
+        ) as conn, open(export.file.path, "w", newline="") as f:
+            result = conn.exec_driver_sql(compile_query(query))
+            writer = csv.writer(f)
+            writer.writerow(result.keys())
+            for rows in result.partitions(EXPORT_CHUNK_SIZE):
+                writer.writerows(rows)
 
     def get_dashboard_url(self):
         # only implemented for BigQuery
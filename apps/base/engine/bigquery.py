@@ -1,4 +1,7 @@
+import csv
+import io
 import re
+from collections import defaultdict
 from functools import lru_cache
 from typing import TYPE_CHECKING
 
@@ -6,19 +9,20 @@ import beeline
 import ibis
 import pandas as pd
 from django.conf import settings
-from django.core.cache import cache
 from google.cloud import bigquery as bq
 from ibis.backends.bigquery import Backend
 from ibis.config import options
-from ibis.expr.operations import DatabaseTable
 from ibis.expr.operations.relations import Namespace
 from apps.base.core.bigquery import (
     bq_table_schema_is_string_only,
+    sample_is_string_only,
     sanitize_bq_column_name,
 )
-from apps.base.core.utils import excel_colnum_string, md5_kwargs
+from apps.base.core.utils import excel_colnum_string
 from apps.base.engine.base import BaseClient
 
+from ._schema import get_schema_from_columns
+from ._sheet import get_sample_from_sheet
 from .credentials import get_credentials
 
 if TYPE_CHECKING:
@@ -62,23 +66,6 @@ def execute(self, expr, params=None, limit="default", **kwargs):
 Backend.execute = execute
 
 
-def _create_external_table(upload: "Upload", table_id: str, **job_kwargs):
-    # https://cloud.google.com/bigquery/external-data-drive#python
-    external_config = bq.ExternalConfig("CSV")
-    external_config.source_uris = [upload.gcs_uri]
-    external_config.options.field_delimiter = upload.field_delimiter_char
-    external_config.options.allow_quoted_newlines = True
-    external_config.options.allow_jagged_rows = True
-
-    for k, v in job_kwargs.items():
-        if k == "skip_leading_rows":
-            setattr(external_config.options, k, v)
-        else:
-            setattr(external_config, k, v)
-
-    return bq.QueryJobConfig(table_definitions={table_id: external_config})
-
-
 def _load_table(upload: "Upload", table: "Table", client: bq.Client, **job_kwargs):
     job_config = bq.LoadJobConfig(
         source_format=bq.SourceFormat.CSV,
@@ -97,6 +84,21 @@ def _load_table(upload: "Upload", table: "Table", client: bq.Client, **job_kwarg
         raise Exception(load_job.errors[0]["message"])
 
 
+def _load_table_parquet(upload: "Upload", table: "Table", client: bq.Client):
+    # the parquet file has the column names and types, nothing to detect
+    job_config = bq.LoadJobConfig(
+        source_format=bq.SourceFormat.PARQUET,
+        write_disposition=bq.WriteDisposition.WRITE_TRUNCATE,
+    )
+
+    load_job = client.load_table_from_uri(
+        upload.parquet_uri, table.fqn, job_config=job_config
+    )
+
+    if load_job.exception():
+        raise Exception(load_job.errors[0]["message"])
+
+
 def _create_external_table_sheet(
     sheet: "Sheet", table_id: str, **job_kwargs
 ) -> bq.ExternalConfig:
@@ -128,6 +130,45 @@ def _create_external_table_sheet(
     )
 
 
+# Size of the sample used to detect the header and the column types
+SAMPLE_BYTES = 64 * 1024
+SAMPLE_ROWS = 100
+
+
+def _get_sample_from_upload(upload: "Upload"):
+    """Reads the header and the first rows from the start of the file on GCS"""
+    from apps.base.clients import get_bucket
+
+    content = (
+        get_bucket()
+        .blob(upload.file.name)
+        .download_as_bytes(start=0, end=SAMPLE_BYTES - 1)
+        .decode("utf-8", errors="ignore")
+    )
+    # the last line is likely cut off
+    if len(content) >= SAMPLE_BYTES and "\n" in content:
+        content = content[: content.rindex("\n")]
+
+    header, *rows = list(
+        csv.reader(io.StringIO(content), delimiter=upload.field_delimiter_char)
+    ) or [[]]
+    return header, rows
+
+
+def _get_string_schema(header, rows):
+    if not header:
+        raise Exception(
+            "Error: We weren't able to automatically detect the schema of your upload."
+        )
+    # jagged rows can have more columns than the header
+    num_columns = max(len(row) for row in [header, *rows])
+    names = [
+        *(sanitize_bq_column_name(str(field)) for field in header),
+        *(f"string_field_{idx}" for idx in range(len(header), num_columns)),
+    ]
+    return [bq.SchemaField(name, "STRING") for name in names]
+
+
 CONVERSION_ERROR = re.compile(
     "Could not convert value to (.*). Row ([0-9]*); Col ([0-9]*)"
 )
@@ -167,8 +208,22 @@ def bigquery():
     )
 
 
-def _get_cache_key_for_table(table):
-    return f"cache-ibis-table-{md5_kwargs(id=table.id, data_updated=str(table.data_updated))}"
+# INFORMATION_SCHEMA data types to the ibis types of the BigQuery backend, nested
+# and parametrized types are reflected instead
+BIGQUERY_TYPES = {
+    "INT64": "int64",
+    "FLOAT64": "float64",
+    "NUMERIC": "decimal(38, 9)",
+    "BIGNUMERIC": "decimal(76, 38)",
+    "BOOL": "boolean",
+    "STRING": "string",
+    "BYTES": "binary",
+    "DATE": "date",
+    "DATETIME": "timestamp",
+    "TIME": "time",
+    "TIMESTAMP": "timestamp('UTC')",
+    "JSON": "json",
+}
 
 
 class BigQueryClient(BaseClient):
@@ -180,80 +235,83 @@ class BigQueryClient(BaseClient):
             project_id=self.gcp_project, auth_external_data=True
         )
 
-    def get_table(self, table: "Table"):
-        """
-        Queries a bigquery table through Ibis client with caching.
-        """
-
-        # TODO: abstract this for other engines, with a generic wrapper and
-        # custom engine method for deserializing the table from schema
-
-        key = _get_cache_key_for_table(table)
-        schema = cache.get(key)
+    def _get_namespace(self, table: "Table"):
+        return Namespace(schema=f"{self.gcp_project}.{table.namespace}")
+
+    def _get_schemas(self, tables: list["Table"]):
+        tables_by_dataset = defaultdict(list)
+        for table in tables:
+            tables_by_dataset[table.namespace].append(table)
+
+        schemas = {}
+        # one query per dataset, usually all tables belong to the team dataset
+        for dataset, dataset_tables in tables_by_dataset.items():
+            result = bigquery().query_and_wait(
+                "SELECT table_name, column_name, data_type, is_nullable "
+                f"FROM `{self.gcp_project}.{dataset}`.INFORMATION_SCHEMA.COLUMNS "
+                "WHERE table_name IN UNNEST(@table_names) "
+                "ORDER BY table_name, ordinal_position",
+                job_config=bq.QueryJobConfig(
+                    query_parameters=[
+                        bq.ArrayQueryParameter(
+                            "table_names", "STRING", [t.name for t in dataset_tables]
+                        )
+                    ]
+                ),
+            )
+            columns = defaultdict(list)
+            for row in result:
+                columns[row.table_name].append(
+                    (row.column_name, row.data_type, row.is_nullable)
+                )
 
-        if schema is None:
-            tbl = self.client.table(table.name, schema=table.namespace)
-            cache.set(key, tbl.schema(), 24 * 3600)
-        else:
-            tbl = DatabaseTable(
-                name=f"{table.name}",
-                schema=schema,
-                source=self.client,
-                namespace=Namespace(schema=f"{self.gcp_project}.{table.namespace}"),
-            ).to_expr()
+            for table in dataset_tables:
+                if table.name in columns and (
+                    schema := get_schema_from_columns(
+                        columns[table.name], BIGQUERY_TYPES
+                    )
+                ):
+                    schemas[table] = schema
 
-        return tbl
+        return schemas
 
     def _get_bigquery_object(self, fqn):
         return bigquery().get_table(fqn)
 
     def import_table_from_upload(self, table: "Table", upload: "Upload"):
         client = bigquery()
-        _load_table(upload, table, client, autodetect=True, skip_leading_rows=1)
+
+        if upload.has_parquet:
+            _load_table_parquet(upload, table, client)
+            return
 
         # bigquery does not autodetect the column names if all columns are strings
         # https://cloud.google.com/bigquery/docs/schema-detect#csv_header
-        # the recommended approach for cost is to reload into bigquery rather than updating names
-        # https://cloud.google.com/bigquery/docs/manually-changing-schemas#option_2_exporting_your_data_and_loading_it_into_a_new_table
-
-        if bq_table_schema_is_string_only(self._get_bigquery_object(table.fqn)):
-            # create temporary table without skipping the header row, so we can get the header names
-
-            temp_table_id = f"{table.name}_temp"
+        # instead of loading twice, the header and types are sniffed beforehand
+        header, rows = _get_sample_from_upload(upload)
 
-            job_config = _create_external_table(
-                upload, temp_table_id, autodetect=True, skip_leading_rows=0
-            )
-
-            # bigquery does not guarantee the order of rows
-            header_query = client.query(
-                f"select * from (select * from {temp_table_id} except distinct select * from {table.fqn}) limit 1",
-                job_config=job_config,
+        if sample_is_string_only(rows):
+            _load_table(
+                upload,
+                table,
+                client,
+                skip_leading_rows=1,
+                schema=_get_string_schema(header, rows),
             )
+            return
 
-            header_rows = list(header_query.result())
-            if len(header_rows) == 0:
-                raise Exception(
-                    "Error: We weren't able to automatically detect the schema of your upload."
-                )
-
-            header_values = header_rows[0].values()
-
-            # use the header row to provide an explicit schema
+        _load_table(upload, table, client, autodetect=True, skip_leading_rows=1)
 
+        # the sample is not representative for the whole file
+        if bq_table_schema_is_string_only(self._get_bigquery_object(table.fqn)):
             _load_table(
                 upload,
                 table,
                 client,
                 skip_leading_rows=1,
-                schema=[
-                    bq.SchemaField(sanitize_bq_column_name(field), "STRING")
-                    for field in header_values
-                ],
+                schema=_get_string_schema(header, rows),
             )
 
-        return
-
     def create_or_replace_table(self, table_id: str, query):
         # TODO: Update to ibis 7 to support create_table with overwrite=True
         self.client.raw_sql(f"CREATE OR REPLACE TABLE {table_id} as " f"({query})")
@@ -303,46 +361,26 @@ class BigQueryClient(BaseClient):
         https://cloud.google.com/bigquery/docs/tables-intro
         """
 
-        client = bigquery()
+        # see import_table_from_upload for motivation
+        header, *rows = get_sample_from_sheet(sheet, SAMPLE_ROWS) or [[]]
 
-        _load_table_sheet(sheet, table, autodetect=True)
-
-        # see apps/uploads/bigquery.py for motivation
-
-        if bq_table_schema_is_string_only(self._get_bigquery_object(table.fqn)):
-            # create temporary table but skipping the header rows
-
-            temp_table_id = f"{table.name}_temp"
-
-            job_config = _create_external_table_sheet(
-                sheet, temp_table_id, autodetect=True, skip_leading_rows=1
-            )
-
-            # bigquery does not guarantee the order of rows
-
-            header_query = client.query(
-                f"select * from (select * from {table.fqn} except distinct select * from {temp_table_id}) limit 1",
-                job_config=job_config,
+        if sample_is_string_only(rows):
+            _load_table_sheet(
+                sheet,
+                table,
+                skip_leading_rows=1,
+                schema=_get_string_schema(header, rows),
             )
+            return
 
-            header_rows = list(header_query.result())
-            if len(header_rows) == 0:
-                raise Exception(
-                    "Error: We weren't able to automatically detect the schema of your sheet."
-                )
-
-            header_values = header_rows[0].values()
-
-            # use the header row to provide an explicit schema
+        _load_table_sheet(sheet, table, autodetect=True)
 
+        if bq_table_schema_is_string_only(self._get_bigquery_object(table.fqn)):
             _load_table_sheet(
                 sheet,
                 table,
                 skip_leading_rows=1,
-                schema=[
-                    bq.SchemaField(sanitize_bq_column_name(field), "STRING")
-                    for field in header_values
-                ],
+                schema=_get_string_schema(header, rows),
             )
 
     def export_to_csv(self, query, export: "Export"):
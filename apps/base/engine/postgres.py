@@ -1,24 +1,230 @@
+from collections import defaultdict
 from functools import lru_cache
+from io import StringIO
+from typing import TYPE_CHECKING, Iterable
+from uuid import uuid4
 
 import ibis
+import pyarrow.parquet as pq
+import sqlalchemy as sa
+from pandas import DataFrame, DatetimeTZDtype, read_csv, read_json
+from pandas.api.types import infer_dtype, is_integer_dtype
 from sqlalchemy import create_engine
 
 from apps.base.engine.base import BaseClient
 
+from ._schema import get_schema_from_columns
+from ._sheet import create_dataframe_from_sheet
+
+if TYPE_CHECKING:
+    from apps.customapis.models import CustomApi
+    from apps.sheets.models import Sheet
+    from apps.tables.models import Table
+    from apps.uploads.models import Upload
+
+# Number of rows held in memory and copied at once, the column types are
+# widened whenever a later chunk doesn't fit them
+COPY_CHUNK_SIZE = 100_000
+
+# Inferred pandas types to the column types of `DataFrame.to_sql`, other
+# values (e.g. strings or mixed types) are stored as text
+SQL_TYPES = {
+    "boolean": "boolean",
+    "integer": "bigint",
+    "floating": "double precision",
+    "mixed-integer-float": "double precision",
+    "date": "date",
+    "time": "time",
+    "datetime": "timestamp",
+    "datetime64": "timestamp",
+}
+NUMERIC_TYPES = {"bigint", "double precision"}
+
+# INFORMATION_SCHEMA data types to the ibis types of the Postgres backend, other
+# types (e.g. numeric, arrays or time zones) are reflected instead
+POSTGRES_TYPES = {
+    "smallint": "int16",
+    "integer": "int32",
+    "bigint": "int64",
+    "real": "float32",
+    "double precision": "float64",
+    "boolean": "boolean",
+    "text": "string",
+    "character varying": "string",
+    "date": "date",
+    "timestamp without time zone": "timestamp",
+    "json": "json",
+    "jsonb": "json",
+}
+
 
 @lru_cache
 def postgres(engine_url):
     return create_engine(engine_url)
 
 
+def _read_parquet_chunks(upload: "Upload"):
+    with upload.open_parquet() as f:
+        parquet_file = pq.ParquetFile(f)
+        # the empty table keeps the column types, even if the file has no rows
+        yield parquet_file.schema_arrow.empty_table().to_pandas()
+        for batch in parquet_file.iter_batches(batch_size=COPY_CHUNK_SIZE):
+            # integers with nulls are not converted to floats
+            yield batch.to_pandas(integer_object_nulls=True)
+
+
+def _get_column_type(series):
+    """The column type of the values, None if they are all null."""
+    if isinstance(series.dtype, DatetimeTZDtype):
+        return "timestamp with time zone"
+    if (inferred := infer_dtype(series, skipna=True)) == "empty":
+        return None
+    # e.g. pandas reads integers as floats in a chunk with a missing value
+    if inferred == "floating" and series.dropna().mod(1).eq(0).all():
+        return "bigint"
+    return SQL_TYPES.get(inferred, "text")
+
+
+def _widen_column_type(current, new):
+    """The narrowest column type for the values of both types."""
+    if current is None or current == new:
+        return new
+    if new is None:
+        return current
+    if {current, new} <= NUMERIC_TYPES:
+        return "double precision"
+    return "text"
+
+
+def _get_alter_actions(chunk: DataFrame, types: dict, quote):
+    """Adds and widens the columns for the chunk, `types` is updated in place."""
+    actions = []
+    for column in chunk.columns:
+        type_ = _get_column_type(chunk[column])
+        if column not in types:
+            # columns without a type are created as text
+            actions.append(f"ADD COLUMN {quote(column)} {type_ or 'text'}")
+        elif (type_ := _widen_column_type(types[column], type_)) and (
+            type_ != (types[column] or "text")
+        ):
+            actions.append(
+                f"ALTER COLUMN {quote(column)} TYPE {type_} "
+                f"USING {quote(column)}::{type_}"
+            )
+        types[column] = type_
+    return actions
+
+
 class PostgresClient(BaseClient):
     # Both pivot and unpivot are currently unique to BigQuery
     # TODO: Distinct relies on a custom any_value function
     # that I havent managed to replace yet
     excluded_nodes = ["pivot", "unpivot", "distinct"]
+    nulls_first = False
 
     def __init__(self, engine_url):
         super().__init__(engine_url)
 
         self.client = ibis.postgres.connect(url=self.engine_url)
         self.raw_client = postgres(self.engine_url)
+
+    def _get_schemas(self, tables: list["Table"]):
+        with self.raw_client.connect() as conn:
+            result = conn.execute(
+                sa.text(
+                    "SELECT table_schema, table_name, column_name, data_type, "
+                    "is_nullable FROM information_schema.columns "
+                    "WHERE table_schema = ANY(:schemas) AND table_name = ANY(:names) "
+                    "ORDER BY table_schema, table_name, ordinal_position"
+                ),
+                {
+                    "schemas": list({table.namespace for table in tables}),
+                    "names": list({table.name for table in tables}),
+                },
+            )
+            columns = defaultdict(list)
+            for row in result:
+                columns[(row.table_schema, row.table_name)].append(
+                    (row.column_name, row.data_type, row.is_nullable)
+                )
+
+        schemas = {}
+        for table in tables:
+            if (key := (table.namespace, table.name)) in columns and (
+                schema := get_schema_from_columns(columns[key], POSTGRES_TYPES)
+            ):
+                schemas[table] = schema
+        return schemas
+
+    def import_table_from_upload(self, table: "Table", upload: "Upload"):
+        if upload.has_parquet:
+            chunks = _read_parquet_chunks(upload)
+        else:
+            chunks = read_csv(upload.file.path, chunksize=COPY_CHUNK_SIZE)
+
+        self._copy_to_sql(chunks, table.name, table.namespace)
+
+    def import_table_from_customapi(self, table: "Table", customapi: "CustomApi"):
+        chunks = read_json(customapi.file.path, lines=True, chunksize=COPY_CHUNK_SIZE)
+
+        self._copy_to_sql(chunks, table.name, table.namespace)
+
+    def import_table_from_sheet(self, table: "Table", sheet: "Sheet"):
+        df = create_dataframe_from_sheet(sheet)
+
+        self._copy_to_sql([df], table.name, table.namespace)
+
+    def _copy_to_sql(self, chunks: Iterable[DataFrame], table_name: str, schema: str):
+        """Loads the chunks with COPY into a staging table and swaps it in.
+
+        Compared to `DataFrame.to_sql`, the rows are not inserted one by one and
+        the file is never fully loaded into memory. The column types are widened
+        for chunks that don't fit them, e.g. integers followed by decimals.
+        """
+        self._create_schema(schema)
+        quote = self.raw_client.dialect.identifier_preparer.quote
+
+        # syncs of the same table can overlap
+        staging = f"{quote(schema)}.{quote(f'staging_{uuid4().hex}')}"
+        target = f"{quote(schema)}.{quote(table_name)}"
+
+        # the inferred type of each column, None while all its values are null
+        types = {}
+
+        conn = self.raw_client.raw_connection()
+        try:
+            with conn.cursor() as cursor:
+                # an ordinary table, created in the same transaction as the swap.
+                # DDL is transactional in Postgres, the rollback of a failed load
+                # also drops the table.
+                cursor.execute(f"CREATE TABLE {staging} ()")
+                for chunk in chunks:
+                    if actions := _get_alter_actions(chunk, types, quote):
+                        cursor.execute(f"ALTER TABLE {staging} {', '.join(actions)}")
+
+                    # e.g. integers read as floats are written without decimals
+                    chunk = chunk.assign(
+                        **{
+                            column: chunk[column].astype("Int64")
+                            for column in chunk.columns
+                            if types[column] == "bigint"
+                            and not is_integer_dtype(chunk[column])
+                        }
+                    )
+                    columns = ", ".join(quote(column) for column in chunk.columns)
+                    buffer = StringIO()
+                    chunk.to_csv(buffer, index=False, header=False)
+                    buffer.seek(0)
+                    cursor.copy_expert(
+                        f"COPY {staging} ({columns}) FROM STDIN WITH (FORMAT csv)",
+                        buffer,
+                    )
+
+                cursor.execute(f"DROP TABLE IF EXISTS {target}")
+                cursor.execute(f"ALTER TABLE {staging} RENAME TO {quote(table_name)}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
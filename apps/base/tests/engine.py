@@ -76,6 +76,16 @@ class MockEngine:
         query.exception.return_value = False
         self.query = mocker.patch.object(Client, "query", return_value=query)
 
+        # header and first rows used to detect the schema before loading
+        self.upload_sample = mocker.patch(
+            "apps.base.engine.bigquery._get_sample_from_upload",
+            return_value=(["Name", "Age"], [["Neera", "4"]]),
+        )
+        self.sheet_sample = mocker.patch(
+            "apps.base.engine.bigquery.get_sample_from_sheet",
+            return_value=[["Name", "Age"], ["Neera", 4]],
+        )
+
     def set_data(self, data):
         return self.mocker.patch.object(Backend, "execute", return_value=data)
 
@@ -2,6 +2,7 @@ import os
 from unittest.mock import MagicMock
 
 import pytest
+import sqlalchemy as sa
 import waffle
 from django.db import connection
 from django.http import HttpResponse
@@ -31,6 +32,42 @@ def with_pg_trgm_extension():
     yield
 
 
+def _get_test_database_url():
+    settings_dict = connection.settings_dict
+    return sa.engine.URL.create(
+        "postgresql",
+        username=settings_dict["USER"],
+        password=settings_dict["PASSWORD"],
+        host=settings_dict["HOST"],
+        port=settings_dict["PORT"],
+        database=settings_dict["NAME"],
+    ).render_as_string(hide_password=False)
+
+
+@pytest.fixture
+def postgres_client(mocker):
+    """The Postgres engine connected to the test database, without ibis."""
+    from apps.base.engine.postgres import PostgresClient
+
+    mocker.patch("apps.base.engine.postgres.ibis")
+    client = PostgresClient(_get_test_database_url())
+    yield client
+    client.raw_client.dispose()
+
+
+@pytest.fixture
+def postgres_engine(settings):
+    """The Postgres engine returned by `get_engine`, connected to the test database."""
+    from apps.base.clients import get_engine
+
+    settings.ENGINE_URL = _get_test_database_url()
+    get_engine.cache_clear()
+    engine = get_engine()
+    yield engine
+    engine.raw_client.dispose()
+    get_engine.cache_clear()
+
+
 @pytest.fixture(autouse=True)
 def patches(mocker, settings):
     settings.TEST = True
@@ -68,6 +105,7 @@ def patches(mocker, settings):
 @pytest.fixture(autouse=True)
 def sheets(mocker):
     client = MagicMock()
+    client.spreadsheets().values().get().execute.return_value = {"values": []}
     mocker.patch("apps.base.clients.sheets", return_value=client)
     yield client
 
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+import sqlalchemy as sa
+
+pytestmark = pytest.mark.django_db
+
+SCHEMA = "test_copy"
+
+
+@pytest.fixture
+def postgres(postgres_client):
+    yield postgres_client
+    with postgres_client.raw_client.connect() as conn:
+        conn.execute(sa.text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.commit()
+
+
+def _query(client, sql):
+    with client.raw_client.connect() as conn:
+        return conn.execute(sa.text(sql)).fetchall()
+
+
+def _get_types(client, table_name):
+    return dict(
+        _query(
+            client,
+            "SELECT column_name, data_type FROM information_schema.columns "
+            f"WHERE table_schema = '{SCHEMA}' AND table_name = '{table_name}'",
+        )
+    )
+
+
+def test_copy_to_sql_widens_types(postgres):
+    chunks = [
+        pd.DataFrame(
+            {"id": [1, 2], "score": [1, 2], "name": ["Neera", "Vayu"], "note": None}
+        ),
+        # pandas reads each chunk with its own types
+        pd.DataFrame(
+            {
+                "id": [3.0, np.nan],
+                "score": [2.5, 3.0],
+                "name": [4, 5],
+                "note": ["late", None],
+                "extra": [True, False],
+            }
+        ),
+    ]
+
+    postgres._copy_to_sql(chunks, "athletes", SCHEMA)
+
+    assert _get_types(postgres, "athletes") == {
+        "id": "bigint",
+        "score": "double precision",
+        "name": "text",
+        "note": "text",
+        "extra": "boolean",
+    }
+    assert _query(
+        postgres,
+        f"SELECT id, score, name, note, extra FROM {SCHEMA}.athletes ORDER BY score",
+    ) == [
+        (1, 1.0, "Neera", None, None),
+        (2, 2.0, "Vayu", None, None),
+        (3, 2.5, "4", "late", True),
+        (None, 3.0, "5", None, False),
+    ]
+
+
+def test_copy_to_sql_swap_and_rollback(postgres):
+    postgres._copy_to_sql([pd.DataFrame({"id": [1, 2]})], "athletes", SCHEMA)
+    postgres._copy_to_sql([pd.DataFrame({"id": [3]})], "athletes", SCHEMA)
+
+    # the table is replaced
+    assert _query(postgres, f"SELECT id FROM {SCHEMA}.athletes") == [(3,)]
+
+    def failing_chunks():
+        yield pd.DataFrame({"id": [4]})
+        raise ValueError
+
+    with pytest.raises(ValueError):
+        postgres._copy_to_sql(failing_chunks(), "athletes", SCHEMA)
+
+    # the previous table is kept, without a staging table
+    assert _query(postgres, f"SELECT id FROM {SCHEMA}.athletes") == [(3,)]
+    assert _query(
+        postgres,
+        "SELECT table_name FROM information_schema.tables "
+        f"WHERE table_schema = '{SCHEMA}'",
+    ) == [("athletes",)]
@@ -0,0 +1,134 @@
+import pandas as pd
+import pytest
+from django.utils import timezone
+
+from apps.base.core.table_data import _get_keyset_predicate, get_table
+from apps.base.core.utils import md5
+
+pytestmark = pytest.mark.django_db
+
+# the grid sorts ascending on the aliases starting with "-"
+ASCENDING = f"-{md5('medals')}"
+DESCENDING = md5("medals")
+
+
+@pytest.fixture
+def grid(engine, mocker):
+    def _grid(*aliases):
+        table = get_table(
+            engine.data.schema(), engine.data, data_updated=timezone.now()
+        )
+        table.request = mocker.MagicMock(GET={"page": "1"})
+        if aliases:
+            table.data.order_by(aliases)
+        return table.data
+
+    return _grid
+
+
+def _get_page(engine, table_data, page, medals):
+    execute = engine.set_data(pd.DataFrame({"medals": medals}))
+    table_data[page]
+    # the page query runs first, then the count of the total rows
+    return execute.call_args_list[0].args[0]
+
+
+def test_keyset_predicate(engine):
+    data = engine.data
+    medals, stars = data.medals, data.stars
+
+    # null values are sorted first by BigQuery and last by Postgres
+    assert _get_keyset_predicate(data, [("medals", True)], [3], True).equals(
+        (medals > 3) | (medals == 3)
+    )
+    assert _get_keyset_predicate(data, [("medals", True)], [3], False).equals(
+        ((medals > 3) | medals.isnull()) | (medals == 3)
+    )
+    assert _get_keyset_predicate(data, [("medals", False)], [3], True).equals(
+        ((medals < 3) | medals.isnull()) | (medals == 3)
+    )
+    assert _get_keyset_predicate(data, [("medals", False)], [3], False).equals(
+        (medals < 3) | (medals == 3)
+    )
+
+    # a lexicographic comparison on several sort keys
+    assert _get_keyset_predicate(
+        data, [("medals", True), ("stars", False)], [3, 4.5], True
+    ).equals(
+        (medals > 3)
+        | ((medals == 3) & ((stars < 4.5) | stars.isnull()))
+        | ((medals == 3) & (stars == 4.5))
+    )
+
+
+def test_keyset_ascending(engine, grid):
+    table_data = grid(ASCENDING)
+    data = table_data.data
+
+    assert _get_page(engine, table_data, slice(0, 3), [1, 2, 3]).equals(data)
+    assert _get_page(engine, table_data, slice(3, 6), [4, 5, 6]).equals(
+        data.filter((data.medals > 3) | (data.medals == 3)).limit(3, offset=1)
+    )
+    assert _get_page(engine, table_data, slice(6, 9), [7, 8, 9]).equals(
+        data.filter((data.medals > 6) | (data.medals == 6)).limit(3, offset=1)
+    )
+
+
+def test_keyset_descending(engine, grid):
+    table_data = grid(DESCENDING)
+    data = table_data.data
+
+    _get_page(engine, table_data, slice(0, 3), [9, 8, 7])
+    assert _get_page(engine, table_data, slice(3, 6), [6, 5, 4]).equals(
+        data.filter(
+            ((data.medals < 7) | data.medals.isnull()) | (data.medals == 7)
+        ).limit(3, offset=1)
+    )
+
+
+def test_keyset_null_sort_key(engine, grid):
+    table_data = grid(ASCENDING)
+    data = table_data.data
+
+    # null values can't be compared, the next page falls back to an offset
+    _get_page(engine, table_data, slice(0, 3), [1, 2, None])
+    assert _get_page(engine, table_data, slice(3, 6), [None, None, None]).equals(
+        data.limit(3, offset=3)
+    )
+
+
+def test_keyset_ties(engine, grid):
+    table_data = grid(ASCENDING)
+    data = table_data.data
+    predicate = (data.medals > 3) | (data.medals == 3)
+
+    # the rows sharing the last value are skipped with an offset
+    _get_page(engine, table_data, slice(0, 3), [1, 3, 3])
+    assert _get_page(engine, table_data, slice(3, 6), [3, 3, 3]).equals(
+        data.filter(predicate).limit(3, offset=2)
+    )
+
+    # the ties continue over a page with a single value
+    assert _get_page(engine, table_data, slice(6, 9), [3, 4, 5]).equals(
+        data.filter(predicate).limit(3, offset=5)
+    )
+
+
+def test_offset_fallback(engine, grid):
+    # unsorted grids have no keyset
+    table_data = grid()
+    data = table_data.data
+
+    _get_page(engine, table_data, slice(0, 3), [1, 2, 3])
+    assert _get_page(engine, table_data, slice(3, 6), [4, 5, 6]).equals(
+        data.limit(3, offset=3)
+    )
+
+    # a jump to a page without the keyset of the previous page
+    table_data = grid(ASCENDING)
+    data = table_data.data
+
+    _get_page(engine, table_data, slice(0, 3), [1, 2, 3])
+    assert _get_page(engine, table_data, slice(12, 15), [13, 14, 15]).equals(
+        data.limit(3, offset=12)
+    )
@@ -6,6 +6,8 @@ from django.db.models import TextChoices
 from ibis.expr import datatypes as idt
 from lark import Lark
 
+from apps.base.clients import get_engine
+from apps.base.core.utils import compile_query
 from apps.columns.exceptions import ParseError
 from apps.columns.transformer import TreeToIbis
 
@@ -203,3 +205,87 @@ def aggregate_columns(query, aggregations, groups):
         return query.aggregate(aggregations)
 
     return query.agg(count=ibis._.count())
+
+
+# 1 for the summary row of `aggregate_columns_with_summary`, 0 otherwise
+SUMMARY_COLUMN = "__summary__"
+
+# Compiled by hand, ibis has no grouping sets
+AGGREGATION_SQL = {
+    "sum": "SUM({})",
+    "count": "COUNT({})",
+    "nunique": "COUNT(DISTINCT {})",
+    "mean": "AVG({})",
+    "max": "MAX({})",
+    "min": "MIN({})",
+    "std": "STDDEV_SAMP({})",
+}
+
+
+def aggregate_columns_with_summary(query, aggregations, groups):
+    """Aggregates like `aggregate_columns` and adds the summary row in the same query.
+
+    The groups and the grand total are computed with `GROUPING SETS`, which
+    scans the data once, the `SUMMARY_COLUMN` tells the rows apart.
+    """
+    column_names = [agg.column for agg in aggregations]
+    schema = aggregate_columns(query, aggregations, groups).schema()
+
+    values = []
+    for agg in aggregations:
+        value = query[agg.column]
+        # e.g. ibis sums booleans as integers
+        if isinstance(value.type(), idt.Boolean) and agg.function in [
+            "sum",
+            "mean",
+            "std",
+        ]:
+            value = value.cast("int64")
+        values.append(value)
+
+    group_names = [f"group_{idx}" for idx in range(len(groups))]
+    prepared = query.select(
+        *(group.name(name) for group, name in zip(groups, group_names)),
+        *(value.name(f"value_{idx}") for idx, value in enumerate(values)),
+    )
+    selection = [
+        *group_names,
+        *(
+            AGGREGATION_SQL[agg.function].format(f"value_{idx}")
+            + f" AS aggregation_{idx}"
+            for idx, agg in enumerate(aggregations)
+        ),
+        f"GROUPING({group_names[0]}) AS {SUMMARY_COLUMN}",
+    ]
+    sql = (
+        f"SELECT {', '.join(selection)} FROM ({compile_query(prepared)}) AS prepared"
+        f" GROUP BY GROUPING SETS (({', '.join(group_names)}), ())"
+    )
+
+    names = [
+        *(group.get_name() for group in groups),
+        *(
+            resolve_colname(agg.column, agg.function, column_names)
+            for agg in aggregations
+        ),
+    ]
+    internal_names = [
+        *group_names,
+        *(f"aggregation_{idx}" for idx in range(len(aggregations))),
+    ]
+    result = get_engine().client.sql(
+        sql,
+        schema=ibis.schema(
+            [
+                *(
+                    (internal, schema[name])
+                    for internal, name in zip(internal_names, names)
+                ),
+                (SUMMARY_COLUMN, "int64"),
+            ]
+        ),
+    )
+    return result.select(
+        *(result[internal].name(name) for internal, name in zip(internal_names, names)),
+        SUMMARY_COLUMN,
+    )
@@ -429,3 +429,24 @@ def slice_query(query, column, control, use_previous_period):
         query = query[query[column] <= control.end]
 
     return query
+
+
+class _PredicateQuery:
+    """Stands in for the query in a date range function, which then returns its
+    predicate instead of the filtered query."""
+
+    def __init__(self, query):
+        self._query = query
+
+    def __getitem__(self, key):
+        return self._query[key] if isinstance(key, str) else key
+
+
+def get_period_predicates(query, column, control):
+    """Returns the predicates of the current and previous period of a relative
+    date range, e.g. to aggregate both periods in the same query."""
+    func = DATETIME_FILTERS[control.date_range]
+    return (
+        func["function"](_PredicateQuery(query), column),
+        func["previous_function"](_PredicateQuery(query), column),
+    )
@@ -156,6 +156,13 @@ class CustomApiUpdateForm(ModelForm):
             "body",
             "body_raw",
             "body_binary",
+            "pagination",
+            "pagination_param",
+            "pagination_start",
+            "pagination_page_size_param",
+            "pagination_page_size",
+            "pagination_cursor_path",
+            "pagination_max_pages",
         ]
         formsets = {
             "queryparams": QueryParamFormset,
@@ -175,6 +182,12 @@ class CustomApiUpdateForm(ModelForm):
             "body_binary": f"body == '{CustomApi.Body.BINARY}'",
             "formdataentries": f"body == '{CustomApi.Body.FORM_DATA}'",
             "formurlencodedentries": f"body == '{CustomApi.Body.X_WWW_FORM_URLENCODED}'",
+            "pagination_param": f"pagination != '{CustomApi.Pagination.NONE}' && pagination != '{CustomApi.Pagination.LINK_HEADER}'",
+            "pagination_start": f"pagination == '{CustomApi.Pagination.PAGE_NUMBER}' || pagination == '{CustomApi.Pagination.OFFSET}'",
+            "pagination_page_size_param": f"pagination != '{CustomApi.Pagination.NONE}'",
+            "pagination_page_size": f"pagination != '{CustomApi.Pagination.NONE}'",
+            "pagination_cursor_path": f"pagination == '{CustomApi.Pagination.CURSOR}'",
+            "pagination_max_pages": f"pagination != '{CustomApi.Pagination.NONE}'",
         }
         widgets = {
             "api_key_value": forms.PasswordInput(render_value=True),
@@ -191,11 +204,22 @@ class CustomApiUpdateForm(ModelForm):
             "oauth2": "OAuth2",
             "body_raw": "Raw",
             "body_binary": "Binary",
+            "pagination_param": "Query Param",
+            "pagination_start": "Start",
+            "pagination_page_size_param": "Page Size Query Param",
+            "pagination_page_size": "Page Size",
+            "pagination_cursor_path": "Cursor JSON Path",
+            "pagination_max_pages": "Maximum Pages",
         }
         help_texts = {
             "json_path": mark_safe(
                 'Extract part of the JSON result, e.g. under a specific key <a href="https://github.com/json-path/JSONPath#operators" class="link">learn more</a>'
-            )
+            ),
+            "pagination": "Fetch every page of the API, the pages stop when a page has no items",
+            "pagination_param": "The query param for the page number, offset or cursor, e.g. page",
+            "pagination_start": "The first page number or offset, usually 1 or 0",
+            "pagination_page_size": "A page with fewer items is the last page",
+            "pagination_cursor_path": "Extract the cursor for the next page, e.g. $.next_cursor",
         }
 
     def __init__(self, *args, **kwargs):
@@ -230,6 +254,16 @@ class CustomApiUpdateForm(ModelForm):
                     CrispyFormset("formdataentries", "Form Data"),
                     CrispyFormset("formurlencodedentries", "Form URL Encoded"),
                 ),
+                Tab(
+                    "Pagination",
+                    "pagination",
+                    "pagination_param",
+                    "pagination_start",
+                    "pagination_page_size_param",
+                    "pagination_page_size",
+                    "pagination_cursor_path",
+                    "pagination_max_pages",
+                ),
             )
         )
 
@@ -244,3 +278,26 @@ class CustomApiUpdateForm(ModelForm):
             field.help_text = mark_safe(
                 f'You can authorize services with OAuth2 in your project <a href="{settings_url}" class="link">settings</a>'
             )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        pagination = cleaned_data.get("pagination")
+
+        if pagination in [
+            CustomApi.Pagination.PAGE_NUMBER,
+            CustomApi.Pagination.OFFSET,
+            CustomApi.Pagination.CURSOR,
+        ] and not cleaned_data.get("pagination_param"):
+            self.add_error("pagination_param", "This field is required.")
+
+        if pagination == CustomApi.Pagination.OFFSET and not cleaned_data.get(
+            "pagination_page_size"
+        ):
+            self.add_error("pagination_page_size", "This field is required.")
+
+        if pagination == CustomApi.Pagination.CURSOR and not cleaned_data.get(
+            "pagination_cursor_path"
+        ):
+            self.add_error("pagination_cursor_path", "This field is required.")
+
+        return cleaned_data
@@ -0,0 +1,71 @@
+import re
+from itertools import chain
+
+import ijson
+from jsonpath_ng import parse
+
+# A subset of JSONPath that can be evaluated while the response is parsed,
+# e.g. $, $.records, $.records[*] or $.data[*].fields
+STREAMABLE_JSON_PATH = re.compile(r"^\$((\.[A-Za-z_][\w-]*)|(\[\*\]))*$")
+PATH_SEGMENT = re.compile(r"\.([A-Za-z_][\w-]*)|\[\*\]")
+
+VALUE_EVENTS = {"null", "boolean", "integer", "double", "number", "string"}
+START_EVENTS = {"start_map", "start_array"}
+END_EVENTS = {"end_map", "end_array"}
+
+
+def find_json_path(data, json_path: str):
+    """Matches of the JSONPath expression in the parsed JSON.
+
+    Matches that are lists are merged, e.g. airtable API $.records[*].fields
+    """
+    return list(
+        chain.from_iterable(
+            match.value if isinstance(match.value, list) else [match.value]
+            for match in parse(json_path).find(data)
+        )
+    )
+
+
+def get_ijson_prefix(json_path: str):
+    """Translates the JSONPath into an ijson prefix, or None if not streamable."""
+    json_path = json_path.strip()
+    if not STREAMABLE_JSON_PATH.match(json_path):
+        return None
+
+    return ".".join(
+        match.group(1) or "item" for match in PATH_SEGMENT.finditer(json_path)
+    )
+
+
+def iter_json_path(f, prefix: str):
+    """Yields the matches of the prefix from the JSON file as it is parsed.
+
+    Matches that are lists are merged, e.g. both $.records and $.records[*]
+    yield the individual records.
+    """
+    items_prefix = f"{prefix}.item" if prefix else "item"
+    in_array = False
+    builder, depth = None, 0
+
+    for current, event, value in ijson.parse(f, use_float=True):
+        if builder is not None:
+            builder.event(event, value)
+            depth += (event in START_EVENTS) - (event in END_EVENTS)
+            if depth == 0:
+                yield builder.value
+                builder = None
+            continue
+
+        if current == prefix and event == "start_array":
+            in_array = True
+        elif current == prefix and event == "end_array":
+            in_array = False
+        elif (current == prefix or (in_array and current == items_prefix)) and (
+            event in VALUE_EVENTS or event in START_EVENTS
+        ):
+            if event in VALUE_EVENTS:
+                yield value
+                continue
+            builder, depth = ijson.ObjectBuilder(), 1
+            builder.event(event, value)
@@ -0,0 +1,63 @@
+# Generated by Django 4.0.8 on 2026-10-18 16:20
+
+from django.db import migrations, models
+
+import apps.customapis.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("customapis", "0003_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="customapi",
+            name="pagination",
+            field=models.CharField(
+                choices=[
+                    ("none", "None"),
+                    ("page_number", "Page number"),
+                    ("offset", "Offset"),
+                    ("cursor", "Cursor"),
+                    ("link_header", "Link header"),
+                ],
+                default="none",
+                max_length=16,
+            ),
+        ),
+        migrations.AddField(
+            model_name="customapi",
+            name="pagination_param",
+            field=models.CharField(max_length=1024, null=True),
+        ),
+        migrations.AddField(
+            model_name="customapi",
+            name="pagination_start",
+            field=models.IntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name="customapi",
+            name="pagination_page_size_param",
+            field=models.CharField(max_length=1024, null=True),
+        ),
+        migrations.AddField(
+            model_name="customapi",
+            name="pagination_page_size",
+            field=models.IntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name="customapi",
+            name="pagination_cursor_path",
+            field=models.TextField(
+                null=True,
+                validators=[apps.customapis.models.validate_json_path],
+            ),
+        ),
+        migrations.AddField(
+            model_name="customapi",
+            name="pagination_max_pages",
+            field=models.IntegerField(default=1000),
+        ),
+    ]
@@ -62,6 +62,13 @@ class CustomApi(BaseModel):
         RAW = "raw", "raw"
         BINARY = "binary", "binary"
 
+    class Pagination(models.TextChoices):
+        NONE = "none", "None"
+        PAGE_NUMBER = "page_number", "Page number"
+        OFFSET = "offset", "Offset"
+        CURSOR = "cursor", "Cursor"
+        LINK_HEADER = "link_header", "Link header"
+
     integration = models.OneToOneField(Integration, on_delete=models.CASCADE)
 
     url = models.URLField(max_length=2048, null=True)
@@ -105,6 +112,21 @@ class CustomApi(BaseModel):
         null=True,
     )
 
+    pagination = models.CharField(
+        max_length=16, choices=Pagination.choices, default=Pagination.NONE
+    )
+    # query param for the page number, offset or cursor
+    pagination_param = models.CharField(max_length=1024, null=True)
+    pagination_start = models.IntegerField(default=1)
+    # query param for the number of items per page, and its value
+    pagination_page_size_param = models.CharField(max_length=1024, null=True)
+    pagination_page_size = models.IntegerField(null=True)
+    # the cursor for the next page in the response
+    pagination_cursor_path = models.TextField(
+        null=True, validators=[validate_json_path]
+    )
+    pagination_max_pages = models.IntegerField(default=1000)
+
     @property
     def table_id(self):
         return f"customapi_{self.id:09}"
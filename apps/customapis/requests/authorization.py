@@ -1,9 +1,32 @@
+import threading
+import time
+
 from requests import Session
 from requests.auth import HTTPBasicAuth, HTTPDigestAuth
+from requests_oauthlib import OAuth2Session
 
 from ..models import CustomApi
 
 
+class OAuth2RefreshSession(OAuth2Session):
+    """OAuth2Session that refreshes the token once for concurrent requests.
+
+    The pages of a paginated api share the session, the token expires for all
+    of them at once and a refresh token can often be used only once.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._refresh_lock = threading.Lock()
+
+    def refresh_token(self, token_url, **kwargs):
+        with self._refresh_lock:
+            # another request refreshed the token while this one waited
+            if self.token.get("expires_at", 0) > time.time():
+                return self.token
+            return super().refresh_token(token_url, **kwargs)
+
+
 def _get_authorization_for_api_key(session: Session, customapi: CustomApi):
     key_value = {customapi.api_key_key: customapi.api_key_value}
     if customapi.api_key_add_to == CustomApi.ApiKeyAddTo.HTTP_HEADER:
@@ -0,0 +1,99 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from requests import Session
+
+from ..json_path import find_json_path
+from ..models import CustomApi
+from . import request
+
+# Each strategy yields the list of items for every page, until a page is empty or
+# the maximum number of pages is reached
+
+
+def _with_params(kwargs, params):
+    return {**kwargs, "params": {**kwargs.get("params", {}), **params}}
+
+
+def _get_page_size_params(customapi: CustomApi):
+    if customapi.pagination_page_size_param and customapi.pagination_page_size:
+        return {customapi.pagination_page_size_param: customapi.pagination_page_size}
+    return {}
+
+
+def _get_numbered_page_params(customapi: CustomApi, page: int):
+    if customapi.pagination == CustomApi.Pagination.OFFSET:
+        value = customapi.pagination_start + page * customapi.pagination_page_size
+    else:
+        value = customapi.pagination_start + page
+
+    return {customapi.pagination_param: value, **_get_page_size_params(customapi)}
+
+
+def _is_last_page(customapi: CustomApi, items):
+    page_size = customapi.pagination_page_size
+    return not items or (page_size is not None and len(items) < page_size)
+
+
+def _iter_numbered_pages(session: Session, customapi: CustomApi, context, **kwargs):
+    # the pages are independent, a batch of pages is requested concurrently
+
+    def _fetch_page(page):
+        _, data = request.request_json(
+            session,
+            context,
+            **_with_params(kwargs, _get_numbered_page_params(customapi, page)),
+        )
+        return find_json_path(data, customapi.json_path)
+
+    max_pages = customapi.pagination_max_pages
+
+    with ThreadPoolExecutor(max_workers=request.REQUEST_POOL_SIZE) as executor:
+        for start in range(0, max_pages, request.REQUEST_POOL_SIZE):
+            pages = range(start, min(start + request.REQUEST_POOL_SIZE, max_pages))
+            # the pages are yielded in order
+            for items in executor.map(_fetch_page, pages):
+                yield items
+                if _is_last_page(customapi, items):
+                    return
+
+
+def _iter_cursor_pages(session: Session, customapi: CustomApi, context, **kwargs):
+    # every page depends on the cursor of the previous one
+    params = _get_page_size_params(customapi)
+
+    for _ in range(customapi.pagination_max_pages):
+        _, data = request.request_json(session, context, **_with_params(kwargs, params))
+        items = find_json_path(data, customapi.json_path)
+        yield items
+
+        cursors = find_json_path(data, customapi.pagination_cursor_path)
+        if not items or not cursors or cursors[0] in [None, ""]:
+            return
+        params = {**params, customapi.pagination_param: cursors[0]}
+
+
+def _iter_link_header_pages(session: Session, customapi: CustomApi, context, **kwargs):
+    # https://datatracker.ietf.org/doc/html/rfc8288
+    kwargs = _with_params(kwargs, _get_page_size_params(customapi))
+
+    for _ in range(customapi.pagination_max_pages):
+        response, data = request.request_json(session, context, **kwargs)
+        items = find_json_path(data, customapi.json_path)
+        yield items
+
+        if not items or "next" not in response.links:
+            return
+        # the next url already includes all the query params
+        kwargs = {**kwargs, "url": response.links["next"]["url"], "params": {}}
+
+
+PAGINATION = {
+    CustomApi.Pagination.PAGE_NUMBER: _iter_numbered_pages,
+    CustomApi.Pagination.OFFSET: _iter_numbered_pages,
+    CustomApi.Pagination.CURSOR: _iter_cursor_pages,
+    CustomApi.Pagination.LINK_HEADER: _iter_link_header_pages,
+}
+
+
+def iter_pages(session: Session, customapi: CustomApi, context, **kwargs):
+    return PAGINATION[customapi.pagination](session, customapi, context, **kwargs)
@@ -1,47 +1,140 @@
+import json
 import time
 from io import BytesIO
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import Timeout
+from urllib3.util.retry import Retry
 
 ITER_BYTE_SIZE = 2048  # 2 KB
+STREAM_ITER_BYTE_SIZE = 64 * 1024  # 64 KB
 REQUEST_MAX_SIZE = 10 * 1024 * 1024  # 10 MB
+REQUEST_STREAM_MAX_SIZE = 1024 * 1024 * 1024  # 1 GB
 REQUEST_TIMEOUT = 30  # seconds
+# a streamed response of up to 1 GB, every chunk is still read within
+# `REQUEST_TIMEOUT`
+REQUEST_STREAM_TIMEOUT = 30 * 60  # seconds
+SYNC_TIMEOUT = 60 * 60  # seconds, a paginated sync makes many requests
+
+# Concurrent requests per session, e.g. for paginated apis
+REQUEST_POOL_SIZE = 8
+REQUEST_RETRIES = 5
+# Rate limited or temporarily unavailable, the Retry-After header is respected
+RETRY_STATUS_CODES = [429, 500, 502, 503, 504]
 
 # https://stackoverflow.com/q/23514256/15425660
 # https://stackoverflow.com/a/22347526/15425660
 
 
-def request_safe(session: requests.Session, **kwargs) -> requests.Response:
-    # session.request with a maximum timeout and size
+def mount_retries(session: requests.Session):
+    # retry with exponential backoff, i.e. 1s, 2s, 4s, ...
+    retries = Retry(
+        total=REQUEST_RETRIES,
+        backoff_factor=1,
+        status_forcelist=RETRY_STATUS_CODES,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(max_retries=retries, pool_maxsize=REQUEST_POOL_SIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
 
+
+def _request(session: requests.Session, **kwargs) -> requests.Response:
     try:
-        r = session.request(**kwargs, stream=True, timeout=REQUEST_TIMEOUT)
+        return session.request(**kwargs, stream=True, timeout=REQUEST_TIMEOUT)
     except Timeout:
         raise Exception(
             "Exceeded maximum timeout of 30 seconds, reach out for support."
         )
 
+
+def iter_content_safe(
+    r: requests.Response,
+    chunk_size=ITER_BYTE_SIZE,
+    max_size=REQUEST_MAX_SIZE,
+    timeout=REQUEST_TIMEOUT,
+):
+    # response.iter_content with a maximum timeout and size
+
     size = 0
     start = time.time()
-    ctt = BytesIO()
 
-    for chunk in r.iter_content(ITER_BYTE_SIZE):
+    for chunk in r.iter_content(chunk_size):
 
-        if time.time() - start > REQUEST_TIMEOUT:
+        if time.time() - start > timeout:
+            r.close()
             raise Exception(
-                "Exceeded maximum timeout of 30 seconds, reach out for support."
+                f"Exceeded maximum timeout of {timeout} seconds, reach out for support."
             )
 
         size += len(chunk)
-        ctt.write(chunk)
 
-        if size > REQUEST_MAX_SIZE:
+        if size > max_size:
             r.close()
             raise Exception(
-                "Exceeded maximum response size of 10 MB, reach out for support."
+                f"Exceeded maximum response size of {max_size // 1024 // 1024} MB, "
+                "reach out for support."
             )
 
+        yield chunk
+
+
+def request_safe(session: requests.Session, **kwargs) -> requests.Response:
+    # session.request with a maximum timeout and size
+
+    r = _request(session, **kwargs)
+
+    ctt = BytesIO()
+
+    for chunk in iter_content_safe(r):
+        ctt.write(chunk)
+
     r._content = ctt.getvalue()
 
     return r
+
+
+def request_json(session: requests.Session, context: dict, **kwargs):
+    # request_safe and parse the response, the response is added to the error context
+
+    response = request_safe(session, **kwargs)
+
+    context["response"] = response
+    response.raise_for_status()
+
+    try:
+        return response, response.json()
+    except json.JSONDecodeError:
+        raise Exception("Unable to parse the response to JSON.")
+
+
+def request_stream(session: requests.Session, **kwargs) -> requests.Response:
+    # session.request with a maximum timeout, the content is not read yet and is
+    # consumed with `ResponseReader`
+
+    return _request(session, **kwargs)
+
+
+class ResponseReader:
+    """File-like reader over a streamed response, for incremental parsers."""
+
+    def __init__(self, r: requests.Response):
+        self._chunks = iter_content_safe(
+            r,
+            chunk_size=STREAM_ITER_BYTE_SIZE,
+            max_size=REQUEST_STREAM_MAX_SIZE,
+            timeout=REQUEST_STREAM_TIMEOUT,
+        )
+        self._buffer = b""
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            if (chunk := next(self._chunks, None)) is None:
+                break
+            self._buffer += chunk
+
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
@@ -1,28 +1,31 @@
 import json
 from itertools import chain
+from tempfile import TemporaryFile
 from uuid import uuid4
 
+import ijson
 import requests
 from celery import shared_task
-from django.core.files.base import ContentFile
+from django.core.files.base import File
 from django.db import transaction
 from django.template.loader import get_template
 from django.utils import timezone
-from jsonpath_ng import parse
-from requests_oauthlib import OAuth2Session
 
 from apps.base.clients import get_engine
 from apps.base.core.bigquery import sanitize_bq_column_name
-from apps.base.core.utils import catchtime
+from apps.base.core.utils import catchtime, md5_chunks
 from apps.integrations.emails import send_integration_ready_email
 from apps.runs.models import JobRun
 from apps.tables.models import Table
+from apps.tables.tasks import warm_table_dependents
 from apps.users.models import CustomUser
 
+from .json_path import find_json_path, get_ijson_prefix, iter_json_path
 from .models import CustomApi
 from .requests import request
-from .requests.authorization import get_authorization
+from .requests.authorization import OAuth2RefreshSession, get_authorization
 from .requests.body import get_body
+from .requests.pagination import iter_pages
 
 
 def sanitize_nested_fields(d):
@@ -35,7 +38,36 @@ def sanitize_nested_fields(d):
     return d
 
 
-@shared_task(bind=True, time_limit=request.REQUEST_TIMEOUT)
+# Number of items shown in the error template
+PREVIEW_ITEMS = 10
+
+
+def _fetch_json_path(session, customapi: CustomApi, context, **kwargs):
+    # the full response is parsed in memory, for any JSONPath expression
+    _, data = request.request_json(session, context, **kwargs)
+
+    context["json"] = json.dumps(data, indent=2)
+
+    return find_json_path(data, customapi.json_path)
+
+
+def _stream_json_path(session, prefix: str, context, **kwargs):
+    # the response is parsed incrementally and items are yielded as they arrive
+    response = request.request_stream(session, **kwargs)
+
+    context["response"] = response
+    response.raise_for_status()
+
+    # the content is consumed by the parser and not available for the error template
+    response._content = b""
+
+    try:
+        yield from iter_json_path(request.ResponseReader(response), prefix)
+    except ijson.JSONError:
+        raise Exception("Unable to parse the response to JSON.")
+
+
+@shared_task(bind=True, time_limit=request.SYNC_TIMEOUT)
 def run_customapi_sync_task(self, run_id):
     run = JobRun.objects.get(pk=run_id)
     integration = run.integration
@@ -48,17 +80,17 @@ def run_customapi_sync_task(self, run_id):
         # fetch data from the api, extract the list of items, write to filesystem as
         # newline delimited JSON
         session = (
-            OAuth2Session(
+            OAuth2RefreshSession(
                 token=customapi.oauth2.token,
                 auto_refresh_url=customapi.oauth2.token_url,
             )
             if customapi.authorization == CustomApi.Authorization.OAUTH2
             else requests.Session()
         )
+        request.mount_retries(session)
         get_authorization(session, customapi)
         body = get_body(session, customapi)
-        response = request.request_safe(
-            session,
+        kwargs = dict(
             method=customapi.http_request_method,
             url=customapi.url,
             params={q.key: q.value for q in customapi.queryparams.all()},
@@ -66,42 +98,40 @@ def run_customapi_sync_task(self, run_id):
             **body,
         )
 
-        context["response"] = response
-        response.raise_for_status()
+        if customapi.pagination != CustomApi.Pagination.NONE:
+            pages = iter_pages(session, customapi, context, **kwargs)
+            items = chain.from_iterable(pages)
+        elif (prefix := get_ijson_prefix(customapi.json_path)) is not None:
+            items = _stream_json_path(session, prefix, context, **kwargs)
+        else:
+            items = _fetch_json_path(session, customapi, context, **kwargs)
+
+        # the newline delimited JSON is written line by line, the items are never
+        # all held in memory at once
+        preview = []
+        with TemporaryFile() as f:
+            for item in items:
+                # bigquery does not automatically sanitize
+                line = json.dumps(sanitize_nested_fields(item))
+                if len(preview) < PREVIEW_ITEMS:
+                    preview.append(line)
+                if f.tell():
+                    f.write(b"\n")
+                f.write(line.encode("utf-8"))
+
+            context["ndjson"] = "\n".join(preview)
+
+            if not f.tell():
+                raise Exception(
+                    "JSONPath expression does not match any part of the JSON response."
+                )
+
+            # the chunks are read from the start of the file
+            content_hash = md5_chunks(File(f).chunks())
+
+            f.seek(0)
+            customapi.ndjson_file.save(f"customapi_{customapi.id}.ndjson", File(f))
 
-        try:
-            data = response.json()
-        except json.JSONDecodeError:
-            raise Exception("Unable to parse the response to JSON.")
-
-        context["json"] = json.dumps(data, indent=2)
-
-        jsonpath_expr = parse(customapi.json_path)
-        jsonpath_matches = jsonpath_expr.find(data)
-
-        if len(jsonpath_matches) == 0:
-            raise Exception(
-                "JSONPath expression does not match any part of the JSON response."
-            )
-
-        # Merge results for JSON Path expression with multiple matches
-        # e.g. airtable API $.records[*].fields
-        parsed_data = list(
-            chain.from_iterable(
-                match.value if isinstance(match.value, list) else [match.value]
-                for match in jsonpath_matches
-            )
-        )
-
-        # bigquery does not automatically sanitize
-        sanitized_data = sanitize_nested_fields(parsed_data)
-
-        ndjson = "\n".join([json.dumps(item) for item in sanitized_data])
-        customapi.ndjson_file.save(
-            f"customapi_{customapi.id}.ndjson", ContentFile(ndjson.encode("utf-8"))
-        )
-
-        context["ndjson"] = ndjson
         context["ndjson_file"] = customapi.ndjson_file
 
     except Exception as exc:
@@ -124,10 +154,20 @@ def run_customapi_sync_task(self, run_id):
             project=integration.project,
         )
 
-        with catchtime() as get_time_to_sync:
-            get_engine().import_table_from_customapi(table=table, customapi=customapi)
-
-        table.sync_metadata_from_source()
+        if integration.is_unchanged(content_hash, created):
+            # keep data_updated, downstream caches are still valid
+            run.skipped = True
+            run.save(update_fields=["skipped"])
+        else:
+            with catchtime() as get_time_to_sync:
+                get_engine().import_table_from_customapi(
+                    table=table, customapi=customapi
+                )
+
+            table.sync_metadata_from_source()
+            integration.content_hash = content_hash
+            integration.save(update_fields=["content_hash"])
+            warm_table_dependents([table])
 
     if created:
         send_integration_ready_email(integration, int(get_time_to_sync()))
@@ -1,4 +1,5 @@
 import json
+from io import BytesIO
 
 import pytest
 import requests
@@ -36,6 +37,13 @@ fields = [
     "body",
     "body_raw",
     "body_binary",
+    "pagination",
+    "pagination_param",
+    "pagination_start",
+    "pagination_page_size_param",
+    "pagination_page_size",
+    "pagination_cursor_path",
+    "pagination_max_pages",
 ]
 
 QUERY_PARAMS_BASE_DATA = base_formset("queryparams")
@@ -54,17 +62,17 @@ TEST_JSON = {
 
 
 @pytest.fixture
-def request_safe(mocker):
-    # request response with content manually set to json
-    request_safe = mocker.patch("apps.customapis.requests.request.request_safe")
+def request_stream(mocker):
+    # streamed request response with raw content manually set to json
+    request_stream = mocker.patch("apps.customapis.requests.request.request_stream")
     response = requests.Response()
-    response._content = json.dumps(TEST_JSON).encode("utf-8")
+    response.raw = BytesIO(json.dumps(TEST_JSON).encode("utf-8"))
     response.status_code = 200
-    request_safe.return_value = response
-    return request_safe
+    request_stream.return_value = response
+    return request_stream
 
 
-def test_customapi_create(client, engine, logged_in_user, project, request_safe):
+def test_customapi_create(client, engine, logged_in_user, project, request_stream):
 
     LIST = f"/projects/{project.id}/integrations"
 
@@ -106,7 +114,7 @@ def test_customapi_create(client, engine, logged_in_user, project, request_safe)
         ],
     )
 
-    assert request_safe.call_count == 0
+    assert request_stream.call_count == 0
     assert engine.query.call_count == 0
 
     # complete the sync
@@ -119,6 +127,9 @@ def test_customapi_create(client, engine, logged_in_user, project, request_safe)
             "http_request_method": "GET",
             "authorization": "no_auth",
             "body": "none",
+            "pagination": "none",
+            "pagination_start": 1,
+            "pagination_max_pages": 1000,
             **QUERY_PARAMS_BASE_DATA,
             **HTTP_HEADERS_BASE_DATA,
             **FORM_URL_ENCODED_ENTRIES_BASE_DATA,
@@ -129,10 +140,10 @@ def test_customapi_create(client, engine, logged_in_user, project, request_safe)
     customapi.refresh_from_db()
 
     # validate the request
-    assert request_safe.call_count == 1
-    assert len(request_safe.call_args.args) == 1
-    assert isinstance(request_safe.call_args.args[0], requests.Session)
-    assert request_safe.call_args.kwargs == {
+    assert request_stream.call_count == 1
+    assert len(request_stream.call_args.args) == 1
+    assert isinstance(request_stream.call_args.args[0], requests.Session)
+    assert request_stream.call_args.kwargs == {
         "method": "GET",
         "url": "https://json.url",
         "params": {},
@@ -0,0 +1,54 @@
+import json
+from io import BytesIO
+
+import pytest
+from jsonpath_ng import parse
+
+from apps.customapis.json_path import get_ijson_prefix, iter_json_path
+
+TEST_JSON = {
+    "records": [
+        {"id": 1, "fields": {"name": "neera", "score": 1.5}},
+        {"id": 2, "fields": {"name": "vayu", "tags": ["a", "b"]}},
+    ],
+    "item": {"name": "gyana"},
+    "total": 2,
+}
+
+
+@pytest.mark.parametrize(
+    "json_path, prefix",
+    [
+        pytest.param("$", "", id="root"),
+        pytest.param("$.records", "records", id="field"),
+        pytest.param("$.records[*]", "records.item", id="wildcard"),
+        pytest.param("$.records[*].fields", "records.item.fields", id="nested"),
+        pytest.param("$.records[0]", None, id="index"),
+        pytest.param("$..fields", None, id="descendant"),
+        pytest.param("$.records[?(@.id > 1)]", None, id="filter"),
+    ],
+)
+def test_get_ijson_prefix(json_path, prefix):
+    assert get_ijson_prefix(json_path) == prefix
+
+
+@pytest.mark.parametrize(
+    "json_path",
+    [
+        pytest.param("$", id="root"),
+        pytest.param("$.records", id="list"),
+        pytest.param("$.records[*]", id="wildcard"),
+        pytest.param("$.records[*].fields", id="nested"),
+        pytest.param("$.records[*].fields.tags", id="nested list"),
+        pytest.param("$.item", id="object named item"),
+        pytest.param("$.total", id="scalar"),
+    ],
+)
+def test_iter_json_path(json_path):
+    # the streamed items are the same as the merged jsonpath_ng matches
+    expected = []
+    for match in parse(json_path).find(TEST_JSON):
+        expected.extend(match.value if isinstance(match.value, list) else [match.value])
+
+    f = BytesIO(json.dumps(TEST_JSON).encode("utf-8"))
+    assert list(iter_json_path(f, get_ijson_prefix(json_path))) == expected
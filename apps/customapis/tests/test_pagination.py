@@ -0,0 +1,135 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+from requests_oauthlib import OAuth2Session
+
+from apps.customapis.models import CustomApi
+from apps.customapis.requests.authorization import OAuth2RefreshSession
+from apps.customapis.requests.pagination import iter_pages
+from apps.customapis.requests.request import REQUEST_POOL_SIZE, mount_retries
+
+RECORDS = [{"id": idx} for idx in range(25)]
+PAGE_SIZE = 10
+
+
+def _response(content, headers=None):
+    response = requests.Response()
+    response._content = json.dumps(content).encode("utf-8")
+    response.status_code = 200
+    response.headers.update(headers or {})
+    return response
+
+
+@pytest.fixture
+def request_safe(mocker):
+    return mocker.patch("apps.customapis.requests.request.request_safe")
+
+
+def _items(customapi):
+    pages = iter_pages(
+        requests.Session(), customapi, {}, method="GET", url="https://api.url"
+    )
+    return [item for items in pages for item in items]
+
+
+def test_page_number(request_safe):
+    request_safe.side_effect = lambda session, **kwargs: _response(
+        {"records": RECORDS[(kwargs["params"]["page"] - 1) * 10 :][:10]}
+    )
+    customapi = CustomApi(
+        json_path="$.records",
+        pagination=CustomApi.Pagination.PAGE_NUMBER,
+        pagination_param="page",
+    )
+
+    assert _items(customapi) == RECORDS
+    # the first empty page is part of the first concurrent batch
+    assert request_safe.call_count == REQUEST_POOL_SIZE
+
+
+def test_offset(request_safe):
+    request_safe.side_effect = lambda session, **kwargs: _response(
+        RECORDS[kwargs["params"]["offset"] :][: kwargs["params"]["limit"]]
+    )
+    customapi = CustomApi(
+        json_path="$",
+        pagination=CustomApi.Pagination.OFFSET,
+        pagination_param="offset",
+        pagination_start=0,
+        pagination_page_size_param="limit",
+        pagination_page_size=PAGE_SIZE,
+        pagination_max_pages=2,
+    )
+
+    # the maximum number of pages is respected
+    assert _items(customapi) == RECORDS[:20]
+    assert request_safe.call_count == 2
+
+
+def test_cursor(request_safe):
+    def _get_page(session, **kwargs):
+        start = int(kwargs["params"].get("cursor", 0))
+        end = start + PAGE_SIZE
+        return _response(
+            {"data": RECORDS[start:end], "next": str(end) if end < 25 else None}
+        )
+
+    request_safe.side_effect = _get_page
+    customapi = CustomApi(
+        json_path="$.data",
+        pagination=CustomApi.Pagination.CURSOR,
+        pagination_param="cursor",
+        pagination_cursor_path="$.next",
+    )
+
+    assert _items(customapi) == RECORDS
+    assert request_safe.call_count == 3
+
+
+def test_link_header(request_safe):
+    request_safe.side_effect = [
+        _response(RECORDS[:10], {"Link": '<https://api.url?page=2>; rel="next"'}),
+        _response(RECORDS[10:], {"Link": '<https://api.url?page=1>; rel="first"'}),
+    ]
+    customapi = CustomApi(json_path="$", pagination=CustomApi.Pagination.LINK_HEADER)
+
+    assert _items(customapi) == RECORDS
+    assert request_safe.call_args.kwargs["url"] == "https://api.url?page=2"
+
+
+def test_retries():
+    session = requests.Session()
+    mount_retries(session)
+
+    # only idempotent requests are retried
+    retries = session.get_adapter("https://api.url").max_retries
+    assert retries.is_retry("GET", 503)
+    assert not retries.is_retry("POST", 503)
+
+
+def test_oauth2_refresh_once(mocker):
+    session = OAuth2RefreshSession(token={"access_token": "expired", "expires_at": 0})
+
+    def _refresh_token(self, token_url, **kwargs):
+        time.sleep(0.05)
+        self.token = {"access_token": "fresh", "expires_at": time.time() + 3600}
+        return self.token
+
+    refresh_token = mocker.patch.object(
+        OAuth2Session, "refresh_token", autospec=True, side_effect=_refresh_token
+    )
+
+    # the concurrent pages wait for the first refresh
+    with ThreadPoolExecutor(max_workers=REQUEST_POOL_SIZE) as executor:
+        tokens = list(
+            executor.map(
+                lambda _: session.refresh_token("https://token.url"),
+                range(REQUEST_POOL_SIZE),
+            )
+        )
+
+    assert refresh_token.call_count == 1
+    assert {token["access_token"] for token in tokens} == {"fresh"}
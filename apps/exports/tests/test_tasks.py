@@ -1,3 +1,5 @@
+import csv
+
 import pytest
 from django.conf import settings
 from django.core import mail
@@ -46,3 +48,26 @@ def test_run_export_task(
         TEMPORARY_TABLE,
         f"gs://{settings.GS_BUCKET_NAME}/{export.file.name}",
     )
+
+
+def test_export_to_csv_postgres(postgres_client, mocker, tmp_path):
+    query = mocker.MagicMock()
+    query.compile.return_value = (
+        "SELECT * FROM (VALUES "
+        "(1, 'Usain Bolt', TIMESTAMP '2020-01-01 10:30:00'), (2, NULL, NULL)"
+        ') AS t (id, athlete, "when")'
+    )
+    export = mocker.MagicMock()
+    export.file.path = str(tmp_path / "exports" / "export.csv")
+    # the rows are written over several chunks
+    mocker.patch("apps.base.engine.base.EXPORT_CHUNK_SIZE", 1)
+
+    postgres_client.export_to_csv(query, export)
+
+    with open(export.file.path, newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows == [
+        ["id", "athlete", "when"],
+        ["1", "Usain Bolt", "2020-01-01 10:30:00"],
+        ["2", "", ""],
+    ]
@@ -52,7 +52,13 @@ class IntegrationGrid(TableInstanceMixin, SingleTableMixin, DetailView):
         if not self.table_instance:
             return type("DynamicTable", (Table,), {})(data=[])
         query = get_engine().get_table(self.table_instance)
-        table = get_table(query.schema(), query, None, **kwargs)
+        table = get_table(
+            query.schema(),
+            query,
+            None,
+            data_updated=self.table_instance.data_updated,
+            **kwargs,
+        )
 
         return RequestConfig(
             self.request, paginate=self.get_table_pagination(table)
@@ -66,7 +72,13 @@ class IntegrationPreview(TableInstanceMixin, SingleTableMixin, DetailView):
 
     def get_table(self, **kwargs):
         query = get_engine().get_table(self.table_instance)
-        table = get_table(query.schema(), query.limit(15), None, **kwargs)
+        table = get_table(
+            query.schema(),
+            query.limit(15),
+            None,
+            data_updated=self.table_instance.data_updated,
+            **kwargs,
+        )
 
         return RequestConfig(
             self.request, paginate=self.get_table_pagination(table)
@@ -0,0 +1,18 @@
+# Generated by Django 4.0.8 on 2026-10-18 16:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("integrations", "0003_alter_integration_kind"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="integration",
+            name="content_hash",
+            field=models.CharField(max_length=32, null=True),
+        ),
+    ]
@@ -83,6 +83,9 @@ class Integration(BaseModel):
     created_by = models.ForeignKey(CustomUser, null=True, on_delete=models.SET_NULL)
 
     is_scheduled = models.BooleanField(default=False)
+    # fingerprint of the source data at the last sync, a sync with identical data
+    # does not reload the table
+    content_hash = models.CharField(max_length=32, null=True)
 
     objects = IntegrationsManager()
 
@@ -111,6 +114,9 @@ class Integration(BaseModel):
 
     KIND_RUN_IN_PROJECT = [Kind.SHEET, Kind.CUSTOMAPI]
 
+    def is_unchanged(self, content_hash: str, table_created: bool):
+        return not table_created and self.content_hash == content_hash
+
     def __str__(self):
         return self.name
 
@@ -1,3 +1,5 @@
+from functools import partial
+
 from apps.customapis import tasks as customapi_tasks
 from apps.sheets import tasks as sheet_tasks
 from apps.uploads.tasks import run_upload_sync
@@ -6,12 +8,14 @@ from apps.users.models import CustomUser
 from .models import Integration
 
 
-def run_integration_task(kind: Integration.Kind, run_id: str):
-    # todo: in future, we have the option to skip the sync for a google sheet if
-    # it is already up to date
+def run_integration_task(kind: Integration.Kind, run_id: str, skip_up_to_date=False):
+    # a google sheet is skipped if it was not modified in drive, any integration is
+    # skipped if the fetched data is unchanged
     return {
         Integration.Kind.CUSTOMAPI: customapi_tasks.run_customapi_sync_task,
-        Integration.Kind.SHEET: sheet_tasks.run_sheet_sync_task,
+        Integration.Kind.SHEET: partial(
+            sheet_tasks.run_sheet_sync_task, skip_up_to_date=skip_up_to_date
+        ),
     }[kind](run_id)
 
 
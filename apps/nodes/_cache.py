@@ -0,0 +1,113 @@
+from collections import OrderedDict
+
+from django.core.cache import cache
+
+from apps.base.clients import get_engine
+from apps.base.core.utils import compile_query, md5_kwargs
+
+from .models import QUERY_UNRELATED_FIELDS
+
+LOCAL_CACHE_SIZE = 512
+SHARED_CACHE_TIMEOUT = 24 * 3600
+
+# Ibis expressions hold a reference to the engine client and can't be shared
+# between processes, the compiled SQL and schema are shared via the django cache
+_local_cache = OrderedDict()
+
+
+def get_node_hash(node, parent_hashes):
+    """Structural hash of the node config, the input table version and its parents.
+
+    Related config (e.g. columns or aggregations) is captured by `data_updated`,
+    which is updated by `SaveParentModel` on every change.
+    """
+    config = {
+        field.attname: str(getattr(node, field.attname))
+        for field in node._meta.concrete_fields
+        if field.name not in QUERY_UNRELATED_FIELDS
+    }
+    input_table_updated = (
+        str(node.input_table.data_updated) if node.input_table else None
+    )
+
+    return md5_kwargs(
+        config=config, input_table_updated=input_table_updated, parents=parent_hashes
+    )
+
+
+def get_node_hashes(current_node, parents, materialized=None):
+    """Computes the hash for the node and all its ancestors, visiting each node once.
+
+    Nodes in `materialized` are read from a table and hashed on its version.
+    """
+    materialized = materialized or {}
+    hashes = {}
+
+    def _get_hash(node):
+        if node.id not in hashes and (table := materialized.get(node.id)):
+            hashes[node.id] = md5_kwargs(
+                table=table.fqn, data_updated=str(table.data_updated)
+            )
+        elif node.id not in hashes:
+            hashes[node.id] = get_node_hash(
+                node, [_get_hash(parent) for parent in parents[node.id]]
+            )
+        return hashes[node.id]
+
+    _get_hash(current_node)
+    return hashes
+
+
+def _get_cache_key(node_hash):
+    return f"cache-node-query-{node_hash}"
+
+
+def get_cached_query(node_hash):
+    if (query := _local_cache.get(node_hash)) is not None:
+        _local_cache.move_to_end(node_hash)
+        return query
+
+    if (compiled := cache.get(_get_cache_key(node_hash))) is not None:
+        sql, schema = compiled
+        query = get_engine().client.sql(sql, schema=schema)
+        _set_local_query(node_hash, query)
+        return query
+
+
+def _set_local_query(node_hash, query):
+    _local_cache[node_hash] = query
+    while len(_local_cache) > LOCAL_CACHE_SIZE:
+        _local_cache.popitem(last=False)
+
+
+def set_cached_query(node_hash, query):
+    _set_local_query(node_hash, query)
+
+    try:
+        compiled = (compile_query(query), query.schema())
+    except Exception:
+        # not every expression can be compiled on its own, e.g. a join without
+        # a selection, it is still re-used within this process
+        return
+
+    cache.set(_get_cache_key(node_hash), compiled, SHARED_CACHE_TIMEOUT)
+
+
+def _get_schema_cache_key(node_hash):
+    return f"cache-node-schema-{node_hash}"
+
+
+def get_cached_schema(node_hash):
+    """The output schema of a node, also read from a cached query."""
+    if (query := _local_cache.get(node_hash)) is not None:
+        return query.schema()
+
+    if (compiled := cache.get(_get_cache_key(node_hash))) is not None:
+        _, schema = compiled
+        return schema
+
+    return cache.get(_get_schema_cache_key(node_hash))
+
+
+def set_cached_schema(node_hash, schema):
+    cache.set(_get_schema_cache_key(node_hash), schema, SHARED_CACHE_TIMEOUT)
@@ -1,32 +1,82 @@
+from collections import defaultdict
+
 from django.db import transaction
+from django.db.models import Q
 from django.utils import timezone
 
 from apps.base.clients import get_engine
 from apps.tables.models import Table
 
+from .models import Edge, Node
 
-def get_parent_updated(node):
-    """Walks through the node and its parents and returns the `data_updated` value."""
-    yield node.data_updated
 
-    # For an input node check whether the input_table has changed
-    # e.g. whether a file has been synced again or a workflow ran
-    if node.kind == "input":
-        yield node.input_table.data_updated
+def propagate_lineage_updated(nodes, updated):
+    """Raises `lineage_updated` of the nodes and all their descendants to `updated`.
 
-    for parent in node.parents.all():
-        yield from get_parent_updated(parent)
+    The versions only increase, descendants with a later version are not updated.
+    """
+    node_ids = {node.id for node in nodes}
+    if not node_ids or updated is None:
+        return
 
+    children = defaultdict(list)
+    for parent_id, child_id in Edge.objects.filter(
+        child__workflow_id__in={node.workflow_id for node in nodes}
+    ).values_list("parent_id", "child_id"):
+        children[parent_id].append(child_id)
 
-def create_or_replace_intermediate_table(node, query):
-    """Creates a new intermediate table or replaces an existing one"""
+    stack = list(node_ids)
+    while stack:
+        for child_id in children[stack.pop()]:
+            if child_id not in node_ids:
+                node_ids.add(child_id)
+                stack.append(child_id)
+
+    Node.objects.filter(
+        Q(lineage_updated__isnull=True) | Q(lineage_updated__lt=updated),
+        id__in=node_ids,
+    ).update(lineage_updated=updated)
+
+
+def table_is_up_to_date(table, node):
+    """Checks whether the table is newer than the node, its parents and input tables."""
+    return (
+        table is not None
+        and node.lineage_updated is not None
+        and table.data_updated > node.lineage_updated
+    )
+
+
+def get_parents_by_node(current_node):
+    """Fetches the ordered parents of every node in the workflow in two queries."""
+    nodes = {
+        node.id: node
+        for node in Node.objects.filter(
+            workflow_id=current_node.workflow_id
+        ).select_related("input_table")
+    }
+    # use the instance passed in, it might include unsaved changes
+    nodes[current_node.id] = current_node
+
+    parents = defaultdict(list)
+    for child_id, parent_id in (
+        Edge.objects.filter(child__workflow_id=current_node.workflow_id)
+        .order_by("position")
+        .values_list("child_id", "parent_id")
+    ):
+        parents[child_id].append(nodes[parent_id])
+
+    return parents
+
+
+def _create_or_replace_node_table(query, source, name, node, **kwargs):
     with transaction.atomic():
         table, _ = Table.objects.get_or_create(
-            source=Table.Source.INTERMEDIATE_NODE,
-            name=node.bq_intermediate_table_id,
+            source=source,
+            name=name,
             namespace=node.workflow.project.team.tables_dataset_id,
             project=node.workflow.project,
-            intermediate_node=node,
+            **kwargs,
         )
 
         get_engine().create_or_replace_table(table.fqn, query.compile())
@@ -34,3 +84,47 @@ def create_or_replace_intermediate_table(node, query):
         table.data_updated = timezone.now()
         table.save()
     return table
+
+
+def create_or_replace_intermediate_table(node, query):
+    """Creates a new intermediate table or replaces an existing one"""
+    return _create_or_replace_node_table(
+        query,
+        Table.Source.INTERMEDIATE_NODE,
+        node.bq_intermediate_table_id,
+        node,
+        intermediate_node=node,
+    )
+
+
+def create_or_replace_cache_table(node, query):
+    """Creates a new cache table or replaces an existing one"""
+    return _create_or_replace_node_table(
+        query, Table.Source.CACHE_NODE, node.bq_cache_table_id, node, cache_node=node
+    )
+
+
+def get_cache_tables(current_node, parents):
+    """Returns the up to date cache tables of the node and its ancestors.
+
+    Ancestors of a node with an up to date table are never read and skipped.
+    """
+    tables = {}
+    seen = set()
+
+    def _visit(node):
+        if node.id in seen:
+            return
+        seen.add(node.id)
+
+        if node.cached and table_is_up_to_date(
+            table := getattr(node, "cache_table", None), node
+        ):
+            tables[node.id] = table
+            return
+
+        for parent in parents[node.id]:
+            _visit(parent)
+
+    _visit(current_node)
+    return tables
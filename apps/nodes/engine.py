@@ -1,12 +1,12 @@
 import inspect
 import re
+from collections import Counter
 from functools import wraps
 from itertools import chain
 
 import ibis
 import ibis.expr.datatypes as dt
 import ibis.expr.operations as ops
-from cacheops import cached_as
 from ibis.expr.datatypes import String
 
 from apps.base import engine
@@ -25,7 +25,19 @@ from apps.filters.engine import get_query_from_filters
 from apps.nodes.exceptions import ColumnNamesDontMatch, JoinTypeError, NodeResultNone
 from apps.nodes.models import Node
 
-from ._utils import create_or_replace_intermediate_table, get_parent_updated
+from ._cache import (
+    get_cached_query,
+    get_cached_schema,
+    get_node_hashes,
+    set_cached_query,
+    set_cached_schema,
+)
+from ._utils import (
+    create_or_replace_intermediate_table,
+    get_cache_tables,
+    get_parents_by_node,
+    table_is_up_to_date,
+)
 
 
 def _rename_duplicates(queries):
@@ -78,7 +90,7 @@ def use_intermediate_table(func):
         conn = engine.get_engine().client
 
         # if the table doesn't need updating we can simply return the previous computed pivot table
-        if table and table.data_updated > max(tuple(get_parent_updated(node))):
+        if table_is_up_to_date(table, node):
             return conn.table(table.name, database=table.namespace)
 
         query = func(node, parent)
@@ -356,10 +368,113 @@ NODE_FROM_CONFIG = {
 }
 
 
-def _get_all_parents(node):
-    # yield parents before child => topological order
-    for parent in node.parents_ordered.all():
-        yield from _get_all_parents(parent)
+def get_input_schema(node):
+    if node.input_table:
+        return get_engine().get_table(node.input_table).schema()
+
+
+def get_pivot_schema(node, schema):
+    # the new columns depend on the data, they are read from the intermediate table
+    # if it is up to date and only computed otherwise
+    table = getattr(node, "intermediate_table", None)
+    if table_is_up_to_date(table, node):
+        return get_engine().get_table(table).schema()
+    return get_query_from_node(node).schema()
+
+
+def get_unpivot_schema(node, schema):
+    value_columns = [col.column for col in node.columns.all()]
+    if not value_columns:
+        raise ValueError("Unpivot requires at least one column")
+
+    return ibis.schema(
+        [
+            *((col.column, schema[col.column]) for col in node.secondary_columns.all()),
+            (node.unpivot_column, dt.string),
+            (node.unpivot_value, schema[value_columns[0]]),
+        ]
+    )
+
+
+def _get_schema_from_unbound_query(node, *schemas):
+    # builds the query on placeholder tables, which never reaches the engine
+    tables = [
+        ibis.table(schema, name=f"node_{node.id}_{idx}")
+        for idx, schema in enumerate(schemas)
+    ]
+    return NODE_FROM_CONFIG[node.kind](node, *tables).schema()
+
+
+# Node kinds whose schema can't be derived from a query on placeholder tables, the
+# remaining kinds use `_get_schema_from_unbound_query`
+SCHEMA_FROM_CONFIG = {
+    "input": get_input_schema,
+    "pivot": get_pivot_schema,
+    "unpivot": get_unpivot_schema,
+}
+
+
+def get_schema_from_node(current_node):
+    """Infers the output schema of a node from the schemas of its ancestors.
+
+    Unlike `get_query_from_node`, the queries are not run or compiled for the
+    engine, except for a pivot node without an up to date intermediate table.
+    """
+    parents = get_parents_by_node(current_node)
+    hashes = get_node_hashes(current_node, parents)
+    schemas = {}
+
+    def _get_schema(node):
+        if node.id in schemas:
+            return schemas[node.id]
+
+        if (schema := get_cached_schema(hashes[node.id])) is None:
+            func = NODE_FROM_CONFIG[node.kind]
+            args = [_get_schema(parent) for parent in parents[node.id]]
+
+            if not _validate_arity(func, len(args)):
+                raise NodeResultNone(node)
+
+            try:
+                schema = SCHEMA_FROM_CONFIG.get(
+                    node.kind, _get_schema_from_unbound_query
+                )(node, *args)
+                if node.error:
+                    node.error = None
+                    node.save()
+            except Exception as err:
+                node.error = error_name_to_snake(err)
+                node.save()
+                if current_node != node:
+                    raise NodeResultNone(node=node) from err
+                raise err
+
+            # input node zero state
+            if schema is None:
+                raise NodeResultNone(node=node)
+
+            set_cached_schema(hashes[node.id], schema)
+
+        schemas[node.id] = schema
+        return schema
+
+    return _get_schema(current_node)
+
+
+def _get_all_parents(node, parents, hashes, results, seen=None):
+    # yield parents before child => topological order, stopping at nodes whose
+    # query is already cached
+    seen = set() if seen is None else seen
+    if node.id in seen or node in results:
+        return
+    seen.add(node.id)
+
+    if (query := get_cached_query(hashes[node.id])) is not None:
+        results[node] = query
+        return
+
+    for parent in parents[node.id]:
+        yield from _get_all_parents(parent, parents, hashes, results, seen)
     yield node
 
 
@@ -380,17 +495,35 @@ def _validate_arity(func, len_args):
     return len_args >= min_arity if variable_args else len_args == min_arity
 
 
-@cached_as(Node, timeout=60)
-def get_query_from_node(current_node):
-    nodes = _get_all_parents(current_node)
-    # remove duplicates (python dicts are insertion ordered)
-    nodes = list(dict.fromkeys(nodes))
+def get_query_from_node(current_node, materialized=None):
+    """Builds the query for a node from the queries of all its ancestors.
+
+    `materialized` maps node ids to tables that already hold the node's result.
+    Cached nodes are read from their cache table while it is up to date, the
+    table is only built by the workflow run.
+    """
+    parents = get_parents_by_node(current_node)
+    # the schemas of all input tables in a single catalog query
+    get_engine().prefetch_schemas(
+        [
+            node.input_table
+            for node in chain([current_node], *parents.values())
+            if node.kind == Node.Kind.INPUT
+        ]
+    )
+    materialized = {**get_cache_tables(current_node, parents), **(materialized or {})}
+    hashes = get_node_hashes(current_node, parents, materialized)
 
-    results = {}
+    results = {
+        node: get_engine().get_table(materialized[node.id])
+        for node in chain([current_node], *parents.values())
+        if node.id in materialized
+    }
+    nodes = list(_get_all_parents(current_node, parents, hashes, results))
 
     for node in nodes:
         func = NODE_FROM_CONFIG[node.kind]
-        args = [results[parent] for parent in node.parents_ordered.all()]
+        args = [results[parent] for parent in parents[node.id]]
 
         if not _validate_arity(func, len(args)):
             raise NodeResultNone(node)
@@ -411,4 +544,106 @@ def get_query_from_node(current_node):
         if results.get(node) is None:
             raise NodeResultNone(node=node)
 
-    return results[node]
+        set_cached_query(hashes[node.id], results[node])
+
+    return results[current_node]
+
+
+# Relative cost of computing a node kind, the remaining kinds are cheap projections
+NODE_COST = {
+    "join": 3,
+    "aggregation": 2,
+    "union": 2,
+    "except": 2,
+    "intersect": 2,
+    "distinct": 2,
+    "window": 2,
+    "sort": 1,
+}
+SHARED_NODE_COST_THRESHOLD = 3
+# nodes that are read from an existing table and never worth materializing
+MATERIALIZED_NODE_KINDS = [
+    Node.Kind.INPUT,
+    Node.Kind.OUTPUT,
+    Node.Kind.PIVOT,
+    Node.Kind.UNPIVOT,
+]
+
+
+def get_shared_nodes(output_nodes):
+    """Finds the ancestors shared by several output nodes that are worth computing once.
+
+    Returns the nodes where the queries of the outputs diverge in topological
+    order, if the cost of their subgraph reaches `SHARED_NODE_COST_THRESHOLD`.
+    """
+    if len(output_nodes) < 2:
+        return []
+
+    parents = get_parents_by_node(output_nodes[0])
+
+    def _get_ancestors(node, ancestors):
+        for parent in parents[node.id]:
+            if parent not in ancestors:
+                ancestors.add(parent)
+                _get_ancestors(parent, ancestors)
+        return ancestors
+
+    def _get_cost(node, seen):
+        # pivot and unpivot are already stored in an intermediate table
+        if node in seen or node.kind in [Node.Kind.PIVOT, Node.Kind.UNPIVOT]:
+            return 0
+        seen.add(node)
+        return NODE_COST.get(node.kind, 0) + sum(
+            _get_cost(parent, seen) for parent in parents[node.id]
+        )
+
+    # count how many outputs depend on each ancestor
+    ancestors = {node: _get_ancestors(node, set()) for node in output_nodes}
+    usage = Counter(chain.from_iterable(ancestors.values()))
+
+    children = {}
+    for node in chain(usage, output_nodes):
+        for parent in parents[node.id]:
+            children.setdefault(parent, set()).add(node)
+
+    shared_nodes = [
+        node
+        for node, count in usage.items()
+        if count > 1 and node.kind not in MATERIALIZED_NODE_KINDS
+        # the outputs diverge after this node
+        and all(usage.get(child, 1) < count for child in children[node])
+        and _get_cost(node, set()) >= SHARED_NODE_COST_THRESHOLD
+    ]
+
+    # ancestors always have fewer ancestors than their descendants
+    return sorted(shared_nodes, key=lambda node: len(_get_ancestors(node, set())))
+
+
+def get_outdated_cached_nodes(output_nodes):
+    """Finds the cached ancestors of the output nodes without an up to date table.
+
+    Returns the nodes in topological order, the cache table of a node is read
+    when building the cache tables of its descendants.
+    """
+    if not output_nodes:
+        return []
+
+    parents = get_parents_by_node(output_nodes[0])
+
+    def _get_ancestors(node, ancestors):
+        for parent in parents[node.id]:
+            if parent not in ancestors:
+                ancestors.add(parent)
+                _get_ancestors(parent, ancestors)
+        return ancestors
+
+    outdated_nodes = {
+        node
+        for output_node in output_nodes
+        for node in _get_ancestors(output_node, set())
+        if node.cached
+        and not table_is_up_to_date(getattr(node, "cache_table", None), node)
+    }
+
+    # ancestors always have fewer ancestors than their descendants
+    return sorted(outdated_nodes, key=lambda node: len(_get_ancestors(node, set())))
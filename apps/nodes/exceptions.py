@@ -1,6 +1,7 @@
 from functools import singledispatch
 
 from fuzzywuzzy import process
+from ibis.common.exceptions import IbisError
 from lark.exceptions import VisitError
 
 from apps.base.core.table_data import get_type_name
@@ -41,6 +42,18 @@ class ColumnNamesDontMatch(Exception):
         self.right_columns = right_columns
 
 
+# Errors in the configuration of a node, they are stored on the node and shown
+# in the editor
+NODE_ERRORS = (
+    NodeResultNone,
+    JoinTypeError,
+    ColumnNamesDontMatch,
+    VisitError,
+    ParseError,
+    IbisError,
+)
+
+
 @singledispatch
 def handle_node_exception(e):
 
@@ -57,7 +57,7 @@ class NodeUpdate(UpdateView):
 
         try:
             if not is_input and self.object.has_enough_parents:
-                get_query_from_node(self.object.parents.first())
+                self.object.parents.first().schema
             self.parent_error_node = None
         except NodeResultNone as e:
             self.parent_error_node = e.node
@@ -68,7 +68,7 @@ class NodeUpdate(UpdateView):
     def get_form_kwargs(self):
         form_kwargs = super().get_form_kwargs()
         if parent := self.object.parents.first():
-            form_kwargs["schema"] = parent.schema()
+            form_kwargs["schema"] = parent.schema
         return form_kwargs
 
     def get_success_url(self) -> str:
@@ -125,7 +125,13 @@ class NodeGrid(SingleTableMixin, DetailView):
     def get_table(self, **kwargs):
         query = get_query_from_node(self.preview_node)
         schema = query.schema()
-        table = get_table(schema, query, None, **kwargs)
+        table = get_table(
+            schema,
+            query,
+            None,
+            data_updated=self.preview_node.lineage_updated,
+            **kwargs,
+        )
 
         return RequestConfig(
             self.request, paginate=self.get_table_pagination(table)
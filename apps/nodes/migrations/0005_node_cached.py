@@ -0,0 +1,21 @@
+# Generated by Django 4.0.8 on 2026-10-18 15:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("nodes", "0004_remove_node_sentiment_column_alter_node_kind"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="node",
+            name="cached",
+            field=models.BooleanField(
+                default=False,
+                help_text="Store the result in a table that is re-used until the data changes",
+            ),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 4.0.8 on 2026-10-18 17:30
+
+from collections import defaultdict
+
+from django.db import migrations, models
+
+
+def forwards_func(apps, schema_editor):
+    Node = apps.get_model("nodes", "Node")
+    Edge = apps.get_model("nodes", "Edge")
+    Workflow = apps.get_model("workflows", "Workflow")
+
+    nodes = {node.id: node for node in Node.objects.select_related("input_table")}
+    parents = defaultdict(list)
+    for child_id, parent_id in Edge.objects.values_list("child_id", "parent_id"):
+        parents[child_id].append(parent_id)
+
+    lineage = {}
+
+    def _get_lineage(node_id):
+        if node_id not in lineage:
+            # guards against cycles, which the editor does not allow
+            lineage[node_id] = None
+            node = nodes[node_id]
+            lineage[node_id] = max(
+                filter(
+                    None,
+                    (
+                        node.data_updated,
+                        node.input_table.data_updated if node.input_table else None,
+                        *(_get_lineage(parent_id) for parent_id in parents[node_id]),
+                    ),
+                ),
+                default=None,
+            )
+        return lineage[node_id]
+
+    for node in nodes.values():
+        node.lineage_updated = _get_lineage(node.id)
+
+    Node.objects.bulk_update(nodes.values(), ["lineage_updated"], batch_size=1000)
+
+    # updates of the input tables are now propagated to the workflow
+    input_updated = {}
+    for node in nodes.values():
+        if node.input_table and node.input_table.data_updated:
+            input_updated[node.workflow_id] = max(
+                node.input_table.data_updated,
+                input_updated.get(node.workflow_id, node.input_table.data_updated),
+            )
+
+    workflows = list(Workflow.objects.filter(id__in=input_updated))
+    for workflow in workflows:
+        workflow.data_updated = max(workflow.data_updated, input_updated[workflow.id])
+
+    Workflow.objects.bulk_update(workflows, ["data_updated"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("nodes", "0005_node_cached"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="node",
+            name="lineage_updated",
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.RunPython(forwards_func, migrations.RunPython.noop),
+    ]
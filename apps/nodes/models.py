@@ -15,6 +15,20 @@ from apps.nodes.config import NODE_CONFIG
 from apps.tables.models import Table
 from apps.workflows.models import Workflow
 
+# Node fields that are only relevant for the UI and never change the query
+QUERY_UNRELATED_FIELDS = {
+    "name",
+    "x",
+    "y",
+    "error",
+    "created",
+    "updated",
+    "has_been_saved",
+    "text_text",
+    # changes upstream are already captured by the parent hashes
+    "lineage_updated",
+}
+
 
 class Node(DirtyFieldsMixin, BaseModel):
     class Meta:
@@ -67,8 +81,15 @@ class Node(DirtyFieldsMixin, BaseModel):
     )
 
     data_updated = models.DateTimeField(null=True, editable=False)
+    # Latest change of the node, its ancestors or their input tables, it is
+    # propagated to the descendants on every change
+    lineage_updated = models.DateTimeField(null=True, editable=False)
 
     error = models.CharField(max_length=300, null=True)
+    cached = models.BooleanField(
+        default=False,
+        help_text="Store the result in a table that is re-used until the data changes",
+    )
 
     # ======== Node specific columns ========= #
 
@@ -164,19 +185,52 @@ class Node(DirtyFieldsMixin, BaseModel):
     has_been_saved = models.BooleanField(default=False)
 
     def save(self, *args, **kwargs):
-        dirty_fields = set(self.get_dirty_fields(check_relationship=True).keys()) - {
-            "name",
-            "x",
-            "y",
-            "error",
-        }
+        dirty_fields = (
+            set(self.get_dirty_fields(check_relationship=True).keys())
+            - QUERY_UNRELATED_FIELDS
+        )
         if dirty_fields:
             self.workflow.data_updated = timezone.now()
             self.workflow.save()
         if dirty_fields and "data_updated" not in dirty_fields:
             self.data_updated = timezone.now()
 
-        return super().save(*args, **kwargs)
+        # e.g. saving the error of the node or moving it never changes the query
+        if not (self._state.adding or dirty_fields):
+            return super().save(*args, **kwargs)
+
+        if not self._state.adding:
+            # the version might have been raised by a change upstream since loading
+            stored = (
+                Node.objects.filter(pk=self.pk)
+                .values_list("lineage_updated", flat=True)
+                .first()
+            )
+            self.lineage_updated = max(
+                filter(None, (self.lineage_updated, stored)), default=None
+            )
+        lineage_updated = max(
+            filter(
+                None,
+                (
+                    self.lineage_updated,
+                    self.data_updated,
+                    self.input_table.data_updated if self.input_table else None,
+                ),
+            ),
+            default=None,
+        )
+        lineage_changed = lineage_updated != self.lineage_updated
+        self.lineage_updated = lineage_updated
+
+        result = super().save(*args, **kwargs)
+
+        if lineage_changed:
+            from ._utils import propagate_lineage_updated
+
+            propagate_lineage_updated([self], self.lineage_updated)
+
+        return result
 
     @property
     def is_valid(self):
@@ -189,10 +243,9 @@ class Node(DirtyFieldsMixin, BaseModel):
 
     @cached_property
     def schema(self):
-        from .engine import get_query_from_node
+        from .engine import get_schema_from_node
 
-        query = get_query_from_node(self)
-        return query.schema
+        return get_schema_from_node(self)
 
     @property
     def display_name(self):
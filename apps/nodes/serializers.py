@@ -41,6 +41,7 @@ class NodeSerializer(serializers.ModelSerializer):
             "text_text",
             "parent_edges",
             "join_is_valid",
+            "cached",
         )
         read_only = ["parent_edges"]
 
@@ -1,7 +1,11 @@
-from django.db.models.signals import post_delete
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch.dispatcher import receiver
 from django.utils import timezone
 
+from apps.tables.models import Table
+from apps.workflows.models import Workflow
+
+from ._utils import propagate_lineage_updated
 from .models import Edge, Node
 
 
@@ -15,3 +19,33 @@ def update_workflow_on_node_deletion(sender, instance, *args, **kwargs):
 def update_workflow_on_edge_deletion(sender, instance, *args, **kwargs):
     instance.child.data_updated = timezone.now()
     instance.child.save()
+
+
+@receiver(m2m_changed, sender=Node.parents.through)
+def update_child_on_parents_changed(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    # edges added via `node.parents`, like `Edge.save`
+    if action not in ["post_add", "post_remove", "post_clear"]:
+        return
+
+    children = Node.objects.filter(pk__in=pk_set or []) if reverse else [instance]
+    for child in children:
+        child.data_updated = timezone.now()
+        child.save()
+
+
+@receiver(post_save, sender=Table)
+def update_nodes_on_input_table_update(sender, instance, *args, **kwargs):
+    # e.g. an integration synced again or a workflow ran
+    nodes = list(
+        Node.objects.filter(input_table=instance).exclude(
+            lineage_updated__gte=instance.data_updated
+        )
+    )
+    if nodes:
+        propagate_lineage_updated(nodes, instance.data_updated)
+        Workflow.objects.filter(
+            id__in={node.workflow_id for node in nodes},
+            data_updated__lt=instance.data_updated,
+        ).update(data_updated=instance.data_updated)
@@ -5,11 +5,24 @@ import pandas as pd
 import pytest
 from django.utils import timezone
 
+from apps.base.clients import get_engine
 from apps.columns.models import Column
 from apps.filters.models import DateRange, Filter
-from apps.nodes.engine import get_pivot_query, get_query_from_node, get_unpivot_query
+from apps.nodes._utils import create_or_replace_cache_table, table_is_up_to_date
+from apps.nodes.engine import (
+    NODE_FROM_CONFIG,
+    get_aggregation_query,
+    get_outdated_cached_nodes,
+    get_pivot_query,
+    get_query_from_node,
+    get_schema_from_node,
+    get_select_query,
+    get_shared_nodes,
+    get_unpivot_query,
+)
 from apps.nodes.models import Node
 from apps.nodes.tests.mocks import DEFAULT_X_Y, INPUT_QUERY
+from apps.tables.models import Table
 
 pytestmark = pytest.mark.django_db
 
@@ -77,6 +90,169 @@ def test_select_node(setup, engine):
     assert query.equals(engine.data.drop(["athlete", "birthday"]))
 
 
+def test_node_query_cache(setup, engine, mocker):
+    input_node, workflow = setup
+    select_node = Node.objects.create(
+        kind=Node.Kind.SELECT, workflow=workflow, **DEFAULT_X_Y
+    )
+    select_node.parents.add(input_node)
+    select_node.columns.create(column="athlete")
+    expected = get_query_from_node(select_node)
+
+    select_query = mocker.create_autospec(
+        get_select_query, side_effect=get_select_query
+    )
+    mocker.patch.dict(NODE_FROM_CONFIG, {"select": select_query})
+
+    # unchanged node re-uses the cached query
+    assert get_query_from_node(select_node).equals(expected)
+    assert select_query.call_count == 0
+
+    # changes to the node config invalidate the cache
+    select_node.columns.create(column="birthday")
+    assert get_query_from_node(select_node).equals(
+        engine.data.projection(["athlete", "birthday"])
+    )
+    assert select_query.call_count == 1
+
+
+def test_node_schema(setup, engine, mocker):
+    input_node, workflow = setup
+    aggregation_node = Node.objects.create(
+        kind=Node.Kind.AGGREGATION, workflow=workflow, **DEFAULT_X_Y
+    )
+    aggregation_node.parents.add(input_node)
+    aggregation_node.columns.create(column="birthday")
+    aggregation_node.aggregations.create(column="id", function="sum")
+    unpivot_node = Node.objects.create(
+        kind=Node.Kind.UNPIVOT,
+        workflow=workflow,
+        unpivot_column="category",
+        unpivot_value="value",
+        **DEFAULT_X_Y,
+    )
+    unpivot_node.parents.add(aggregation_node)
+    unpivot_node.columns.create(column="id")
+    unpivot_node.secondary_columns.create(column="birthday")
+
+    aggregation_query = mocker.create_autospec(
+        get_aggregation_query, side_effect=get_aggregation_query
+    )
+    mocker.patch.dict(NODE_FROM_CONFIG, {"aggregation": aggregation_query})
+
+    # inferred from the parent schemas, without querying the engine
+    assert get_schema_from_node(unpivot_node) == ibis.schema(
+        [("birthday", "date"), ("category", "string"), ("value", "int64")]
+    )
+    assert engine.query_and_wait.call_count == 0
+    assert aggregation_query.call_count == 1
+
+    # unchanged nodes re-use the cached schema
+    assert get_schema_from_node(aggregation_node) == ibis.schema(
+        [("birthday", "date"), ("id", "int64")]
+    )
+    assert aggregation_query.call_count == 1
+
+
+def test_cached_node(setup, engine):
+    input_node, workflow = setup
+    select_node = Node.objects.create(
+        kind=Node.Kind.SELECT, workflow=workflow, cached=True, **DEFAULT_X_Y
+    )
+    select_node.parents.add(input_node)
+    select_node.columns.create(column="athlete")
+    output_node = Node.objects.create(
+        kind=Node.Kind.OUTPUT, workflow=workflow, **DEFAULT_X_Y
+    )
+    output_node.parents.add(select_node)
+
+    # reading the node never builds the cache table
+    get_query_from_node(output_node)
+    assert engine.raw_sql.call_count == 0
+    assert get_outdated_cached_nodes([output_node]) == [select_node]
+
+    table = create_or_replace_cache_table(select_node, get_query_from_node(select_node))
+    assert table.source == Table.Source.CACHE_NODE
+    assert get_outdated_cached_nodes([output_node]) == []
+
+    # the cache table is read until the data changes
+    assert get_query_from_node(output_node).equals(get_engine().get_table(table))
+
+    input_node.input_table.data_updated = timezone.now()
+    input_node.input_table.save()
+    assert get_outdated_cached_nodes([output_node]) == [select_node]
+
+
+def test_lineage_updated(setup, integration_table_factory, django_assert_num_queries):
+    input_node, workflow = setup
+    select_nodes = []
+    for _ in range(2):
+        select_node = Node.objects.create(
+            kind=Node.Kind.SELECT, workflow=workflow, **DEFAULT_X_Y
+        )
+        select_node.parents.add(input_node)
+        select_nodes.append(select_node)
+    union_node = Node.objects.create(
+        kind=Node.Kind.UNION, workflow=workflow, **DEFAULT_X_Y
+    )
+    union_node.parents.add(*select_nodes)
+
+    union_node.refresh_from_db()
+    assert union_node.lineage_updated >= input_node.lineage_updated
+    table = integration_table_factory(project=workflow.project)
+    assert table_is_up_to_date(table, union_node)
+
+    # a sync of the input table is propagated through both paths of the diamond
+    input_node.input_table.data_updated = timezone.now()
+    input_node.input_table.save()
+    union_node.refresh_from_db()
+    workflow.refresh_from_db()
+    assert union_node.lineage_updated == input_node.input_table.data_updated
+    assert workflow.data_updated == input_node.input_table.data_updated
+    assert not table_is_up_to_date(table, union_node)
+
+    # changes to a node are propagated to its descendants only
+    select_nodes[0].columns.create(column="athlete")
+    select_nodes[0].refresh_from_db()
+    union_node.refresh_from_db()
+    input_node.refresh_from_db()
+    assert union_node.lineage_updated == select_nodes[0].lineage_updated
+    assert input_node.lineage_updated < union_node.lineage_updated
+
+    # moving a node never changes the query, only the node is updated
+    union_node.x = 100
+    with django_assert_num_queries(1):
+        union_node.save()
+
+
+def test_get_shared_nodes(setup):
+    input_node, workflow = setup
+    join_node = Node.objects.create(
+        kind=Node.Kind.JOIN, workflow=workflow, **DEFAULT_X_Y
+    )
+    join_node.parents.add(input_node)
+    join_node.parents.add(input_node.make_clone(), through_defaults={"position": 1})
+
+    output_nodes = []
+    for parent in [join_node, join_node, input_node]:
+        select_node = Node.objects.create(
+            kind=Node.Kind.SELECT, workflow=workflow, **DEFAULT_X_Y
+        )
+        select_node.parents.add(parent)
+        output_node = Node.objects.create(
+            kind=Node.Kind.OUTPUT, workflow=workflow, **DEFAULT_X_Y
+        )
+        output_node.parents.add(select_node)
+        output_nodes.append(output_node)
+
+    assert get_shared_nodes(output_nodes[:1]) == []
+    # the outputs diverge after the join
+    assert get_shared_nodes(output_nodes[:2]) == [join_node]
+    # the input is shared as well but reading it is cheap
+    assert get_shared_nodes(output_nodes) == [join_node]
+    assert get_shared_nodes([output_nodes[0], output_nodes[2]]) == []
+
+
 def test_join_node(setup, engine):
     input_node, workflow = setup
     second_input_node = input_node.make_clone()
@@ -41,6 +41,8 @@ class ProjectRunForm(ModelForm):
         model = Project
         fields = [
             "daily_schedule_time",
+            "run_concurrency",
+            "warm_cache",
         ]
         widgets = {
             "daily_schedule_time": forms.TimeInput(attrs={"step": "3600"}),
@@ -0,0 +1,26 @@
+# Generated by Django 4.0.8 on 2026-10-18 09:12
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="project",
+            name="run_concurrency",
+            field=models.PositiveSmallIntegerField(
+                default=4,
+                help_text="Maximum number of integrations and workflows that run at the same time",
+                validators=[
+                    django.core.validators.MinValueValidator(1),
+                    django.core.validators.MaxValueValidator(16),
+                ],
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.0.8 on 2026-10-18 13:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0003_project_run_concurrency"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="project",
+            name="warm_cache",
+            field=models.BooleanField(
+                default=False,
+                help_text="Pre-compute dashboards and workflow previews after every run",
+            ),
+        ),
+    ]
@@ -2,6 +2,7 @@ from datetime import time, timedelta
 
 from dirtyfields import DirtyFieldsMixin
 from django.conf import settings
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from django.urls import reverse
 from django.utils.functional import cached_property
@@ -39,6 +40,15 @@ class Project(DirtyFieldsMixin, BaseModel):
     periodic_task = models.OneToOneField(
         PeriodicTask, null=True, on_delete=models.SET_NULL
     )
+    run_concurrency = models.PositiveSmallIntegerField(
+        default=4,
+        validators=[MinValueValidator(1), MaxValueValidator(16)],
+        help_text="Maximum number of integrations and workflows that run at the same time",
+    )
+    warm_cache = models.BooleanField(
+        default=False,
+        help_text="Pre-compute dashboards and workflow previews after every run",
+    )
 
     def __str__(self):
         return self.name
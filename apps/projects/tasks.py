@@ -1,11 +1,14 @@
 import json
+import logging
 import re
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from graphlib import CycleError, TopologicalSorter
 from uuid import uuid4
 
 from celery import shared_task
 from celery_progress import backend
-from django.db import transaction
+from django.db import connections, transaction
 from django.db.models import Q
 from django.utils import timezone
 
@@ -21,6 +24,8 @@ from apps.workflows.models import Workflow
 
 from .models import Project
 
+logger = logging.getLogger(__name__)
+
 
 def _update_progress_from_job_run(progress_recorder, run_info, job_run):
     if progress_recorder:
@@ -35,6 +40,21 @@ def _get_entity_from_input_table(table: Table):
         return table.integration
 
 
+def _run_entity(entity, job_run_id, skip_up_to_date):
+    try:
+        if isinstance(entity, Integration):
+            run_integration_task(
+                entity.kind, job_run_id, skip_up_to_date=skip_up_to_date
+            )
+        elif isinstance(entity, Workflow):
+            workflow_tasks.run_workflow_task(
+                job_run_id, skip_up_to_date=skip_up_to_date
+            )
+    finally:
+        # every thread opens its own database connection
+        connections.close_all()
+
+
 @shared_task(bind=True)
 def run_project_task(self, graph_run_id: int, scheduled_only=False):
 
@@ -104,31 +124,52 @@ def run_project_task(self, graph_run_id: int, scheduled_only=False):
     ts = TopologicalSorter(graph)
 
     try:
-        for entity in ts.static_order():
+        ts.prepare()
+    except CycleError:
+        raise Exception("Your integrations and workflows have a circular dependency")
 
-            job_run = job_runs[entity]
-            job_run.state = JobRun.State.RUNNING
-            job_run.started_at = timezone.now()
-            _update_progress_from_job_run(progress_recorder, run_info, job_run)
-            job_run.save()
+    # Dispatch every entity as soon as its dependencies are done, independent
+    # integrations and workflows run concurrently up to the project limit. The
+    # job run bookkeeping stays on this thread.
+    ready = deque()
+    running = {}
 
-            try:
-                if isinstance(entity, Integration):
-                    run_integration_task(entity.kind, job_run.id)
-                elif isinstance(entity, Workflow):
-                    workflow_tasks.run_workflow_task(job_run.id)
-                job_run.state = JobRun.State.SUCCESS
+    with ThreadPoolExecutor(max_workers=project.run_concurrency) as executor:
+        while ts.is_active():
+            ready.extend(ts.get_ready())
 
-            except Exception:
-                job_run.state = JobRun.State.FAILED
+            while ready and len(running) < project.run_concurrency:
+                entity = ready.popleft()
 
-            finally:
+                job_run = job_runs[entity]
+                job_run.state = JobRun.State.RUNNING
+                job_run.started_at = timezone.now()
+                _update_progress_from_job_run(progress_recorder, run_info, job_run)
+                job_run.save(update_fields=["state", "started_at", "updated"])
+
+                # scheduled runs skip workflow outputs that are already up to date
+                future = executor.submit(
+                    _run_entity, entity, job_run.id, scheduled_only
+                )
+                running[future] = entity
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                entity = running.pop(future)
+
+                job_run = job_runs[entity]
+                if exception := future.exception():
+                    logger.warning("Run of %s failed", entity, exc_info=exception)
+                job_run.state = (
+                    JobRun.State.FAILED if exception else JobRun.State.SUCCESS
+                )
                 _update_progress_from_job_run(progress_recorder, run_info, job_run)
                 job_run.completed_at = timezone.now()
-                job_run.save()
+                # the task might have updated other fields, e.g. `skipped`
+                job_run.save(update_fields=["state", "completed_at", "updated"])
 
-    except CycleError:
-        Exception("Your integrations and workflows have a circular dependency")
+                ts.done(entity)
 
     if graph_run.runs.filter(state=JobRun.State.FAILED).exists():
         raise Exception(
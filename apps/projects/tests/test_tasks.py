@@ -1,3 +1,4 @@
+import threading
 from uuid import uuid4
 
 import pytest
@@ -93,12 +94,14 @@ def test_run_project(
 
     # an error is raised by workflow_1
 
-    def side_effect(job_run_id):
-        job_run = JobRun.objects.get(pk=job_run_id)
-        if job_run.source == JobRun.Source.WORKFLOW and job_run.workflow == workflow_1:
+    # entities run on worker threads, which can't see the test transaction
+    def side_effect(entity, job_run_id, skip_up_to_date):
+        if entity == workflow_1:
             raise Exception
 
-    run_workflow_task.side_effect = side_effect
+    run_entity = mocker.patch(
+        "apps.projects.tasks._run_entity", side_effect=side_effect
+    )
 
     graph_run = GraphRun.objects.create(
         project=project,
@@ -112,10 +115,13 @@ def test_run_project(
 
     workflow_1.refresh_from_db()
     assert workflow_1.state == Workflow.State.FAILED
+    assert {
+        run.source_obj for run in graph_run.runs.filter(state=JobRun.State.FAILED)
+    } == {workflow_1}
 
     # test scheduled behaviour
 
-    run_workflow_task.side_effect = None
+    run_entity.side_effect = None
 
     integration.is_scheduled = True
     integration.save()
@@ -135,6 +141,69 @@ def test_run_project(
     assert {run.source_obj for run in graph_run.runs.all()} == {integration, workflow_2}
 
 
+def test_run_project_concurrency(
+    project_factory,
+    integration_table_factory,
+    node_factory,
+    workflow_factory,
+    mocker,
+):
+    # integration_1 -> workflow, integration_2, integration_3
+
+    project = project_factory(run_concurrency=2)
+    integration_tables = [
+        integration_table_factory(
+            project=project,
+            integration__project=project,
+            integration__kind=Integration.Kind.SHEET,
+        )
+        for _ in range(3)
+    ]
+    integration_1 = integration_tables[0].integration
+    workflow = workflow_factory(project=project)
+    node_factory(
+        workflow=workflow, kind=Node.Kind.INPUT, input_table=integration_tables[0]
+    )
+
+    lock = threading.Lock()
+    running = set()
+    max_running = 0
+    events = []
+    # the first two entities wait for each other, they can only both pass if
+    # they run concurrently
+    barrier = threading.Barrier(2, timeout=5)
+
+    def side_effect(entity, job_run_id, skip_up_to_date):
+        nonlocal max_running
+        with lock:
+            running.add(entity)
+            max_running = max(max_running, len(running))
+            events.append(("start", entity))
+            is_first = len(events) <= 2
+        if is_first:
+            barrier.wait()
+        with lock:
+            running.remove(entity)
+            events.append(("end", entity))
+
+    mocker.patch("apps.projects.tasks._run_entity", side_effect=side_effect)
+
+    graph_run = GraphRun.objects.create(
+        project=project,
+        task_id=uuid4(),
+        state=GraphRun.State.RUNNING,
+        started_at=timezone.now(),
+    )
+    tasks.run_project_task(graph_run.id)
+
+    # the independent integrations run concurrently, up to the project limit
+    assert max_running == 2
+    assert len(events) == 8
+
+    # the workflow waits for its integration
+    assert events.index(("end", integration_1)) < events.index(("start", workflow))
+
+
 PROJECT_NAME = "Mission possible"
 
 
@@ -0,0 +1,18 @@
+# Generated by Django 4.0.8 on 2026-10-18 09:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("runs", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="jobrun",
+            name="skipped",
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.0.8 on 2026-10-18 12:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("runs", "0003_jobrun_skipped"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="jobrun",
+            name="skipped_outputs",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
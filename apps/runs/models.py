@@ -44,6 +44,10 @@ class JobRun(DirtyFieldsMixin, BaseModel):
     graph_run = models.ForeignKey(
         "runs.GraphRun", null=True, on_delete=models.CASCADE, related_name="runs"
     )
+    # the sources were unchanged since the last run and nothing was rebuilt
+    skipped = models.BooleanField(default=False)
+    # the workflow outputs that were already up to date and not rebuilt
+    skipped_outputs = models.PositiveIntegerField(default=0)
 
     STATE_TO_ICON = {
         State.RUNNING: ICONS["loading"],
@@ -75,6 +79,10 @@ class JobRun(DirtyFieldsMixin, BaseModel):
 
     @property
     def state_text(self):
+        if self.skipped and self.state == self.State.SUCCESS:
+            return "Skipped, already up to date"
+        if self.skipped_outputs and self.state == self.State.SUCCESS:
+            return f"Success, skipped {self.skipped_outputs} up to date outputs"
         return self.STATE_TO_MESSAGE[self.state]
 
     @property
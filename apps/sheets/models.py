@@ -2,6 +2,7 @@ import textwrap
 
 from django.db import models
 
+from apps.base.core.utils import md5_kwargs
 from apps.base.models import BaseModel
 from apps.integrations.models import Integration
 
@@ -55,6 +56,16 @@ class Sheet(BaseModel):
         # avoid a race condition with the sync task
         self.save(update_fields=["drive_modified_date"])
 
+    def get_content_hash(self):
+        from apps.sheets.sheets import get_values_from_sheet
+
+        # unformatted values, cosmetic edits to the sheet are ignored
+        return md5_kwargs(
+            values=get_values_from_sheet(self),
+            sheet_name=self.sheet_name,
+            cell_range=self.cell_range,
+        )
+
     @property
     def up_to_date_with_drive(self):
         return self.drive_modified_date == self.drive_file_last_modified_at_sync
@@ -32,6 +32,25 @@ def get_last_modified_from_drive_file(sheet: Sheet):
     return parse_datetime(drive_file["modifiedDate"])
 
 
+def get_values_from_sheet(sheet: Sheet):
+
+    sheet_id = get_sheets_id_from_url(sheet.url)
+    client = clients.sheets()
+    # without a sheet name, the range refers to the first sheet
+    cell_range = get_cell_range(sheet.sheet_name, sheet.cell_range) or "A:ZZZ"
+    response = (
+        client.spreadsheets()
+        .values()
+        .get(
+            spreadsheetId=sheet_id,
+            range=cell_range,
+            valueRenderOption="UNFORMATTED_VALUE",
+        )
+        .execute()
+    )
+    return response.get("values", [])
+
+
 def get_cell_range(sheet_name, cell_range):
     return (
         f"{sheet_name}!{cell_range}"
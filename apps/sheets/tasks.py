@@ -9,6 +9,7 @@ from apps.base.core.utils import catchtime
 from apps.integrations.emails import send_integration_ready_email
 from apps.runs.models import JobRun
 from apps.tables.models import Table
+from apps.tables.tasks import warm_table_dependents
 from apps.users.models import CustomUser
 
 from .models import Sheet
@@ -35,13 +36,27 @@ def run_sheet_sync_task(self, run_id, skip_up_to_date=False):
 
         sheet.sync_updates_from_drive()
 
-        if not (sheet.up_to_date_with_drive and skip_up_to_date):
+        skipped = sheet.up_to_date_with_drive and skip_up_to_date
+        if not skipped:
+            # drive is also modified by cosmetic edits, e.g. formatting
+            content_hash = sheet.get_content_hash()
+            skipped = integration.is_unchanged(content_hash, created)
+
+        sheet.drive_file_last_modified_at_sync = sheet.drive_modified_date
+        sheet.save()
+
+        if skipped:
+            # keep data_updated, downstream caches are still valid
+            run.skipped = True
+            run.save(update_fields=["skipped"])
+        else:
             with catchtime() as get_time_to_sync:
                 get_engine().import_table_from_sheet(table=table, sheet=sheet)
 
             table.sync_metadata_from_source()
-            sheet.drive_file_last_modified_at_sync = sheet.drive_modified_date
-            sheet.save()
+            integration.content_hash = content_hash
+            integration.save(update_fields=["content_hash"])
+            warm_table_dependents([table])
 
     if created:
         send_integration_ready_email(integration, int(get_time_to_sync()))
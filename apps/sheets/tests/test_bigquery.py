@@ -9,31 +9,13 @@ def test_sheet_all_string(project, engine, sheet_factory, integration_table_fact
     sheet = sheet_factory(integration__project=project)
     table = integration_table_factory(project=project, integration=sheet.integration)
 
-    get_engine().import_table_from_sheet(table, sheet)
-
-    # initial call has result with strings
-    initial_call = engine.query.call_args_list[0]
-    INTIAL_SQL = "CREATE OR REPLACE TABLE dataset.table AS SELECT * FROM table_external"
-    assert initial_call.args == (INTIAL_SQL,)
-    job_config = initial_call.kwargs["job_config"]
-    external_config = job_config.table_definitions["table_external"]
-    assert external_config.source_uris == [sheet.url]
-    assert external_config.autodetect
-    assert external_config.options.range == sheet.cell_range
+    engine.sheet_sample.return_value = [["Name", "Age"], ["Neera", "4"]]
 
-    # header call is to a temporary table with skipped leading rows
-    header_call = engine.query.call_args_list[1]
-    HEADER_SQL = "select * from (select * from dataset.table except distinct select * from table_temp) limit 1"
-    assert header_call.args == (HEADER_SQL,)
-    job_config = header_call.kwargs["job_config"]
-    external_config = job_config.table_definitions["table_temp"]
-    assert external_config.source_uris == [sheet.url]
-    assert external_config.autodetect
-    assert external_config.options.range == sheet.cell_range
-    assert external_config.options.skip_leading_rows == 1
+    get_engine().import_table_from_sheet(table, sheet)
 
-    # final call with explicit schema
-    final_call = engine.query.call_args_list[2]
+    # single call with explicit schema from the sampled header
+    assert engine.query.call_count == 1
+    final_call = engine.query.call_args_list[0]
     FINAL_SQL = "CREATE OR REPLACE TABLE dataset.table AS SELECT * FROM table_external"
     assert final_call.args == (FINAL_SQL,)
     job_config = final_call.kwargs["job_config"]
@@ -49,6 +31,23 @@ def test_sheet_all_string(project, engine, sheet_factory, integration_table_fact
     assert schema[0].field_type == "STRING"
 
 
+def test_sheet_typed_sample(
+    project, engine, sheet_factory, integration_table_factory, mocker
+):
+    mocker.patch(
+        "apps.base.engine.bigquery.bq_table_schema_is_string_only", return_value=False
+    )
+    sheet = sheet_factory(integration__project=project)
+    table = integration_table_factory(project=project, integration=sheet.integration)
+
+    get_engine().import_table_from_sheet(table, sheet)
+
+    # bigquery detects the header and the types itself
+    assert engine.query.call_count == 1
+    job_config = engine.query.call_args.kwargs["job_config"]
+    assert job_config.table_definitions["table_external"].autodetect
+
+
 def get_cell_range_from_job(query):
     return (
         query.call_args_list[0]
@@ -0,0 +1,39 @@
+# Generated by Django 4.0.8 on 2026-10-18 18:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("widgets", "0003_rollup"),
+        ("tables", "0002_rename_bq_dataset_table_dataset_name_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="table",
+            name="rollup",
+            field=models.OneToOneField(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="table",
+                to="widgets.rollup",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="table",
+            name="source",
+            field=models.CharField(
+                choices=[
+                    ("integration", "Integration"),
+                    ("workflow_node", "Workflow node"),
+                    ("intermediate_node", "Intermediate node"),
+                    ("cache_node", "Cache node"),
+                    ("rollup", "Rollup"),
+                ],
+                max_length=18,
+            ),
+        ),
+    ]
@@ -27,9 +27,20 @@ class Table(BaseModel):
         WORKFLOW_NODE = "workflow_node", "Workflow node"
         INTERMEDIATE_NODE = "intermediate_node", "Intermediate node"
         CACHE_NODE = "cache_node", "Cache node"
-
-    _clone_excluded_o2o_fields = ["workflow_node", "cache_node", "intermediate_node"]
-    _clone_excluded_m2o_or_o2m_fields = ["input_nodes", "exports", "widget_set"]
+        ROLLUP = "rollup", "Rollup"
+
+    _clone_excluded_o2o_fields = [
+        "workflow_node",
+        "cache_node",
+        "intermediate_node",
+        "rollup",
+    ]
+    _clone_excluded_m2o_or_o2m_fields = [
+        "input_nodes",
+        "exports",
+        "widget_set",
+        "rollups",
+    ]
 
     name = models.CharField(max_length=settings.BIGQUERY_TABLE_NAME_LENGTH)
     namespace = models.CharField(max_length=settings.BIGQUERY_TABLE_NAME_LENGTH)
@@ -55,6 +66,12 @@ class Table(BaseModel):
         null=True,
         related_name="cache_table",
     )
+    rollup = models.OneToOneField(
+        "widgets.Rollup",
+        on_delete=models.CASCADE,
+        null=True,
+        related_name="table",
+    )
 
     num_rows = models.IntegerField(default=0)
     data_updated = models.DateTimeField(auto_now_add=True)
@@ -105,6 +122,8 @@ class Table(BaseModel):
             return self.intermediate_node.workflow
         elif self.source == self.Source.CACHE_NODE:
             return self.cache_node.workflow
+        elif self.source == self.Source.ROLLUP:
+            return self.rollup.source_table.source_obj
 
     @property
     def out_of_date(self):
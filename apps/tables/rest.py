@@ -20,5 +20,9 @@ class TableViewSet(viewsets.ModelViewSet):
             return Table.objects.none()
 
         return Table.available.exclude(
-            source__in=[Table.Source.INTERMEDIATE_NODE, Table.Source.CACHE_NODE]
+            source__in=[
+                Table.Source.INTERMEDIATE_NODE,
+                Table.Source.CACHE_NODE,
+                Table.Source.ROLLUP,
+            ]
         )
@@ -0,0 +1,66 @@
+import logging
+
+from celery import shared_task
+from django.db import transaction
+
+from apps.base.core.table_data import GyanaTableData
+from apps.nodes.engine import get_query_from_node
+from apps.nodes.models import Node
+from apps.widgets.models import Widget
+from apps.widgets.rollups import update_rollups
+from apps.widgets.visuals import warm_output
+
+from .models import Table
+
+
+@shared_task
+def warm_table_dependents_task(table_ids):
+    """Refreshes the rollups of the tables and, for projects that opted in, computes
+    the widget outputs and input node previews reading from the tables.
+
+    The results are stored in the cache, so the first viewer after a scheduled
+    run does not wait for the queries.
+    """
+    for table in Table.objects.filter(pk__in=table_ids):
+        # refreshed first, the widgets below read from the rollups
+        try:
+            update_rollups(table)
+        except Exception as e:
+            # the widgets read from the table until the next sync
+            logging.warning(e, exc_info=e)
+
+        if not table.project.warm_cache:
+            continue
+
+        widgets = Widget.objects.filter(
+            page__dashboard__in=table.used_in_dashboards, table=table
+        ).select_related("table", "page")
+        for widget in widgets:
+            control = widget.page.control if widget.page.has_control else None
+            try:
+                warm_output(widget, control)
+            except Exception as e:
+                # the error is displayed when the widget is requested
+                logging.warning(e, exc_info=e)
+
+        nodes = Node.objects.filter(
+            workflow__in=table.used_in_workflows, input_table=table
+        )
+        for node in nodes:
+            try:
+                GyanaTableData(
+                    get_query_from_node(node), node.lineage_updated
+                ).prefetch()
+            except Exception as e:
+                logging.warning(e, exc_info=e)
+
+
+def warm_table_dependents(tables):
+    """Schedules the rollup refresh and, for projects that opted in, pre-warming."""
+    table_ids = [
+        table.id
+        for table in tables
+        if table.project.warm_cache or table.widget_set.exists()
+    ]
+    if table_ids:
+        transaction.on_commit(lambda: warm_table_dependents_task.delay(table_ids))
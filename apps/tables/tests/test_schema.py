@@ -0,0 +1,51 @@
+from types import SimpleNamespace
+
+import pytest
+
+from apps.base.clients import get_engine
+
+pytestmark = pytest.mark.django_db
+
+
+def _column(table_name, column_name, data_type, is_nullable="YES"):
+    return SimpleNamespace(
+        table_name=table_name,
+        column_name=column_name,
+        data_type=data_type,
+        is_nullable=is_nullable,
+    )
+
+
+def test_prefetch_schemas(engine, integration_table_factory):
+    table = integration_table_factory(name="stores")
+    other_table = integration_table_factory(name="orders")
+    nested_table = integration_table_factory(name="nested")
+    engine.query_and_wait.return_value = [
+        _column("nested", "id", "INT64"),
+        _column("nested", "tags", "ARRAY<STRING>"),
+        _column("orders", "id", "INT64", "NO"),
+        _column("orders", "created", "TIMESTAMP"),
+        _column("stores", "name", "STRING"),
+    ]
+
+    get_engine().prefetch_schemas([table, other_table, nested_table, None])
+
+    # a single catalog query for the dataset
+    assert engine.query_and_wait.call_count == 1
+    query = engine.query_and_wait.call_args.args[0]
+    assert "`project.dataset`.INFORMATION_SCHEMA.COLUMNS" in query
+
+    schema = get_engine().get_table(other_table).schema()
+    assert list(schema.names) == ["id", "created"]
+    assert not schema["id"].nullable
+    assert schema["created"].is_timestamp()
+    assert get_engine().get_table(table).schema().names == ("name",)
+    assert engine.table.call_count == 0
+
+    # nested types are reflected
+    get_engine().get_table(nested_table)
+    assert engine.table.call_count == 1
+
+    # the cached schemas are not looked up again
+    get_engine().prefetch_schemas([table, other_table])
+    assert engine.query_and_wait.call_count == 1
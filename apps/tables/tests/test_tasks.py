@@ -0,0 +1,20 @@
+import pytest
+
+from apps.tables.tasks import warm_table_dependents_task
+from apps.widgets.models import Widget
+from apps.widgets.visuals import metric_to_output
+
+pytestmark = pytest.mark.django_db
+
+
+def test_warm_table_dependents(widget_factory, engine):
+    widget = widget_factory(kind=Widget.Kind.METRIC)
+    widget.aggregations.create(column="stars", function="sum")
+    execute = engine.set_data(42)
+
+    warm_table_dependents_task([widget.table.id])
+    assert execute.call_count == 1
+
+    widget.refresh_from_db()
+    assert metric_to_output(widget, None) == 42
+    assert execute.call_count == 1
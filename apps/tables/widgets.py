@@ -24,7 +24,11 @@ class TableSelect(ChoiceWidget):
         queryset = (
             Table.available.filter(project=self.parent_entity.project)
             .exclude(
-                source__in=[Table.Source.INTERMEDIATE_NODE, Table.Source.CACHE_NODE]
+                source__in=[
+                    Table.Source.INTERMEDIATE_NODE,
+                    Table.Source.CACHE_NODE,
+                    Table.Source.ROLLUP,
+                ]
             )
             .order_by("updated")
         )
@@ -5,9 +5,11 @@ from os.path import splitext
 
 from django.conf import settings
 from django.db import models
+from django.utils.functional import cached_property
 from django.utils.text import slugify
 
 from apps.base.clients import SLUG
+from apps.base.core.utils import md5_kwargs
 from apps.base.models import BaseModel
 from apps.integrations.models import Integration
 
@@ -47,6 +49,35 @@ class Upload(BaseModel):
     def gcs_uri(self):
         return f"gs://{settings.GS_BUCKET_NAME}/{self.file.name}"
 
+    def get_content_hash(self):
+        # from the metadata of the file, reading it back from the storage costs as
+        # much as the sync itself
+        storage = self.file.storage
+        return md5_kwargs(
+            file=self.file.name,
+            size=storage.size(self.file.name),
+            modified=storage.get_modified_time(self.file.name).isoformat(),
+            field_delimiter=self.field_delimiter,
+        )
+
+    @property
+    def parquet_name(self):
+        # the typed copy of the file, see apps/uploads/parquet.py
+        return f"{self.file.name}.{self.field_delimiter}.parquet"
+
+    @property
+    def parquet_uri(self):
+        return f"gs://{settings.GS_BUCKET_NAME}/{self.parquet_name}"
+
+    def open_parquet(self):
+        # through the storage, which might be remote, e.g. GCS
+        return self.file.storage.open(self.parquet_name, "rb")
+
+    @cached_property
+    def has_parquet(self):
+        # checked once, the parquet file is never removed
+        return self.file.storage.exists(self.parquet_name)
+
     def create_integration(self, file_name, created_by, project):
         # file_gcs_path has an extra hidden input
         name = textwrap.shorten(splitext(file_name)[0], width=255, placeholder="...")
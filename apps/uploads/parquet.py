@@ -0,0 +1,88 @@
+import logging
+from tempfile import NamedTemporaryFile
+
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+from django.core.files import File
+
+from apps.base.core.bigquery import sanitize_bq_column_name
+
+from .models import Upload
+
+# Bytes of the CSV read at once, the larger the block the more reliable the
+# types inferred from the first block
+CSV_BLOCK_SIZE = 16 * 1024 * 1024
+
+
+def _get_column_names(names):
+    # valid and unique names for both bigquery and postgres
+    column_names = []
+    for idx, name in enumerate(names):
+        name = sanitize_bq_column_name(name.strip())
+        if not name or name in column_names:
+            name = f"string_field_{idx}"
+        column_names.append(name)
+    return column_names
+
+
+def _open_csv(f, upload: Upload, column_types=None):
+    return pacsv.open_csv(
+        f,
+        read_options=pacsv.ReadOptions(block_size=CSV_BLOCK_SIZE),
+        parse_options=pacsv.ParseOptions(
+            delimiter=upload.field_delimiter_char, newlines_in_values=True
+        ),
+        convert_options=pacsv.ConvertOptions(column_types=column_types),
+    )
+
+
+def _write_parquet(upload: Upload, path: str):
+    """Streams the CSV into the parquet file, one batch at a time."""
+    with upload.file.open("rb") as f:
+        reader = _open_csv(f, upload)
+        # columns without any values in the first block are read as strings,
+        # they can't be loaded from parquet and may have values later on
+        if null_columns := {
+            field.name: pa.string()
+            for field in reader.schema
+            if pa.types.is_null(field.type)
+        }:
+            f.seek(0)
+            reader = _open_csv(f, upload, null_columns)
+
+        schema = pa.schema(
+            field.with_name(name)
+            for field, name in zip(
+                reader.schema, _get_column_names(reader.schema.names)
+            )
+        )
+        with pq.ParquetWriter(path, schema, compression="snappy") as writer:
+            for batch in reader:
+                writer.write_batch(
+                    pa.RecordBatch.from_arrays(batch.columns, schema=schema)
+                )
+
+
+def convert_upload_to_parquet(upload: Upload):
+    """Converts the CSV upload into a typed parquet file next to it.
+
+    The conversion happens once per file, re-syncs load directly from the
+    parquet file. Returns whether the parquet file is available.
+    """
+    if upload.has_parquet:
+        return True
+
+    with NamedTemporaryFile(suffix=".parquet") as f:
+        try:
+            _write_parquet(upload, f.name)
+        except (pa.ArrowInvalid, UnicodeDecodeError) as e:
+            # e.g. jagged rows, an unknown encoding or a later block that doesn't
+            # fit the inferred types, bigquery is more forgiving
+            logging.warning(e, exc_info=e)
+            return False
+
+        upload.file.storage.save(upload.parquet_name, File(f))
+
+    upload.has_parquet = True
+    return True
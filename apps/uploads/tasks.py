@@ -9,9 +9,11 @@ from apps.base.core.utils import catchtime
 from apps.integrations.emails import send_integration_ready_email
 from apps.runs.models import JobRun
 from apps.tables.models import Table
+from apps.tables.tasks import warm_table_dependents
 from apps.users.models import CustomUser
 
 from .models import Upload
+from .parquet import convert_upload_to_parquet
 
 
 @shared_task(bind=True)
@@ -20,6 +22,10 @@ def run_upload_sync_task(self, run_id: int):
     integration = run.integration
     upload = integration.upload
 
+    # parse the file once, outside of the database transaction
+    convert_upload_to_parquet(upload)
+    content_hash = upload.get_content_hash()
+
     # we need to save the table instance to get the PK from database, this ensures
     # database will rollback automatically if there is an error with the bigquery
     # table creation, avoids orphaned table entities
@@ -33,10 +39,18 @@ def run_upload_sync_task(self, run_id: int):
             project=integration.project,
         )
 
-        with catchtime() as get_time_to_sync:
-            get_engine().import_table_from_upload(table=table, upload=upload)
+        if integration.is_unchanged(content_hash, created):
+            # keep data_updated, downstream caches are still valid
+            run.skipped = True
+            run.save(update_fields=["skipped"])
+        else:
+            with catchtime() as get_time_to_sync:
+                get_engine().import_table_from_upload(table=table, upload=upload)
 
-        table.sync_metadata_from_source()
+            table.sync_metadata_from_source()
+            integration.content_hash = content_hash
+            integration.save(update_fields=["content_hash"])
+            warm_table_dependents([table])
 
     if created:
         send_integration_ready_email(integration, int(get_time_to_sync()))
@@ -1,6 +1,12 @@
+from unittest.mock import PropertyMock
+
+import pyarrow.parquet as pq
 import pytest
+from django.core.files.base import ContentFile
 
 from apps.base.clients import get_engine
+from apps.uploads.models import Upload
+from apps.uploads.parquet import convert_upload_to_parquet
 
 pytestmark = pytest.mark.django_db
 
@@ -16,35 +22,14 @@ def test_upload_all_string(
         project=upload.integration.project, integration=upload.integration
     )
 
-    get_engine().import_table_from_upload(table, upload)
+    engine.upload_sample.return_value = (["Name", "Age"], [["Neera", "four"]])
 
-    # initial call has result with strings
-    initial_call = engine.load_table_from_uri.call_args_list[0]
-    assert initial_call.args == (upload.gcs_uri, table.fqn)
-    job_config = initial_call.kwargs["job_config"]
-    assert job_config.source_format == "CSV"
-    assert job_config.write_disposition == "WRITE_TRUNCATE"
-    assert job_config.field_delimiter == upload.field_delimiter_char
-    assert job_config.allow_quoted_newlines
-    assert job_config.allow_jagged_rows
-    assert job_config.autodetect
-    assert job_config.skip_leading_rows == 1
+    get_engine().import_table_from_upload(table, upload)
 
-    # header call is to a temporary table with skipped leading rows
-    header_call = engine.query.call_args_list[0]
-    HEADER_SQL = "select * from (select * from table_temp except distinct select * from dataset.table) limit 1"
-    assert header_call.args == (HEADER_SQL,)
-    job_config = header_call.kwargs["job_config"]
-    external_config = job_config.table_definitions["table_temp"]
-    assert external_config.source_uris == [upload.gcs_uri]
-    assert external_config.options.field_delimiter == upload.field_delimiter_char
-    assert external_config.options.allow_quoted_newlines
-    assert external_config.options.allow_jagged_rows
-    assert external_config.autodetect
-    assert external_config.options.skip_leading_rows == 0
-
-    # final call with explicit schema
-    final_call = engine.load_table_from_uri.call_args_list[1]
+    # single load with explicit schema from the sampled header
+    assert engine.load_table_from_uri.call_count == 1
+    assert engine.query.call_count == 0
+    final_call = engine.load_table_from_uri.call_args_list[0]
     assert final_call.args == (upload.gcs_uri, table.fqn)
     job_config = final_call.kwargs["job_config"]
     assert job_config.source_format == "CSV"
@@ -58,3 +43,94 @@ def test_upload_all_string(
     assert len(schema) == 2
     assert schema[0].name == "Name"
     assert schema[0].field_type == "STRING"
+
+
+def test_upload_unrepresentative_sample(
+    logged_in_user,
+    engine,
+    upload_factory,
+    integration_table_factory,
+):
+    upload = upload_factory(integration__project__team=logged_in_user.teams.first())
+    table = integration_table_factory(
+        project=upload.integration.project, integration=upload.integration
+    )
+
+    get_engine().import_table_from_upload(table, upload)
+
+    # the sample has numbers but the loaded table is all strings
+    assert engine.load_table_from_uri.call_count == 2
+    initial_call, final_call = engine.load_table_from_uri.call_args_list
+    assert initial_call.kwargs["job_config"].autodetect
+    schema = final_call.kwargs["job_config"].schema
+    assert [field.name for field in schema] == ["Name", "Age"]
+
+
+def test_upload_parquet(
+    logged_in_user,
+    engine,
+    upload_factory,
+    integration_table_factory,
+    mocker,
+):
+    mocker.patch.object(
+        Upload, "has_parquet", new_callable=PropertyMock, return_value=True
+    )
+    upload = upload_factory(integration__project__team=logged_in_user.teams.first())
+    table = integration_table_factory(
+        project=upload.integration.project, integration=upload.integration
+    )
+
+    get_engine().import_table_from_upload(table, upload)
+
+    # single load from the typed file, nothing to detect
+    assert engine.load_table_from_uri.call_count == 1
+    assert engine.load_table_from_uri.call_args.args == (
+        f"{upload.gcs_uri}.comma.parquet",
+        table.fqn,
+    )
+    job_config = engine.load_table_from_uri.call_args.kwargs["job_config"]
+    assert job_config.source_format == "PARQUET"
+    assert job_config.write_disposition == "WRITE_TRUNCATE"
+    assert not job_config.autodetect
+
+
+def test_convert_upload_to_parquet(upload_factory, settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    upload = upload_factory(field_delimiter=Upload.FieldDelimiter.PIPE)
+    upload.file.save("store.csv", ContentFile(b"Name|Age|\nNeera|4|\nVayu||\n"))
+
+    assert not upload.has_parquet
+    assert convert_upload_to_parquet(upload)
+    assert upload.has_parquet
+
+    with upload.open_parquet() as f:
+        parquet = pq.read_table(f)
+    assert parquet.column_names == ["Name", "Age", "string_field_2"]
+    assert str(parquet.schema.field("Age").type) == "int64"
+    assert str(parquet.schema.field("string_field_2").type) == "string"
+    assert parquet.column("Name").to_pylist() == ["Neera", "Vayu"]
+
+    # jagged rows are left to the engine
+    upload = upload_factory()
+    upload.file.save("jagged.csv", ContentFile(b"Name,Age\nNeera\n"))
+    assert not convert_upload_to_parquet(upload)
+    assert not upload.has_parquet
+
+
+def test_convert_upload_to_parquet_blocks(upload_factory, settings, tmp_path, mocker):
+    settings.MEDIA_ROOT = tmp_path
+    mocker.patch("apps.uploads.parquet.CSV_BLOCK_SIZE", 16)
+    upload = upload_factory()
+    upload.file.save(
+        "store.csv", ContentFile(b"Name,Note\nNeera,\nVayu,\nSakura,late\n")
+    )
+
+    assert convert_upload_to_parquet(upload)
+
+    # the empty column of the first block has values in a later block
+    with upload.open_parquet() as f:
+        parquet = pq.read_table(f)
+    assert str(parquet.schema.field("Note").type) == "string"
+    assert parquet.column("Name").to_pylist() == ["Neera", "Vayu", "Sakura"]
+    assert parquet.column("Note").to_pylist() == ["", "", "late"]
@@ -2,11 +2,13 @@ from unittest.mock import MagicMock
 
 import pytest
 from django.core import mail
+from django.core.files.base import ContentFile
 from django.core.files.uploadedfile import SimpleUploadedFile
 from pytest_django.asserts import assertRedirects
 
 from apps.base.tests.asserts import assertOK
 from apps.integrations.models import Integration
+from apps.uploads.tasks import run_upload_sync
 
 pytestmark = pytest.mark.django_db
 
@@ -69,3 +71,26 @@ def test_upload_create(client, logged_in_user, project, engine, mocker):
     assertRedirects(r, f"{DETAIL}/done")
 
     assert len(mail.outbox) == 1
+
+
+def test_upload_sync_unchanged(
+    logged_in_user, engine, upload_factory, settings, tmp_path
+):
+    settings.MEDIA_ROOT = tmp_path
+    upload = upload_factory(integration__project__team=logged_in_user.teams.first())
+    upload.file.save("store.csv", ContentFile(b"Name,Age\nNeera,4\n"))
+
+    run_upload_sync(upload, logged_in_user)
+    assert engine.load_table_from_uri.call_count == 1
+    assert not upload.integration.runs.get().skipped
+
+    # test: identical data is not loaded again
+    run_upload_sync(upload, logged_in_user)
+    assert engine.load_table_from_uri.call_count == 1
+    assert upload.integration.runs.order_by("id").last().skipped
+
+    # test: a different delimiter changes the data
+    upload.field_delimiter = upload.FieldDelimiter.TAB
+    upload.save()
+    run_upload_sync(upload, logged_in_user)
+    assert engine.load_table_from_uri.call_count == 2
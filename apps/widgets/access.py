@@ -9,33 +9,44 @@ from apps.projects.access import user_can_access_project
 from apps.widgets.models import Widget
 
 
+def _dashboard_access(request, dashboard, view_func, *args, **kwargs):
+    if not dashboard or dashboard.project.team.deleted:
+        return render(request, "404.html", status=404)
+
+    if dashboard.shared_status == Dashboard.SharedStatus.PUBLIC:
+        return view_func(request, *args, **kwargs)
+
+    if (
+        dashboard.shared_status == Dashboard.SharedStatus.PASSWORD_PROTECTED
+        and can_access_password_protected_dashboard(request, dashboard)
+    ):
+        return view_func(request, *args, **kwargs)
+
+    user = request.user
+    if not user.is_authenticated:
+        return render(request, "404.html", status=404)
+    if user_can_access_project(user, dashboard.project):
+        return view_func(request, *args, **kwargs)
+
+    return render(request, "404.html", status=404)
+
+
 def login_and_project_required_or_public_or_in_template(view_func):
     @wraps(view_func)
     def decorator(request, *args, **kwargs):
         widget = Widget.objects.get(pk=kwargs["pk"])
-        dashboard = widget.page.dashboard
-
-        if not dashboard or dashboard.project.team.deleted:
-            return render(request, "404.html", status=404)
+        return _dashboard_access(
+            request, widget.page.dashboard, view_func, *args, **kwargs
+        )
 
-        if dashboard.shared_status == Dashboard.SharedStatus.PUBLIC:
-            return view_func(request, *args, **kwargs)
-
-        if (
-            dashboard
-            and dashboard.shared_status == Dashboard.SharedStatus.PASSWORD_PROTECTED
-            and can_access_password_protected_dashboard(request, dashboard)
-        ):
-            return view_func(request, *args, **kwargs)
+    return decorator
 
-        user = request.user
-        if not user.is_authenticated:
-            return render(request, "404.html", status=404)
-        project = widget.page.dashboard.project
-        if user_can_access_project(user, project):
-            return view_func(request, *args, **kwargs)
 
-        return render(request, "404.html", status=404)
+def login_and_dashboard_required_or_public(view_func):
+    @wraps(view_func)
+    def decorator(request, *args, **kwargs):
+        dashboard = Dashboard.objects.filter(pk=kwargs["dashboard_id"]).first()
+        return _dashboard_access(request, dashboard, view_func, *args, **kwargs)
 
     return decorator
 
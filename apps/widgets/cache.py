@@ -1,8 +1,28 @@
+import inspect
+import pickle
+import zlib
+from functools import wraps
+
+from django.core.cache import cache
+from django.utils import timezone
 from django.views.decorators.cache import cache_control
+from django.views.decorators.gzip import gzip_page
 from django.views.decorators.http import condition
 
+from apps.base.core.utils import md5_kwargs
+
 from .models import Widget
 
+# Shared by every viewer until the widget, control or source data changes
+OUTPUT_CACHE_TIMEOUT = 24 * 3600
+# Large outputs are cheaper to recompute than to keep in redis, after compression
+OUTPUT_CACHE_MAX_SIZE = 1024 * 1024
+# Outputs are stored compressed since version 2
+OUTPUT_CACHE_VERSION = 2
+
+# Distinguishes a cache miss from a cached `None`, e.g. an empty metric
+MISSING = object()
+
 
 def last_modified_widget_output(request, project_id, dashboard_id, pk):
     widget = Widget.objects.get(pk=pk)
@@ -24,8 +44,75 @@ def etag_widget_output(request, project_id, dashboard_id, pk):
 # No cache header tells browser to always re-validate the resource
 # https://developer.mozilla.org/en-US/docs/Web/HTTP/Caching#controlling_caching
 # https://web.dev/http-cache/#flowchart
-widget_output = lambda view: cache_control(no_cache=True)(
-    condition(
-        etag_func=etag_widget_output, last_modified_func=last_modified_widget_output
-    )(view)
+# Chart outputs embed the figure data as JSON, which compresses well
+widget_output = lambda view: gzip_page(
+    cache_control(no_cache=True)(
+        condition(
+            etag_func=etag_widget_output,
+            last_modified_func=last_modified_widget_output,
+        )(view)
+    )
 )
+
+page_output = gzip_page
+
+
+def _get_control_state(control):
+    return {
+        "start": str(control.start),
+        "end": str(control.end),
+        "date_range": control.date_range,
+        # relative date ranges are resolved against the current date
+        "today": str(timezone.now().date()),
+    }
+
+
+def get_output_cache_key(name, widget, control, *args):
+    used_control = widget.control if widget.has_control else control
+    return "cache-widget-output-" + md5_kwargs(
+        name=name,
+        widget=widget.id,
+        updated=str(widget.updated),
+        data_updated=str(widget.table.data_updated) if widget.table else None,
+        # e.g. the background color of charts is set on the dashboard
+        dashboard_updated=str(widget.page.dashboard.updated),
+        control=_get_control_state(used_control)
+        if used_control and widget.date_column
+        else None,
+        args=[str(arg) for arg in args],
+    )
+
+
+def get_cached_output(key):
+    if (data := cache.get(key, MISSING, version=OUTPUT_CACHE_VERSION)) is MISSING:
+        return MISSING
+    return pickle.loads(zlib.decompress(data))
+
+
+def set_cached_output(key, output):
+    # e.g. the figure of a chart with many points is mostly repeated JSON
+    data = zlib.compress(pickle.dumps(output))
+    if len(data) <= OUTPUT_CACHE_MAX_SIZE:
+        cache.set(key, data, OUTPUT_CACHE_TIMEOUT, version=OUTPUT_CACHE_VERSION)
+
+
+def cached_output(func):
+    """Caches the result of a visual function, e.g. `chart_to_output`.
+
+    The key changes whenever the widget is updated, the source table is synced
+    the dashboard or control is changed, so outdated results are never read.
+    """
+
+    signature = inspect.signature(func)
+
+    @wraps(func)
+    def decorator(*args, **kwargs):
+        # keyword arguments share the key of the same positional arguments
+        widget, control, *args = signature.bind(*args, **kwargs).args
+        key = get_output_cache_key(func.__name__, widget, control, *args)
+        if (output := get_cached_output(key)) is MISSING:
+            output = func(widget, control, *args)
+            set_cached_output(key, output)
+        return output
+
+    return decorator
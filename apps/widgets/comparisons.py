@@ -0,0 +1,104 @@
+import ibis
+
+from apps.base.clients import get_engine
+from apps.columns.engine import resolve_colname
+from apps.controls.engine import DATETIME_FILTERS, get_period_predicates
+from apps.filters.engine import get_query_from_filters
+
+from .engine import _sort, get_groups_from_widget
+from .models import COUNT_COLUMN_NAME, Widget
+
+# Charts with a comparison series for every metric
+COMPARISON_CHARTS = [Widget.Kind.LINE, Widget.Kind.COLUMN, Widget.Kind.BAR]
+
+# Flag the rows of each period, the periods overlap for some date ranges
+CURRENT_PERIOD = "__current__"
+PREVIOUS_PERIOD = "__previous__"
+
+
+def get_previous_name(name):
+    return f"{name} (previous period)"
+
+
+def get_comparison_control(widget, control):
+    """Returns the control if the widget is compared with the previous period.
+
+    Only relative date ranges have a previous period. Charts are compared on
+    their dimension, which can't be the date column as the periods don't share
+    any dates.
+    """
+    control = widget.control if widget.has_control else control
+    if not (
+        widget.compare_previous_period
+        and widget.date_column
+        and control
+        and control.date_range in DATETIME_FILTERS
+    ):
+        return None
+
+    if widget.kind == Widget.Kind.METRIC or (
+        widget.kind in COMPARISON_CHARTS and widget.dimension != widget.date_column
+    ):
+        return control
+
+
+def get_periods_query(widget, control):
+    """The widget table filtered on both periods, with a flag for each period."""
+    control = widget.control if widget.has_control else control
+    query = get_engine().get_table(widget.table)
+    query = get_query_from_filters(query, widget.filters.all())
+
+    current, previous = get_period_predicates(query, widget.date_column, control)
+    query = query.mutate(**{CURRENT_PERIOD: current, PREVIOUS_PERIOD: previous})
+    return query[query[CURRENT_PERIOD] | query[PREVIOUS_PERIOD]]
+
+
+def get_period_expr(query, aggregation, period):
+    """Aggregates the column over the rows of the period only.
+
+    The other rows are null and ignored by every aggregation, the result is the
+    same as filtering on the period first.
+    """
+    value = query[period].ifelse(query[aggregation.column], ibis.null())
+    return getattr(value, aggregation.function)()
+
+
+def _get_period_count(query, period):
+    return query[period].ifelse(1, 0).sum()
+
+
+def get_metric_comparison_query(widget, control):
+    query = get_periods_query(widget, control)
+    aggregation = widget.aggregations.first()
+    return query.aggregate(
+        [
+            get_period_expr(query, aggregation, period).name(period)
+            for period in [CURRENT_PERIOD, PREVIOUS_PERIOD]
+        ]
+    )
+
+
+def get_chart_comparison_query(widget, control, part=None):
+    """Like `get_query_from_widget`, with the previous period of each metric."""
+    query = get_periods_query(widget, control)
+    groups = get_groups_from_widget(widget, query, part)
+
+    aggregations = widget.aggregations.all()
+    column_names = [aggregation.column for aggregation in aggregations]
+    values = []
+    for aggregation in aggregations:
+        name = resolve_colname(aggregation.column, aggregation.function, column_names)
+        values += [
+            get_period_expr(query, aggregation, CURRENT_PERIOD).name(name),
+            get_period_expr(query, aggregation, PREVIOUS_PERIOD).name(
+                get_previous_name(name)
+            ),
+        ]
+    values = values or [
+        _get_period_count(query, CURRENT_PERIOD).name(COUNT_COLUMN_NAME),
+        _get_period_count(query, PREVIOUS_PERIOD).name(
+            get_previous_name(COUNT_COLUMN_NAME)
+        ),
+    ]
+
+    return _sort(query.group_by(groups).aggregate(values), widget)
@@ -0,0 +1,105 @@
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+from ibis.expr import datatypes as idt
+
+from apps.columns.engine import DatePeriod
+
+from .models import Widget
+
+# Charts that can be reduced to fewer points without losing their shape
+DOWNSAMPLED_CHARTS = [Widget.Kind.LINE, Widget.Kind.AREA, Widget.Kind.SCATTER]
+
+# The least number of days in each date part, from fine to coarse
+PART_DAYS = {
+    DatePeriod.DATE: 1,
+    DatePeriod.WEEK: 7,
+    DatePeriod.MONTH: 28,
+    DatePeriod.QUARTER: 90,
+    DatePeriod.YEAR: 365,
+}
+
+
+def get_coarser_part(widget, query, max_rows):
+    """Returns the finest date part that groups the dimension into `max_rows`.
+
+    The number of groups is estimated from the range of the dimension, returns
+    None if the dimension is not a date or can't be grouped any coarser.
+    """
+    column = query[widget.dimension]
+    if (
+        not isinstance(column.type(), (idt.Date, idt.Timestamp))
+        or widget.part == DatePeriod.MONTH_ONLY
+    ):
+        return None
+
+    parts = list(PART_DAYS)
+    if widget.part in parts:
+        parts = parts[parts.index(widget.part) + 1 :]
+
+    row = (
+        query.aggregate([column.min().name("start"), column.max().name("end")])
+        .execute()
+        .iloc[0]
+    )
+    if pd.isna(row["start"]) or pd.isna(row["end"]):
+        return None
+
+    days = (pd.Timestamp(row["end"]) - pd.Timestamp(row["start"])).days
+    # a partial group at both ends of the range
+    return next(
+        (part for part in parts if days // PART_DAYS[part] + 2 <= max_rows), None
+    )
+
+
+def largest_triangle_three_buckets(x, y, threshold):
+    """Returns the indices of the `threshold` points that keep the visual shape.
+
+    The first and last points are kept, the others are split into buckets and
+    the point with the largest triangle to the previous selected point and the
+    average of the next bucket is kept for each bucket.
+    """
+    size = len(x)
+    if threshold >= size or threshold < 3:
+        return np.arange(size)
+
+    edges = np.linspace(1, size - 1, threshold - 1).astype(int)
+    indices = np.zeros(threshold, dtype=int)
+    selected = 0
+
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else size
+        next_x, next_y = x[end:next_end].mean(), y[end:next_end].mean()
+
+        areas = np.abs(
+            (x[selected] - next_x) * (y[start:end] - y[selected])
+            - (x[selected] - x[start:end]) * (next_y - y[selected])
+        )
+        selected = start + int(np.argmax(areas))
+        indices[bucket + 1] = selected
+
+    indices[-1] = size - 1
+    return indices
+
+
+def _to_numeric(series):
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype(float).to_numpy()
+    if pd.api.types.is_datetime64_any_dtype(series) or (
+        len(series) and isinstance(series.iloc[0], dt.date)
+    ):
+        return pd.to_datetime(series).astype("int64").to_numpy(dtype=float)
+    # e.g. strings are spaced evenly in their order
+    return np.arange(len(series), dtype=float)
+
+
+def downsample(df, x, y, max_rows):
+    """Reduces the rows to `max_rows`, the rows keep their order."""
+    x_values = _to_numeric(df[x])
+    y_values = pd.to_numeric(df[y], errors="coerce").fillna(0).to_numpy(dtype=float)
+
+    order = np.argsort(x_values, kind="stable")
+    indices = largest_triangle_three_buckets(x_values[order], y_values[order], max_rows)
+    return df.iloc[np.sort(order[indices])].reset_index(drop=True)
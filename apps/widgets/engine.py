@@ -4,6 +4,14 @@ from ibis.expr import datatypes as idt
 from apps.columns.engine import PART_MAP, aggregate_columns
 from apps.widgets.models import NO_DIMENSION_WIDGETS, Widget
 
+# Widgets that are optionally grouped by `second_dimension`
+SECOND_DIMENSION_WIDGETS = [
+    Widget.Kind.HEATMAP,
+    Widget.Kind.STACKED_BAR,
+    Widget.Kind.STACKED_COLUMN,
+    Widget.Kind.STACKED_LINE,
+]
+
 
 def _sort(query, widget):
     """Sort widget data by label or value"""
@@ -25,36 +33,31 @@ def _sort(query, widget):
     return query.order_by(sort_column)
 
 
-def get_query_from_widget(widget: Widget, query):
-    aggregations = widget.aggregations.all()
-
-    if widget.category == Widget.Category.COMBO:
-        aggregations = widget.charts.all()
-    else:
-        aggregations = widget.aggregations.all()
-
+def get_groups_from_widget(widget: Widget, query, part=None):
+    """The dimensions of the widget, `part` overrides the date part of the widget."""
+    part = part or widget.part
     if widget.kind in NO_DIMENSION_WIDGETS:
         groups = []
     elif (
         (group_column := query[widget.dimension]) is not None
         and isinstance(group_column.type(), (idt.Date, idt.Timestamp))
-        and widget.part
+        and part
     ):
-        groups = [PART_MAP[widget.part](group_column).name(widget.dimension)]
+        groups = [PART_MAP[part](group_column).name(widget.dimension)]
     else:
         groups = [group_column]
-    if (
-        widget.kind
-        in [
-            Widget.Kind.HEATMAP,
-            Widget.Kind.STACKED_BAR,
-            Widget.Kind.STACKED_COLUMN,
-            Widget.Kind.STACKED_LINE,
-        ]
-        and widget.second_dimension
-    ):
+    if widget.kind in SECOND_DIMENSION_WIDGETS and widget.second_dimension:
         groups += [query[widget.second_dimension]]
+    return groups
+
+
+def get_query_from_widget(widget: Widget, query, part=None):
+    if widget.category == Widget.Category.COMBO:
+        aggregations = widget.charts.all()
+    else:
+        aggregations = widget.aggregations.all()
 
+    groups = get_groups_from_widget(widget, query, part)
     query = aggregate_columns(query, aggregations, groups)
     if widget.kind in NO_DIMENSION_WIDGETS:
         return query
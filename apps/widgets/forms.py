@@ -152,7 +152,7 @@ class GenericWidgetForm(ModelForm):
             ),
             "show_summary_row": is_kind(K.TABLE),
             # TODO: need to check for existence of control on page OR add a note to say this is required
-            "compare_previous_period": f"kind === '{K.METRIC}' && date_column !== null",
+            "compare_previous_period": f"{is_kind(K.METRIC, K.LINE, K.COLUMN, K.BAR)} && date_column !== null",
             "positive_decrease": f"kind === '{K.METRIC}' && date_column !== null",
             # formsets
             "default_metrics": is_kind(K.COLUMN, K.BAR, K.LINE, K.AREA, K.DONUT),
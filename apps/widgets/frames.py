@@ -1,8 +1,11 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
 
 import analytics
+from django.db import connections
 from django.shortcuts import render
+from django.template.loader import render_to_string
 from django.urls import reverse
 from django.views.generic import DetailView
 from django_htmx.http import retarget
@@ -23,9 +26,17 @@ from apps.base.views import UpdateView
 from apps.columns.currency_symbols import CURRENCY_SYMBOLS_MAP
 from apps.controls.engine import DATETIME_FILTERS
 from apps.dashboards.mixins import DashboardMixin
+from apps.dashboards.models import Page
 from apps.tables.models import Table
-from apps.widgets.visuals import chart_to_output, metric_to_output, table_to_output
+from apps.widgets.visuals import (
+    chart_to_output,
+    metric_comparison_to_output,
+    metric_to_output,
+    metrics_to_output,
+    table_to_output,
+)
 
+from .comparisons import get_comparison_control
 from .forms import (
     FORMS,
     STYLE_FORMS,
@@ -54,15 +65,22 @@ def add_output_context(context, widget, request, control, url=None):
                 request, paginate={"per_page": widget.table_paginate_by}
             ).configure(table)
     elif widget.kind == Widget.Kind.METRIC:
-        metric = metric_to_output(widget, control)
+        if comparison_control := get_comparison_control(widget, control):
+            # both periods in a single query, or cached for the whole page
+            metric, previous_metric = metric_comparison_to_output(widget, control)
+        else:
+            # avoid duplicating work for metrics computed for the whole page
+            metric = (
+                context["metric"]
+                if "metric" in context
+                else metric_to_output(widget, control)
+            )
         if (
             metric
             and widget.compare_previous_period
             and (used_control := widget.control if widget.has_control else control)
         ):
-            if DATETIME_FILTERS.get(used_control.date_range) and (
-                previous_metric := metric_to_output(widget, control, True)
-            ):
+            if comparison_control and previous_metric:
                 context["change"] = (metric - previous_metric) / previous_metric * 100
                 context["period"] = DATETIME_FILTERS[used_control.date_range][
                     "previous_label"
@@ -84,6 +102,13 @@ def add_output_context(context, widget, request, control, url=None):
         context["chart_id"] = chart_id
 
 
+def get_error_template(error):
+    error_template = f"widgets/errors/{error_name_to_snake(error)}.html"
+    if template_exists(error_template):
+        return error_template
+    return "widgets/errors/default.html"
+
+
 class WidgetName(UpdateView):
     model = Widget
     fields = ("name",)
@@ -286,11 +311,7 @@ class WidgetOutput(DashboardMixin, SingleTableMixin, UpdateView):
                     "object": self.object,
                     "widget": self.object,
                 }
-            error_template = f"widgets/errors/{error_name_to_snake(e)}.html"
-            if template_exists(error_template):
-                context["error_template"] = error_template
-            else:
-                context["error_template"] = "widgets/errors/default.html"
+            context["error_template"] = get_error_template(e)
 
         return context
 
@@ -317,6 +338,103 @@ class WidgetOutput(DashboardMixin, SingleTableMixin, UpdateView):
         )
 
 
+def _get_metric_group(widget, control):
+    # metrics without their own filters can share a single query
+    used_control = widget.control if widget.has_control else control
+    return (
+        widget.table_id,
+        widget.date_column,
+        used_control.id if used_control and widget.date_column else None,
+    )
+
+
+class PageOutput(DashboardMixin, DetailView):
+    """Renders the output of every widget on a page in a single response.
+
+    The widget queries run concurrently, metrics that share a query are merged
+    and each output is swapped into its widget out of band. Table widgets keep
+    their own frame for the pagination and text widgets for the editor.
+    """
+
+    template_name = "widgets/page_output.html"
+    model = Page
+    pk_url_kwarg = "page_id"
+    max_workers = 8
+
+    def get_queryset(self):
+        return self.dashboard.pages.all()
+
+    def get_widget_context(self, widget, metrics):
+        context = {
+            "dashboard": self.dashboard,
+            "page": self.object,
+            "project": self.dashboard.project,
+            "object": widget,
+            "widget": widget,
+        }
+        if widget.id in metrics:
+            context["metric"] = metrics[widget.id]
+        return context
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        control = self.object.control if self.object.has_control else None
+        widgets = (
+            self.object.widgets.exclude(kind__in=[Widget.Kind.TABLE, Widget.Kind.TEXT])
+            .select_related("table")
+            .prefetch_related("aggregations", "filters")
+        )
+        # the schemas of all tables on the page in a single catalog query
+        get_engine().prefetch_schemas([widget.table for widget in widgets])
+
+        metric_groups = {}
+        for widget in widgets:
+            if (
+                widget.kind == Widget.Kind.METRIC
+                and widget.is_valid
+                and not widget.filters.all()
+            ):
+                metric_groups.setdefault(_get_metric_group(widget, control), []).append(
+                    widget
+                )
+
+        def _get_metrics(group):
+            try:
+                return metrics_to_output(group, control)
+            except Exception:
+                # every widget computes its own metric and displays the error
+                return {}
+            finally:
+                # every thread opens its own database connection
+                connections.close_all()
+
+        def _get_output(widget):
+            widget_context = self.get_widget_context(widget, metrics)
+            try:
+                try:
+                    add_output_context(widget_context, widget, self.request, control)
+                except Exception as e:
+                    widget_context["error_template"] = get_error_template(e)
+
+                return render_to_string(
+                    "widgets/output.html", widget_context, request=self.request
+                )
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            metrics = {}
+            for group_metrics in executor.map(
+                _get_metrics,
+                [group for group in metric_groups.values() if len(group) > 1],
+            ):
+                metrics.update(group_metrics)
+
+            context["outputs"] = list(zip(widgets, executor.map(_get_output, widgets)))
+
+        return context
+
+
 class WidgetInput(DashboardMixin, SingleTableMixin, DetailView):
     template_name = "widgets/input.html"
     model = Widget
@@ -325,7 +443,9 @@ class WidgetInput(DashboardMixin, SingleTableMixin, DetailView):
     def get_table(self, **kwargs):
         if self.object.table:
             query = get_engine().get_table(self.object.table)
-            table = get_table(query.schema(), query)
+            table = get_table(
+                query.schema(), query, data_updated=self.object.table.data_updated
+            )
             return RequestConfig(
                 self.request, paginate=self.get_table_pagination(table)
             ).configure(table)
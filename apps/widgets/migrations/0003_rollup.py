@@ -0,0 +1,48 @@
+# Generated by Django 4.0.8 on 2026-10-18 18:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+import apps.base.clone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tables", "0002_rename_bq_dataset_table_dataset_name_and_more"),
+        ("widgets", "0002_alter_historicalwidget_kind_alter_widget_kind"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Rollup",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("updated", models.DateTimeField(auto_now=True)),
+                ("dimensions", models.JSONField()),
+                ("partials", models.JSONField()),
+                (
+                    "source_table",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="rollups",
+                        to="tables.table",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ("-updated",),
+                "abstract": False,
+            },
+            bases=(apps.base.clone.CloneMixin, models.Model),
+        ),
+    ]
@@ -6,7 +6,7 @@ from django.urls import reverse
 
 from apps.base.clients import SLUG
 from apps.base.core.aggregations import AggregationFunctions
-from apps.base.models import HistoryModel, SaveParentModel
+from apps.base.models import BaseModel, HistoryModel, SaveParentModel
 from apps.columns.currency_symbols import CurrencySymbols
 from apps.columns.engine import DatePeriod
 from apps.dashboards.models import Page
@@ -339,3 +339,43 @@ class CombinationChart(SaveParentModel):
     on_secondary = models.BooleanField(
         default=False, help_text="Plot on a secondary Y-axis"
     )
+
+
+class Rollup(BaseModel):
+    """A pre-aggregated table that answers the chart widgets on its source table.
+
+    Stores the partial aggregations per dimension, widgets grouping by the same
+    or fewer dimensions aggregate them again instead of the source table.
+    """
+
+    source_table = models.ForeignKey(
+        Table, on_delete=models.CASCADE, related_name="rollups"
+    )
+    # [[column, date part], ...], the part is null for the column itself
+    dimensions = models.JSONField()
+    # [[column, function], ...], the column is null for the row count
+    partials = models.JSONField()
+
+    def __str__(self):
+        return f"Rollup of {self.source_table}"
+
+    def get_table_name(self):
+        return f"Rollup:{self.source_table}"
+
+    @property
+    def spec(self):
+        return (
+            tuple(tuple(dimension) for dimension in self.dimensions),
+            tuple(tuple(partial) for partial in self.partials),
+        )
+
+    @property
+    def bq_table_id(self):
+        return f"rollup_{self.id:09}"
+
+    @property
+    def is_up_to_date(self):
+        return (
+            hasattr(self, "table")
+            and self.table.data_updated > self.source_table.data_updated
+        )
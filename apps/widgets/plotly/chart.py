@@ -7,6 +7,7 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
 from apps.columns.engine import resolve_colname
+from apps.widgets.comparisons import get_previous_name
 from apps.widgets.models import COUNT_COLUMN_NAME, CombinationChart, Widget
 
 
@@ -38,10 +39,27 @@ def get_metrics(widget):
     ]
 
 
+def get_axis_columns(widget):
+    """The columns on the x and y axis of line, area and scatter charts."""
+    values = get_metrics(widget)
+    if widget.kind == Widget.Kind.SCATTER and len(values) > 1:
+        return values[0], values[1]
+    return widget.dimension, values[0]
+
+
+def get_comparisons(df, values):
+    """The metrics with a comparison series, named after the previous period."""
+    return [
+        (i, get_previous_name(value))
+        for i, value in enumerate(values)
+        if get_previous_name(value) in df
+    ]
+
+
 def to_line(df, widget):
     values = get_metrics(widget)
     pallete_colors = get_pallete_colors(widget)
-    return go.Figure(
+    fig = go.Figure(
         data=[
             go.Scatter(
                 x=df[widget.dimension],
@@ -59,6 +77,19 @@ def to_line(df, widget):
             for i, value in enumerate(values)
         ]
     )
+    for i, previous in get_comparisons(df, values):
+        fig.add_trace(
+            go.Scatter(
+                x=df[widget.dimension],
+                y=df[previous],
+                mode="lines+markers",
+                line_shape="spline",
+                name=previous,
+                marker={"color": pallete_colors[i % len(pallete_colors)]},
+                line={"color": pallete_colors[i % len(pallete_colors)], "dash": "dot"},
+            )
+        )
+    return fig
 
 
 def to_line_stack(df, widget):
@@ -95,6 +126,17 @@ def to_column(df, widget, orientation="v"):
             for i, value in enumerate(values)
         ]
     )
+    for i, previous in get_comparisons(df, values):
+        fig.add_trace(
+            go.Bar(
+                name=previous,
+                x=df[widget.dimension] if orientation == "v" else df[previous],
+                y=df[previous] if orientation == "v" else df[widget.dimension],
+                orientation=orientation,
+                marker={"color": pallete_colors[i % len(pallete_colors)]},
+                opacity=0.5,
+            )
+        )
     # Change the bar mode
     fig.update_layout(barmode="group")
     return fig
@@ -270,7 +312,13 @@ def to_chart(df, widget):
     fig.layout.paper_bgcolor = bg_color
     fig.layout.plot_bgcolor = bg_color
 
-    chart = fig.to_html(include_plotlyjs=False, config={"displayModeBar": False})
+    # only the div and script, the figure is built from validated traces
+    chart = fig.to_html(
+        include_plotlyjs=False,
+        full_html=False,
+        validate=False,
+        config={"displayModeBar": False},
+    )
     chart_id = f"{widget.pk}-{uuid.uuid4()}"
     # Not sure whether there is a better solution for this but right now
     # It is necessary
@@ -0,0 +1,284 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+from ibis.expr import datatypes as idt
+
+from apps.base.clients import get_engine
+from apps.base.core.aggregations import AggregationFunctions
+from apps.columns.engine import PART_MAP, resolve_colname
+from apps.controls.engine import get_date, slice_query
+from apps.controls.models import CustomChoice
+from apps.tables.models import Table
+
+from .engine import SECOND_DIMENSION_WIDGETS, _sort
+from .models import NO_DIMENSION_WIDGETS, Rollup, Widget
+
+# A rollup is only worth storing if it answers several widgets
+ROLLUP_MIN_WIDGETS = 2
+
+# The date control slices on the day, the column is stored as a date
+CONTROL_PART = "control"
+
+# The partial aggregations stored for each function, functions that can't be
+# computed again from partial aggregations (e.g. count distinct) are missing
+PARTIALS = {
+    AggregationFunctions.SUM: ["sum"],
+    AggregationFunctions.COUNT: ["count"],
+    AggregationFunctions.MIN: ["min"],
+    AggregationFunctions.MAX: ["max"],
+    AggregationFunctions.MEAN: ["sum", "count"],
+}
+
+COUNT_PARTIAL = (None, "count")
+
+
+def _get_aggregations(widget):
+    if widget.category == Widget.Category.COMBO:
+        return widget.charts.all()
+    return widget.aggregations.all()
+
+
+def _get_dimensions(widget, schema):
+    """The dimensions like in `get_query_from_widget`, excluding the control."""
+    if widget.kind in NO_DIMENSION_WIDGETS:
+        dimensions = []
+    elif (
+        isinstance(schema[widget.dimension], (idt.Date, idt.Timestamp)) and widget.part
+    ):
+        dimensions = [(widget.dimension, widget.part)]
+    else:
+        dimensions = [(widget.dimension, None)]
+
+    if widget.kind in SECOND_DIMENSION_WIDGETS and widget.second_dimension:
+        dimensions.append((widget.second_dimension, None))
+
+    return dimensions
+
+
+def get_rollup_spec(widget):
+    """Returns the dimensions and partial aggregations a chart widget reads.
+
+    Returns None if the widget can't be answered by a rollup, e.g. because of
+    filters or an aggregation that can't be split.
+    """
+    if (
+        not widget.is_valid
+        or widget.kind
+        in [
+            Widget.Kind.TEXT,
+            Widget.Kind.IMAGE,
+            Widget.Kind.IFRAME,
+            Widget.Kind.TABLE,
+            Widget.Kind.METRIC,
+        ]
+        or widget.filters.exists()
+    ):
+        return None
+
+    try:
+        dimensions = _get_dimensions(widget, widget.table.schema)
+    except KeyError:
+        # the column has been removed from the table
+        return None
+
+    # the date column is always included, the same rollup serves every range
+    if widget.date_column:
+        dimensions.append((widget.date_column, CONTROL_PART))
+
+    partials = []
+    for aggregation in _get_aggregations(widget):
+        if aggregation.function not in PARTIALS:
+            return None
+        partials += [
+            (aggregation.column, function)
+            for function in PARTIALS[aggregation.function]
+        ]
+
+    if not partials:
+        partials.append(COUNT_PARTIAL)
+
+    return _sorted_dimensions(dimensions), _sorted_partials(partials)
+
+
+def _sorted_dimensions(dimensions):
+    return tuple(sorted(set(dimensions), key=lambda d: (d[0], d[1] or "")))
+
+
+def _sorted_partials(partials):
+    return tuple(sorted(set(partials), key=lambda p: (p[0] or "", p[1])))
+
+
+def _get_dimension_expr(query, column, part):
+    if part == CONTROL_PART:
+        return get_date(query[column])
+    if part:
+        return PART_MAP[part](query[column])
+    return query[column]
+
+
+def _get_partial_expr(query, column, function):
+    if column is None:
+        return query.count()
+    return getattr(query[column], function)()
+
+
+def get_rollup_query(rollup):
+    """Aggregates the source table into the rollup dimensions and partials."""
+    query = get_engine().get_table(rollup.source_table)
+    dimensions, partials = rollup.spec
+
+    groups = [
+        _get_dimension_expr(query, *dimension).name(f"dimension_{idx}")
+        for idx, dimension in enumerate(dimensions)
+    ]
+    aggregations = [
+        _get_partial_expr(query, *partial).name(f"partial_{idx}")
+        for idx, partial in enumerate(partials)
+    ]
+
+    if groups:
+        query = query.group_by(groups)
+    return query.aggregate(aggregations)
+
+
+def create_or_replace_rollup_table(rollup):
+    source_table = rollup.source_table
+    with transaction.atomic():
+        table, _ = Table.objects.get_or_create(
+            source=Table.Source.ROLLUP,
+            name=rollup.bq_table_id,
+            namespace=source_table.project.team.tables_dataset_id,
+            project=source_table.project,
+            rollup=rollup,
+        )
+
+        get_engine().create_or_replace_table(
+            table.fqn, get_rollup_query(rollup).compile()
+        )
+
+        table.data_updated = timezone.now()
+        table.save()
+    return table
+
+
+def get_rollup_specs(widgets):
+    """Finds the dimensions shared by several widgets.
+
+    Widgets with the same dimensions share a rollup with all their partials.
+    """
+    counts = defaultdict(int)
+    partials = defaultdict(set)
+
+    for widget in widgets:
+        if (spec := get_rollup_spec(widget)) is None:
+            continue
+        counts[spec[0]] += 1
+        partials[spec[0]].update(spec[1])
+
+    return {
+        (dimensions, _sorted_partials(partials[dimensions]))
+        for dimensions, count in counts.items()
+        if count >= ROLLUP_MIN_WIDGETS
+    }
+
+
+def update_rollups(table):
+    """Creates, refreshes and removes the rollups of the table for its widgets."""
+    specs = get_rollup_specs(Widget.objects.filter(table=table).select_related("table"))
+    rollups = {rollup.spec: rollup for rollup in table.rollups.all()}
+
+    for spec, rollup in rollups.items():
+        if spec not in specs:
+            rollup.delete()
+
+    for spec in specs:
+        if (rollup := rollups.get(spec)) is None:
+            dimensions, partials = spec
+            rollup = Rollup.objects.create(
+                source_table=table, dimensions=dimensions, partials=partials
+            )
+        if not rollup.is_up_to_date:
+            create_or_replace_rollup_table(rollup)
+
+
+def get_rollup(widget, control):
+    """Returns an up to date rollup that answers the widget, if there is one."""
+    if not widget.table or not widget.table.rollups.exists():
+        return None
+
+    if (spec := get_rollup_spec(widget)) is None:
+        return None
+
+    # custom ranges compare the time of a timestamp, not only the date
+    control = widget.control if widget.has_control else control
+    if (
+        control
+        and widget.date_column
+        and control.date_range == CustomChoice.CUSTOM
+        and not isinstance(widget.table.schema[widget.date_column], idt.Date)
+    ):
+        return None
+
+    dimensions, partials = spec
+    for rollup in widget.table.rollups.select_related("table"):
+        rollup_dimensions, rollup_partials = rollup.spec
+        if (
+            rollup.is_up_to_date
+            and set(dimensions) <= set(rollup_dimensions)
+            and set(partials) <= set(rollup_partials)
+        ):
+            return rollup
+
+
+def _get_final_expr(query, aggregation, names):
+    column, function = aggregation.column, aggregation.function
+    if function == AggregationFunctions.MEAN:
+        total = query[names[(column, "sum")]].sum()
+        return total / query[names[(column, "count")]].sum().nullif(0)
+    if function == AggregationFunctions.COUNT:
+        return query[names[(column, "count")]].sum().coalesce(0)
+    # sum, min and max of the partials
+    return getattr(query[names[(column, function)]], function)()
+
+
+def get_query_from_rollup(widget, control, rollup):
+    """Builds the widget query on the rollup, equivalent to `get_query_from_widget`."""
+    query = get_engine().get_table(rollup.table)
+    rollup_dimensions, rollup_partials = rollup.spec
+    dimension_names = {
+        dimension: f"dimension_{idx}" for idx, dimension in enumerate(rollup_dimensions)
+    }
+    partial_names = {
+        partial: f"partial_{idx}" for idx, partial in enumerate(rollup_partials)
+    }
+
+    if (
+        control := (widget.control if widget.has_control else control)
+    ) and widget.date_column:
+        query = slice_query(
+            query, dimension_names[(widget.date_column, CONTROL_PART)], control, False
+        )
+
+    groups = [
+        query[dimension_names[dimension]].name(dimension[0])
+        for dimension in _get_dimensions(widget, widget.table.schema)
+    ]
+
+    aggregations = _get_aggregations(widget)
+    column_names = [aggregation.column for aggregation in aggregations]
+    aggregations = [
+        _get_final_expr(query, aggregation, partial_names).name(
+            resolve_colname(aggregation.column, aggregation.function, column_names)
+        )
+        for aggregation in aggregations
+    ] or [query[partial_names[COUNT_PARTIAL]].sum().coalesce(0).name("count")]
+
+    if groups:
+        query = query.group_by(groups)
+    query = query.aggregate(aggregations)
+
+    if widget.kind in NO_DIMENSION_WIDGETS:
+        return query
+
+    return _sort(query, widget)
@@ -106,6 +106,34 @@ def test_widget_output(client, user, widget_factory):
     assertOK(r)
 
 
+# the widgets are rendered in threads with their own database connections, they
+# only see committed rows
+@pytest.mark.django_db(transaction=True)
+def test_page_output(client, user, widget_factory):
+    widget = widget_factory(page__dashboard__shared_id=uuid.uuid4())
+    dashboard = widget.page.dashboard
+    url = f"/projects/{dashboard.project.id}/dashboards/{dashboard.id}/widgets/pages/{widget.page.id}/output"
+    r = client.get(url)
+    assertNotFound(r)
+
+    dashboard.shared_status = Dashboard.SharedStatus.PUBLIC
+    dashboard.save()
+    r = client.get(url)
+    assertOK(r)
+
+    dashboard.shared_status = Dashboard.SharedStatus.PRIVATE
+    dashboard.save()
+    client.force_login(user)
+    r = client.get(url)
+    assertNotFound(r)
+
+    dashboard.project.team = user.teams.first()
+    dashboard.project.save()
+
+    r = client.get(url)
+    assertOK(r)
+
+
 def test_widget_viewset(client, widget_factory, user):
     widget = widget_factory()
 
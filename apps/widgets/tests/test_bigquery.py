@@ -1,9 +1,35 @@
+import datetime as dt
+
 import ibis
+import numpy as np
+import pandas as pd
 import pytest
+from django.utils import timezone
 
+from apps.base.core.utils import md5
+from apps.columns.engine import SUMMARY_COLUMN
+from apps.controls.models import DateRange
+from apps.widgets.cache import (
+    OUTPUT_CACHE_MAX_SIZE,
+    get_cached_output,
+    get_output_cache_key,
+    set_cached_output,
+)
+from apps.widgets.comparisons import (
+    CURRENT_PERIOD,
+    PREVIOUS_PERIOD,
+    get_chart_comparison_query,
+    get_metric_comparison_query,
+)
 from apps.widgets.engine import get_query_from_widget
 from apps.widgets.models import NO_DIMENSION_WIDGETS, Widget
-from apps.widgets.visuals import pre_filter
+from apps.widgets.visuals import (
+    metric_comparison_to_output,
+    metric_to_output,
+    metrics_to_output,
+    pre_filter,
+    table_to_output,
+)
 
 pytestmark = pytest.mark.django_db
 
@@ -139,3 +165,132 @@ def test_combo_chart(widget_factory, engine):
         .aggregate(stars=engine.data.stars.sum(), athlete=engine.data.athlete.count())
         .order_by("is_nice")
     )
+
+
+def test_metrics_to_output(widget_factory, engine):
+    page = widget_factory().page
+    stars = widget_factory(kind=Widget.Kind.METRIC, page=page)
+    stars.aggregations.create(column="stars", function="sum")
+    athletes = widget_factory(kind=Widget.Kind.METRIC, page=page, table=stars.table)
+    athletes.aggregations.create(column="athlete", function="count")
+    execute = engine.set_data(
+        pd.DataFrame({f"widget_{stars.id}": [42], f"widget_{athletes.id}": [np.nan]})
+    )
+
+    assert metrics_to_output([stars, athletes], None) == {
+        stars.id: 42,
+        athletes.id: None,
+    }
+    assert execute.call_count == 1
+
+
+def test_metric_to_output_cache(widget_factory, engine):
+    widget = widget_factory(kind=Widget.Kind.METRIC)
+    widget.aggregations.create(column="stars", function="sum")
+    execute = engine.set_data(42)
+
+    assert metric_to_output(widget, None) == metric_to_output(widget, None)
+    assert execute.call_count == 1
+
+    # a sync of the source table invalidates the result
+    widget.table.data_updated = timezone.now()
+    widget.table.save()
+    metric_to_output(widget, None)
+    assert execute.call_count == 2
+
+    # keyword arguments are cached like positional arguments
+    assert metric_to_output(widget, None, use_previous_period=True) == 42
+    assert metric_to_output(widget, None, True) == 42
+    assert execute.call_count == 3
+
+
+def test_output_cache_compressed(widget_factory):
+    widget = widget_factory(kind=Widget.Kind.LINE)
+    key = get_output_cache_key("chart_to_output", widget, None)
+
+    # larger than the limit before compression, e.g. a chart with many points
+    output = {"chart": "0.5," * OUTPUT_CACHE_MAX_SIZE}
+    set_cached_output(key, output)
+    assert get_cached_output(key) == output
+
+
+def test_table_summary_row(widget_factory, engine):
+    widget = widget_factory(kind=Widget.Kind.TABLE, show_summary_row=True)
+    widget.columns.create(column="athlete")
+    widget.aggregations.create(column="stars", function="sum")
+    execute = engine.set_data(
+        pd.DataFrame(
+            {
+                "athlete": [None, "Usain Bolt", "Sakura Yosozumi"],
+                "stars": [3.0, 1.0, 2.0],
+                SUMMARY_COLUMN: [1, 0, 0],
+            }
+        )
+    )
+
+    # the rows and the summary row are fetched in a single query
+    table = table_to_output(widget, None)
+    assert execute.call_count == 1
+    assert len(table.data) == 2
+    assert table.base_columns[md5("stars")].summary == 3.0
+    assert table.base_columns[md5("athlete")].summary == "Total"
+
+
+@pytest.fixture
+def comparison(widget_factory, control_factory):
+    widget = widget_factory(
+        kind=Widget.Kind.METRIC, date_column="birthday", compare_previous_period=True
+    )
+    widget.aggregations.create(column="stars", function="sum")
+    control = control_factory(page=widget.page, date_range=DateRange.TODAY)
+    return widget, control
+
+
+def test_metric_comparison_query(comparison, engine):
+    widget, control = comparison
+    today = dt.date.today()
+    data = engine.data.mutate(
+        **{
+            CURRENT_PERIOD: engine.data.birthday == today,
+            PREVIOUS_PERIOD: engine.data.birthday == today - dt.timedelta(days=1),
+        }
+    )
+    data = data[data[CURRENT_PERIOD] | data[PREVIOUS_PERIOD]]
+
+    assert get_metric_comparison_query(widget, control).equals(
+        data.aggregate(
+            [
+                data[CURRENT_PERIOD]
+                .ifelse(data.stars, ibis.null())
+                .sum()
+                .name(CURRENT_PERIOD),
+                data[PREVIOUS_PERIOD]
+                .ifelse(data.stars, ibis.null())
+                .sum()
+                .name(PREVIOUS_PERIOD),
+            ]
+        )
+    )
+
+
+def test_metric_comparison_to_output(comparison, engine):
+    widget, control = comparison
+    execute = engine.set_data(
+        pd.DataFrame({CURRENT_PERIOD: [42.0], PREVIOUS_PERIOD: [np.nan]})
+    )
+
+    # both periods in a single query, shared with `metric_to_output`
+    assert metric_comparison_to_output(widget, control) == (42.0, None)
+    assert metric_to_output(widget, control) == 42.0
+    assert metric_to_output(widget, control, True) is None
+    assert execute.call_count == 1
+
+
+def test_chart_comparison_query(comparison, engine):
+    widget, control = comparison
+    widget.kind = Widget.Kind.COLUMN
+    widget.dimension = "athlete"
+    widget.save()
+
+    query = get_chart_comparison_query(widget, control)
+    assert query.columns == ["athlete", "stars", "stars (previous period)"]
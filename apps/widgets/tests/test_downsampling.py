@@ -0,0 +1,65 @@
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from apps.base.clients import get_engine
+from apps.columns.engine import DatePeriod
+from apps.widgets.downsampling import (
+    downsample,
+    get_coarser_part,
+    largest_triangle_three_buckets,
+)
+from apps.widgets.models import Widget
+
+pytestmark = pytest.mark.django_db
+
+
+def test_largest_triangle_three_buckets():
+    x = np.arange(10, dtype=float)
+    y = np.array([0, 1, 0, 0, 9, 0, 0, 1, 0, 0], dtype=float)
+
+    indices = largest_triangle_three_buckets(x, y, 4)
+    assert len(indices) == 4
+    # the first, last and the peak are kept
+    assert indices[0] == 0
+    assert indices[-1] == 9
+    assert 4 in indices
+
+    assert list(largest_triangle_three_buckets(x, y, 20)) == list(range(10))
+
+
+def test_downsample():
+    df = pd.DataFrame(
+        {
+            "when": pd.date_range("2020-01-01", periods=100, freq="D"),
+            "stars": np.sin(np.arange(100)),
+        }
+    )
+    # the rows keep their order, e.g. sorted by the value
+    df = df.sort_values("stars", ascending=False)
+
+    reduced = downsample(df, "when", "stars", 10)
+    assert len(reduced) == 10
+    assert reduced.stars.is_monotonic_decreasing
+
+
+@pytest.mark.parametrize(
+    "part, days, expected",
+    [
+        pytest.param(None, 900, DatePeriod.DATE, id="days"),
+        pytest.param(None, 5 * 365, DatePeriod.WEEK, id="weeks"),
+        pytest.param(DatePeriod.WEEK, 5 * 365, DatePeriod.MONTH, id="coarser"),
+        pytest.param(DatePeriod.MONTH_ONLY, 5 * 365, None, id="month only"),
+    ],
+)
+def test_coarser_part(widget_factory, engine, part, days, expected):
+    widget = widget_factory(kind=Widget.Kind.LINE, dimension="birthday", part=part)
+    start = dt.date(2020, 1, 1)
+    engine.set_data(
+        pd.DataFrame({"start": [start], "end": [start + dt.timedelta(days=days)]})
+    )
+
+    query = get_engine().get_table(widget.table)
+    assert get_coarser_part(widget, query, 1000) == expected
@@ -77,12 +77,27 @@ def test_widget_generic_form_basic(setup, widget_factory, pwf, engine):
 
     pwf.select_value("kind", Widget.Kind.COLUMN)
     pwf.assert_fields(
-        {"kind", "date_column", "dimension", "sort_column", "sort_ascending"}
+        {
+            "kind",
+            "date_column",
+            "dimension",
+            "sort_column",
+            "sort_ascending",
+            "compare_previous_period",
+        }
     )
 
     pwf.select_value("dimension", "birthday")
     pwf.assert_fields(
-        {"kind", "date_column", "dimension", "sort_column", "sort_ascending", "part"}
+        {
+            "kind",
+            "date_column",
+            "dimension",
+            "sort_column",
+            "sort_ascending",
+            "part",
+            "compare_previous_period",
+        }
     )
 
 
@@ -0,0 +1,60 @@
+import pandas as pd
+import pytest
+import sqlalchemy as sa
+
+from apps.columns.engine import get_groups
+from apps.filters.models import Filter
+from apps.widgets.models import Widget
+from apps.widgets.visuals import get_rows_and_summary, pre_filter
+
+pytestmark = pytest.mark.django_db
+
+SCHEMA = "test_widgets"
+
+
+@pytest.fixture
+def postgres(postgres_engine):
+    with postgres_engine.raw_client.connect() as conn:
+        conn.execute(sa.text(f"CREATE SCHEMA {SCHEMA}"))
+        conn.execute(
+            sa.text(f"CREATE TABLE {SCHEMA}.athletes (athlete text, stars bigint)")
+        )
+        conn.execute(
+            sa.text(
+                f"INSERT INTO {SCHEMA}.athletes VALUES "
+                "('Neera', 1), ('Neera', 2), ('Vayu', 3), ('Vayu', 4), ('Ila', 10)"
+            )
+        )
+        conn.commit()
+    yield postgres_engine
+    with postgres_engine.raw_client.connect() as conn:
+        conn.execute(sa.text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.commit()
+
+
+def test_get_rows_and_summary_filtered(postgres, widget_factory):
+    widget = widget_factory(
+        kind=Widget.Kind.TABLE,
+        table__name="athletes",
+        table__namespace=SCHEMA,
+        sort_column="athlete",
+    )
+    widget.columns.create(column="athlete")
+    widget.aggregations.create(column="stars", function="sum")
+    widget.filters.create(
+        column="stars",
+        type=Filter.Type.INTEGER,
+        numeric_predicate=Filter.NumericPredicate.LESSTHAN,
+        integer_value=10,
+    )
+
+    query = pre_filter(widget, None)
+    rows, summary = get_rows_and_summary(query, widget, get_groups(query, widget))
+
+    # the filtered rows are excluded from both the groups and the summary
+    pd.testing.assert_frame_equal(
+        rows,
+        pd.DataFrame({"athlete": ["Neera", "Vayu"], "stars": [3, 7]}),
+        check_dtype=False,
+    )
+    assert summary == {"stars": 10, "athlete": "Total"}
@@ -0,0 +1,90 @@
+import ibis
+import pytest
+from django.utils import timezone
+
+from apps.base.clients import get_engine
+from apps.base.engine._schema import set_cached_schemas
+from apps.tables.models import Table
+from apps.widgets.models import Widget
+from apps.widgets.rollups import (
+    get_query_from_rollup,
+    get_rollup,
+    get_rollup_spec,
+    update_rollups,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def widgets(widget_factory):
+    total = widget_factory(kind=Widget.Kind.COLUMN, dimension="is_nice")
+    total.aggregations.create(column="stars", function="sum")
+    average = widget_factory(
+        kind=Widget.Kind.LINE, dimension="is_nice", table=total.table, page=total.page
+    )
+    average.aggregations.create(column="stars", function="mean")
+    return total, average
+
+
+def test_rollup_spec(widget_factory, widgets):
+    total, average = widgets
+    assert get_rollup_spec(total) == ((("is_nice", None),), (("stars", "sum"),))
+    assert get_rollup_spec(average) == (
+        (("is_nice", None),),
+        (("stars", "count"), ("stars", "sum")),
+    )
+
+    distinct = widget_factory(kind=Widget.Kind.COLUMN, dimension="is_nice")
+    distinct.aggregations.create(column="athlete", function="nunique")
+    assert get_rollup_spec(distinct) is None
+
+
+def test_update_rollups(widgets, engine):
+    total, average = widgets
+    update_rollups(total.table)
+
+    rollup = total.table.rollups.get()
+    assert rollup.spec == (
+        (("is_nice", None),),
+        (("stars", "count"), ("stars", "sum")),
+    )
+    assert rollup.table.source == Table.Source.ROLLUP
+    assert get_rollup(total, None) == get_rollup(average, None) == rollup
+
+    # the rollup is read until the source table is synced again
+    update_rollups(total.table)
+    assert Table.objects.filter(source=Table.Source.ROLLUP).count() == 1
+
+    total.table.data_updated = timezone.now()
+    total.table.save()
+    assert get_rollup(total, None) is None
+
+
+def test_query_from_rollup(widgets, engine):
+    total, average = widgets
+    update_rollups(total.table)
+    rollup = total.table.rollups.get()
+    set_cached_schemas(
+        {
+            rollup.table: ibis.schema(
+                [
+                    ("dimension_0", "boolean"),
+                    ("partial_0", "int64"),
+                    ("partial_1", "float64"),
+                ]
+            )
+        }
+    )
+    data = get_engine().get_table(rollup.table)
+
+    assert get_query_from_rollup(total, None, rollup).equals(
+        data.group_by([data.dimension_0.name("is_nice")])
+        .aggregate(stars=data.partial_1.sum())
+        .order_by("is_nice")
+    )
+    assert get_query_from_rollup(average, None, rollup).equals(
+        data.group_by([data.dimension_0.name("is_nice")])
+        .aggregate(stars=data.partial_1.sum() / data.partial_0.sum().nullif(0))
+        .order_by("is_nice")
+    )
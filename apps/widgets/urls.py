@@ -5,6 +5,7 @@ from apps.projects.access import login_and_project_required
 
 from . import cache, frames, rest, views
 from .access import (
+    login_and_dashboard_required_or_public,
     login_and_project_required_or_public_or_in_template,
     login_and_widget_required,
 )
@@ -68,6 +69,13 @@ dashboard_urlpatterns = (
             ),
             name="output",
         ),
+        path(
+            "pages/<hashid:page_id>/output",
+            cache.page_output(
+                login_and_dashboard_required_or_public(frames.PageOutput.as_view())
+            ),
+            name="page_output",
+        ),
     ],
     "dashboard_widgets",
 )
@@ -1,16 +1,45 @@
 from typing import Any, Dict
 
+import pandas as pd
+
 from apps.base.clients import get_engine
 from apps.base.core.table_data import get_table
-from apps.columns.engine import aggregate_columns, get_groups
+from apps.columns.engine import (
+    SUMMARY_COLUMN,
+    aggregate_columns,
+    aggregate_columns_with_summary,
+    get_groups,
+)
 from apps.controls.engine import slice_query
 from apps.filters.engine import get_query_from_filters
 
+from .cache import (
+    MISSING,
+    cached_output,
+    get_cached_output,
+    get_output_cache_key,
+    set_cached_output,
+)
+from .comparisons import (
+    CURRENT_PERIOD,
+    PREVIOUS_PERIOD,
+    get_chart_comparison_query,
+    get_comparison_control,
+    get_metric_comparison_query,
+    get_period_expr,
+    get_periods_query,
+)
+from .downsampling import DOWNSAMPLED_CHARTS, downsample, get_coarser_part
 from .engine import get_query_from_widget
 from .models import Widget
-from .plotly.chart import to_chart
+from .plotly.chart import get_axis_columns, to_chart
+from .rollups import get_query_from_rollup, get_rollup
 
 CHART_MAX_ROWS = 1000
+# Line, area and scatter charts are downsampled from up to this size
+CHART_DOWNSAMPLE_MAX_ROWS = 100_000
+# Table widgets with a summary row are fetched at once up to this size
+TABLE_MAX_ROWS = 1000
 
 
 class MaxRowsExceeded(Exception):
@@ -28,13 +57,43 @@ def pre_filter(widget, control, use_previous_period=False):
     return query
 
 
+def _get_chart_query(widget, control, part=None):
+    if get_comparison_control(widget, control):
+        return get_chart_comparison_query(widget, control, part)
+    # rollups are grouped on the date part of the widget
+    if part is None and (rollup := get_rollup(widget, control)):
+        return get_query_from_rollup(widget, control, rollup)
+    return get_query_from_widget(widget, pre_filter(widget, control), part)
+
+
+def _downsample_chart(widget, control):
+    """Reduces a chart with too many points, e.g. a daily line chart over years.
+
+    Date dimensions are grouped on a coarser part in the warehouse, otherwise a
+    bounded number of points is downsampled to `CHART_MAX_ROWS`.
+    """
+    if part := get_coarser_part(widget, pre_filter(widget, control), CHART_MAX_ROWS):
+        df = _get_chart_query(widget, control, part).limit(CHART_MAX_ROWS + 1).execute()
+        if len(df) <= CHART_MAX_ROWS:
+            return df
+
+    query = _get_chart_query(widget, control)
+    df = query.limit(CHART_DOWNSAMPLE_MAX_ROWS + 1).execute()
+    if len(df) > CHART_DOWNSAMPLE_MAX_ROWS:
+        raise MaxRowsExceeded
+
+    return downsample(df, *get_axis_columns(widget), CHART_MAX_ROWS)
+
+
+@cached_output
 def chart_to_output(widget: Widget, control) -> Dict[str, Any]:
-    query = pre_filter(widget, control)
-    query = get_query_from_widget(widget, query)
+    query = _get_chart_query(widget, control)
 
     # limit to 1001 rows to check if chart exceeds max rows
     df = query.limit(CHART_MAX_ROWS + 1).execute()
-    if len(df) > CHART_MAX_ROWS:
+    if len(df) > CHART_MAX_ROWS and widget.kind in DOWNSAMPLED_CHARTS:
+        df = _downsample_chart(widget, control)
+    elif len(df) > CHART_MAX_ROWS:
         raise MaxRowsExceeded
 
     chart, chart_id = to_chart(df, widget)
@@ -52,15 +111,55 @@ def get_summary_row(query, widget):
     return {**summary, group.column: "Total"}
 
 
+def get_rows_and_summary(query, widget, groups):
+    """Fetches the grouped rows and the summary row in a single query.
+
+    The rows are None if there are more than `TABLE_MAX_ROWS`, the table is
+    then paginated from the grouped query instead.
+    """
+    query = aggregate_columns_with_summary(query, widget.aggregations.all(), groups)
+    sort_by = [(SUMMARY_COLUMN, False)]
+    if widget.sort_column:
+        sort_by.append((widget.sort_column, widget.sort_ascending))
+
+    # the summary row is sorted first and always fetched
+    df = query.order_by(sort_by).limit(TABLE_MAX_ROWS + 2).execute()
+    is_summary = df[SUMMARY_COLUMN] == 1
+    rows = df[~is_summary].drop(columns=SUMMARY_COLUMN).reset_index(drop=True)
+
+    summary = None
+    if is_summary.any():
+        group_names = [group.get_name() for group in groups]
+        summary = (
+            df[is_summary]
+            .drop(columns=[SUMMARY_COLUMN, *group_names])
+            .iloc[0]
+            .to_dict()
+        )
+        # Only naming the first group column
+        summary[widget.columns.first().column] = "Total"
+
+    return (rows if len(rows) <= TABLE_MAX_ROWS else None), summary
+
+
 def table_to_output(widget: Widget, control, url=None) -> Dict[str, Any]:
     query = pre_filter(widget, control)
     summary = None
+    rows = None
     if (group := widget.columns.first()) or widget.aggregations.first():
-        # Only show summary row when a group has been selected
-        if widget.show_summary_row and group:
-            # TODO: add sorting and limit
-            summary = get_summary_row(query, widget)
         groups = get_groups(query, widget)
+        # Only show summary row when a group has been selected
+        if widget.show_summary_row and group and widget.aggregations.exists():
+            key = get_output_cache_key("rows_and_summary", widget, control)
+            if (rows_and_summary := get_cached_output(key)) is MISSING:
+                rows_and_summary = get_rows_and_summary(query, widget, groups)
+                set_cached_output(key, rows_and_summary)
+            rows, summary = rows_and_summary
+        elif widget.show_summary_row and group:
+            summary_key = get_output_cache_key("summary_row", widget, control)
+            if (summary := get_cached_output(summary_key)) is MISSING:
+                summary = get_summary_row(query, widget)
+                set_cached_output(summary_key, summary)
         if widget.aggregations.exists():
             query = aggregate_columns(query, widget.aggregations.all(), groups)
         else:
@@ -83,9 +182,17 @@ def table_to_output(widget: Widget, control, url=None) -> Dict[str, Any]:
     if widget.sort_column:
         query = query.order_by([(widget.sort_column, widget.sort_ascending)])
 
-    return get_table(query.schema(), query, summary, settings, url=url)
+    return get_table(
+        query.schema(),
+        query if rows is None else rows,
+        summary,
+        settings,
+        data_updated=widget.table.data_updated,
+        url=url,
+    )
 
 
+@cached_output
 def metric_to_output(widget, control, use_previous_period=False):
     query = pre_filter(widget, control, use_previous_period)
 
@@ -95,3 +202,118 @@ def metric_to_output(widget, control, use_previous_period=False):
     )
 
     return query.execute()
+
+
+def _get_metric_value(row, name):
+    return None if pd.isna(value := row[name]) else value
+
+
+def metric_comparison_to_output(widget, control):
+    """Computes the metric of the current and previous period in a single query.
+
+    Both are shared with `metric_to_output` via the output cache.
+    """
+    keys = [
+        get_output_cache_key(metric_to_output.__name__, widget, control),
+        get_output_cache_key(metric_to_output.__name__, widget, control, True),
+    ]
+    metrics = [get_cached_output(key) for key in keys]
+    if all(metric is not MISSING for metric in metrics):
+        return tuple(metrics)
+
+    row = get_metric_comparison_query(widget, control).execute().iloc[0]
+    metrics = [
+        _get_metric_value(row, CURRENT_PERIOD),
+        _get_metric_value(row, PREVIOUS_PERIOD),
+    ]
+    for key, metric in zip(keys, metrics):
+        set_cached_output(key, metric)
+
+    return tuple(metrics)
+
+
+def metrics_to_output(widgets, control):
+    """Computes the metrics of several widgets in a single query.
+
+    The widgets need to share the same table, date column and control and have
+    no filters of their own. Metrics are shared with `metric_to_output` via the
+    output cache, including the previous period of widgets that compare with it.
+    """
+    keys = {
+        widget.id: get_output_cache_key(metric_to_output.__name__, widget, control)
+        for widget in widgets
+    }
+    previous_keys = {
+        widget.id: get_output_cache_key(
+            metric_to_output.__name__, widget, control, True
+        )
+        for widget in widgets
+        if get_comparison_control(widget, control)
+    }
+    metrics = {widget.id: get_cached_output(keys[widget.id]) for widget in widgets}
+    widgets = [
+        widget
+        for widget in widgets
+        if metrics[widget.id] is MISSING
+        or (
+            widget.id in previous_keys
+            and get_cached_output(previous_keys[widget.id]) is MISSING
+        )
+    ]
+    if not widgets:
+        return metrics
+
+    aggregations = {
+        f"widget_{widget.id}": widget.aggregations.first() for widget in widgets
+    }
+    if previous_keys:
+        # both periods are aggregated over the rows of either period
+        query = get_periods_query(widgets[0], control)
+        values = [
+            get_period_expr(query, aggregation, CURRENT_PERIOD).name(name)
+            for name, aggregation in aggregations.items()
+        ] + [
+            get_period_expr(query, widget.aggregations.first(), PREVIOUS_PERIOD).name(
+                f"previous_{widget.id}"
+            )
+            for widget in widgets
+            if widget.id in previous_keys
+        ]
+    else:
+        query = pre_filter(widgets[0], control)
+        values = [
+            getattr(query[aggregation.column], aggregation.function)().name(name)
+            for name, aggregation in aggregations.items()
+        ]
+    row = query.aggregate(values).execute().iloc[0]
+
+    for widget in widgets:
+        metrics[widget.id] = _get_metric_value(row, f"widget_{widget.id}")
+        set_cached_output(keys[widget.id], metrics[widget.id])
+        if widget.id in previous_keys:
+            set_cached_output(
+                previous_keys[widget.id],
+                _get_metric_value(row, f"previous_{widget.id}"),
+            )
+
+    return metrics
+
+
+def warm_output(widget, control):
+    """Computes the widget output ahead of a request, e.g. after a sync."""
+    if not widget.is_valid or widget.kind in [
+        Widget.Kind.TEXT,
+        Widget.Kind.IFRAME,
+        Widget.Kind.IMAGE,
+    ]:
+        return
+
+    if widget.kind == Widget.Kind.TABLE:
+        table_to_output(widget, control).data.prefetch()
+    elif widget.kind == Widget.Kind.METRIC:
+        if get_comparison_control(widget, control):
+            metric_comparison_to_output(widget, control)
+        else:
+            metric_to_output(widget, control)
+    else:
+        chart_to_output(widget, control)
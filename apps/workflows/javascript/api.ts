@@ -22,6 +22,7 @@ export const toNode = (res): Node => ({
     ...(res.kind === 'text' ? { text: res.text_text } : {}),
     description: res.description,
     join_is_valid: res.join_is_valid,
+    cached: res.cached,
   },
   position: { x: res.x, y: res.y },
 })
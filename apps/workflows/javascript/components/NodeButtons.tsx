@@ -1,4 +1,5 @@
-import React, { useContext } from 'react'
+import React, { useContext, useState } from 'react'
+import { updateNode } from '../api'
 import { DnDContext, IDnDContext } from '../context'
 
 const EditButton = ({ id }) => {
@@ -27,10 +28,29 @@ const DuplicateButton = ({ id }) => {
   )
 }
 
-const NodeButtons = ({ id }) => {
+const CacheButton = ({ id, cached: initialCached }) => {
+  const [cached, setCached] = useState(initialCached)
+  const toggleCached = async () => {
+    await updateNode(id, { cached: !cached })
+    setCached(!cached)
+  }
+  return (
+    <button
+      onClick={toggleCached}
+      title={cached ? 'Stop storing the result' : 'Store the result'}
+    >
+      <i className={`${cached ? 'fas' : 'fal'} fa-fw fa-database fa-lg`} />
+    </button>
+  )
+}
+
+const NodeButtons = ({ id, data }) => {
   return (
     <div className='react-flow__buttons'>
       <EditButton id={id} />
+      {!['input', 'output'].includes(data.kind) && (
+        <CacheButton id={id} cached={data.cached} />
+      )}
       <DuplicateButton id={id} />
       <DeleteButton id={id} />
     </div>
@@ -37,7 +37,7 @@ const NodeContent: React.FC<Props> = ({ id, data, showFilledIcon = true }) => {
   return (
     <>
       {data.error && <ErrorIcon text={data.error} />}
-      <NodeButtons id={id} />
+      <NodeButtons id={id} data={data} />
       <i
         className={`
           ${showFilledIcon ? 'fas' : 'fal opacity-80'}
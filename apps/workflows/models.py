@@ -1,14 +1,12 @@
 from itertools import chain
 
 from django.db import models
-from django.db.models import Max
 from django.urls import reverse
 
 from apps.base.models import BaseModel
 from apps.base.tables import ICONS
 from apps.projects.models import Project
 from apps.runs.models import JobRun
-from apps.tables.models import Table
 from apps.workflows.clone import clone_nodes
 
 from .clone import clone_nodes
@@ -130,16 +128,8 @@ class Workflow(BaseModel):
         if not self.last_success_run:
             return True
 
-        latest_input_updated = Table.objects.filter(
-            input_nodes__workflow=self
-        ).aggregate(data_updated=Max("data_updated"))["data_updated"]
-
-        if not latest_input_updated:
-            return True
-
-        return self.last_success_run.started_at < max(
-            self.data_updated, latest_input_updated
-        )
+        # updates of the input tables are propagated to `data_updated`
+        return self.last_success_run.started_at < self.data_updated
 
     def update_state_from_latest_run(self):
         self.state = (
@@ -8,24 +8,94 @@ from django.utils import timezone
 from apps.base.analytics import WORFKLOW_RUN_EVENT
 from apps.base.clients import get_engine
 from apps.base.core.utils import error_name_to_snake
-from apps.nodes.engine import NodeResultNone, get_query_from_node
+from apps.nodes._utils import (
+    create_or_replace_cache_table,
+    create_or_replace_intermediate_table,
+    table_is_up_to_date,
+)
+from apps.nodes.engine import (
+    NodeResultNone,
+    get_outdated_cached_nodes,
+    get_query_from_node,
+    get_shared_nodes,
+)
+from apps.nodes.exceptions import NODE_ERRORS
 from apps.nodes.models import Node
 from apps.runs.models import JobRun
 from apps.tables.models import Table
+from apps.tables.tasks import warm_table_dependents
 from apps.users.models import CustomUser
 
 from .models import Workflow
 
 
+def _update_cache_tables(output_nodes):
+    """Stores the cached ancestors of the outputs in their cache tables.
+
+    The cache tables are only built here, reading a node never writes to the
+    warehouse.
+    """
+    for node in get_outdated_cached_nodes(output_nodes):
+        try:
+            query = get_query_from_node(node)
+        except NODE_ERRORS:
+            # the error is stored on the node and raised again for the outputs
+            continue
+        create_or_replace_cache_table(node, query)
+
+
+def _materialize_shared_nodes(output_nodes):
+    """Stores the costly ancestors shared by several outputs in intermediate tables.
+
+    Every output reads the shared part from the table instead of computing it
+    again, like pivot and unpivot nodes do.
+    """
+    materialized = {}
+
+    for node in get_shared_nodes(output_nodes):
+        # the result is already stored in the cache table of the node
+        if node.cached and table_is_up_to_date(
+            table := getattr(node, "cache_table", None), node
+        ):
+            materialized[node.id] = table
+            continue
+
+        table = getattr(node, "intermediate_table", None)
+
+        if not table_is_up_to_date(table, node):
+            try:
+                query = get_query_from_node(node, materialized)
+            except NODE_ERRORS:
+                # the error is stored on the node and raised again for the outputs
+                continue
+            table = create_or_replace_intermediate_table(node, query)
+
+        materialized[node.id] = table
+
+    return materialized
+
+
 @shared_task(bind=True)
-def run_workflow_task(self, run_id: int):
+def run_workflow_task(self, run_id: int, skip_up_to_date=False):
     run = JobRun.objects.get(pk=run_id)
     workflow = run.workflow
     output_nodes = workflow.nodes.filter(kind=Node.Kind.OUTPUT).all()
 
-    for node in output_nodes:
+    outdated_nodes = [
+        node
+        for node in output_nodes
+        if not (
+            skip_up_to_date and table_is_up_to_date(getattr(node, "table", None), node)
+        )
+    ]
+
+    _update_cache_tables(outdated_nodes)
+    materialized = _materialize_shared_nodes(outdated_nodes)
+    updated_tables = []
+
+    for node in outdated_nodes:
         try:
-            query = get_query_from_node(node)
+            query = get_query_from_node(node, materialized)
         except NodeResultNone as err:
             node.error = error_name_to_snake(err)
             node.save()
@@ -43,6 +113,14 @@ def run_workflow_task(self, run_id: int):
 
                 table.data_updated = timezone.now()
                 table.save()
+            updated_tables.append(table)
+
+    warm_table_dependents(updated_tables)
+
+    if skipped_outputs := len(output_nodes) - len(outdated_nodes):
+        run.skipped = not outdated_nodes
+        run.skipped_outputs = skipped_outputs
+        run.save(update_fields=["skipped", "skipped_outputs"])
 
     if run.user:
         analytics.track(
@@ -0,0 +1,127 @@
+import pytest
+from django.utils import timezone
+
+from apps.nodes.exceptions import NodeResultNone
+from apps.nodes.models import Node
+from apps.runs.models import JobRun
+from apps.tables.models import Table
+from apps.workflows import tasks
+
+pytestmark = pytest.mark.django_db
+
+
+def test_run_workflow_skip_up_to_date(
+    project, workflow_factory, node_factory, integration_table_factory, engine
+):
+    workflow = workflow_factory(project=project)
+    input_table = integration_table_factory(project=project)
+    input_node = node_factory(
+        kind=Node.Kind.INPUT, input_table=input_table, workflow=workflow
+    )
+    output_node = node_factory(kind=Node.Kind.OUTPUT, workflow=workflow)
+    output_node.parents.add(input_node)
+
+    def run_workflow(**kwargs):
+        run = JobRun.objects.create(
+            source=JobRun.Source.WORKFLOW,
+            workflow=workflow,
+            state=JobRun.State.RUNNING,
+            started_at=timezone.now(),
+        )
+        tasks.run_workflow_task(run.id, **kwargs)
+        run.refresh_from_db()
+        return run
+
+    # the output table does not exist yet
+    assert not run_workflow(skip_up_to_date=True).skipped
+    assert engine.raw_sql.call_count == 1
+
+    # nothing changed since the last run
+    run = run_workflow(skip_up_to_date=True)
+    assert run.skipped
+    assert run.skipped_outputs == 1
+    assert engine.raw_sql.call_count == 1
+
+    # without dirty tracking the outputs are always rebuilt
+    assert not run_workflow().skipped
+    assert engine.raw_sql.call_count == 2
+
+    # the input table was synced again
+    input_table.data_updated = timezone.now()
+    input_table.save()
+    assert not run_workflow(skip_up_to_date=True).skipped
+    assert engine.raw_sql.call_count == 3
+
+    # only the new output is built
+    new_output_node = node_factory(kind=Node.Kind.OUTPUT, workflow=workflow)
+    new_output_node.parents.add(input_node)
+    run = run_workflow(skip_up_to_date=True)
+    assert not run.skipped
+    assert run.skipped_outputs == 1
+    assert engine.raw_sql.call_count == 4
+
+
+def test_materialize_shared_nodes(
+    project, workflow_factory, node_factory, integration_table_factory, mocker
+):
+    workflow = workflow_factory(project=project)
+    node = node_factory(kind=Node.Kind.JOIN, workflow=workflow, cached=True)
+    mocker.patch("apps.workflows.tasks.get_shared_nodes", return_value=[node])
+    get_query_from_node = mocker.patch("apps.workflows.tasks.get_query_from_node")
+    create_table = mocker.patch(
+        "apps.workflows.tasks.create_or_replace_intermediate_table"
+    )
+
+    # the node errors are raised again for the outputs
+    get_query_from_node.side_effect = NodeResultNone(node)
+    assert tasks._materialize_shared_nodes([]) == {}
+
+    # any other error fails the run
+    get_query_from_node.side_effect = ValueError
+    with pytest.raises(ValueError):
+        tasks._materialize_shared_nodes([])
+
+    # the up to date cache table is read instead of writing the result again
+    cache_table = integration_table_factory(
+        project=project,
+        integration=None,
+        source=Table.Source.CACHE_NODE,
+        cache_node=node,
+    )
+    node.refresh_from_db()
+    assert tasks._materialize_shared_nodes([]) == {node.id: cache_table}
+    assert create_table.call_count == 0
+
+
+def test_run_workflow_cache_tables(
+    project, workflow_factory, node_factory, integration_table_factory, engine
+):
+    workflow = workflow_factory(project=project)
+    input_table = integration_table_factory(project=project)
+    input_node = node_factory(
+        kind=Node.Kind.INPUT, input_table=input_table, workflow=workflow
+    )
+    select_node = node_factory(kind=Node.Kind.SELECT, workflow=workflow, cached=True)
+    select_node.parents.add(input_node)
+    select_node.columns.create(column="athlete")
+    output_node = node_factory(kind=Node.Kind.OUTPUT, workflow=workflow)
+    output_node.parents.add(select_node)
+
+    def run_workflow():
+        run = JobRun.objects.create(
+            source=JobRun.Source.WORKFLOW,
+            workflow=workflow,
+            state=JobRun.State.RUNNING,
+            started_at=timezone.now(),
+        )
+        tasks.run_workflow_task(run.id)
+
+    # the cache table is built before the output
+    run_workflow()
+    assert engine.raw_sql.call_count == 2
+    select_node.refresh_from_db()
+    assert select_node.cache_table.source == Table.Source.CACHE_NODE
+
+    # the up to date cache table is kept
+    run_workflow()
+    assert engine.raw_sql.call_count == 3